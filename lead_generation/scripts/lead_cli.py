@@ -9,8 +9,6 @@ import sys
 from datetime import datetime
 import argparse
 from collections import Counter
-from dotenv import load_dotenv
-from notion_client import Client
 
 # Add the parent directory to the sys.path to find modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,24 +16,37 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-load_dotenv()
+# The shared daemon client lives in the prompt system's lib
+prompt_management_dir = os.path.join(os.path.dirname(parent_dir), "prompt_management")
+if prompt_management_dir not in sys.path:
+    sys.path.append(prompt_management_dir)
 
 class LeadManager:
     """Manager for lead generation database operations"""
     
     def __init__(self):
+        from notion_client import Client
         self.notion = Client(auth=os.getenv("LEAD_SECURITY_TOKEN"))
         self.database_id = os.getenv("LEAD_DATABASE_ID")
         
+        # Database schema is retrieved once per manager (once per daemon when running in one)
+        self._database = None
+        
         if not self.database_id:
             print("❌ LEAD_DATABASE_ID not found in .env")
             print("Please add your database ID to the .env file")
             return
     
+    def _get_database(self):
+        """Retrieve the database object once and reuse it for the lifetime of the manager"""
+        if self._database is None:
+            self._database = self.notion.databases.retrieve(database_id=self.database_id)
+        return self._database
+    
     def get_database_info(self):
         """Get basic information about the database"""
         try:
-            db = self.notion.databases.retrieve(database_id=self.database_id)
+            db = self._get_database()
             return {
                 "title": db['title'][0]['plain_text'] if db.get('title') and db['title'] else "Untitled",
                 "properties": list(db['properties'].keys())
@@ -48,7 +59,7 @@ class LeadManager:
         """Count leads in each processing stage"""
         try:
             # Get the database to determine if the Processing Stage property exists
-            db = self.notion.databases.retrieve(database_id=self.database_id)
+            db = self._get_database()
             
             # Check if Processing Stage property exists
             has_stage_property = "Processing Stage" in db['properties']
@@ -179,9 +190,14 @@ class LeadManager:
             print(f"❌ Error retrieving recent leads: {e}")
             return []
 
+def _lead_manager():
+    """A lead manager (the daemon keeps one, with its connection pool and schema, across commands)"""
+    from lib.daemon import warm
+    return warm(("lead-manager",), LeadManager)
+
 def show_overview():
     """Show an overview of the leads database"""
-    manager = LeadManager()
+    manager = _lead_manager()
     
     # Get database info
     db_info = manager.get_database_info()
@@ -240,7 +256,7 @@ def show_overview():
 
 def show_stats_by_field(field):
     """Show statistics for a specific field"""
-    manager = LeadManager()
+    manager = _lead_manager()
     
     if field.lower() == "stage":
         counts = manager.count_leads_by_stage()
@@ -270,7 +286,7 @@ def show_stats_by_field(field):
 
 def show_recent(limit=10):
     """Show most recently added leads"""
-    manager = LeadManager()
+    manager = _lead_manager()
     recent_leads = manager.get_recent_leads(limit)
     
     if not recent_leads:
@@ -303,6 +319,14 @@ def main():
     
     # Parse arguments
     args = parser.parse_args()
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # A running daemon (python prompt_cli.py daemon start) answers with warm caches
+    from lib.daemon import forward
+    status = forward("lead", sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
     
     # Check if we're properly configured
     if not os.getenv("LEAD_DATABASE_ID") or not os.getenv("LEAD_SECURITY_TOKEN"):
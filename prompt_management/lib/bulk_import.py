@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+KHAOS Bulk Import - THE WHOLE TEMPLATE TREE IN ONE EXPEDITION
+Turns template files into Notion property payloads:
+
+- files are parsed in a process pool (one pass each, see lib.prompt_parser)
+- section bodies are converted to the property types the schema declares
+- the content hash of a payload is taken over canonical property values, the
+  same values a scanned page reduces to, so an unchanged file is recognised
+  without any extra state or API call
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from lib.chunked_text import encode_text
+from lib.notion_writer import canonical_property_value
+from lib.prompt_parser import ParseError, parse_prompt_document, require_sections
+
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def parse_import_file(path: str) -> Dict[str, Any]:
+    """Read and parse one template (process pool entry point; errors are reported, not raised)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {'file': path, 'error': str(e)}
+    return parse_import_text(text, path)
+
+
+def parse_import_text(text: str, path: str) -> Dict[str, Any]:
+    """Parse template text as if read from path (same result shape as parse_import_file)"""
+    # Documents without a PROMPT_ID are not templates; the caller skips them
+    try:
+        document = parse_prompt_document(text, source=path, required=())
+        if 'Prompt ID' in document['sections']:
+            require_sections(document['sections'], document['lines'], source=path)
+    except ParseError as e:
+        return {'file': path, 'error': f"line {e.line}: {e.message}" if e.line else e.message}
+    return {
+        'file': path,
+        'prompt_id': document['sections'].get('Prompt ID', ''),
+        'sections': document['sections'],
+        'warnings': document['warnings'],
+        'text': text,
+    }
+
+
+def property_value(prop_type: str, value: str) -> Optional[Dict]:
+    """Payload for a non-text property from a section body, or None if it does not convert"""
+    value = value.strip()
+    if not value:
+        return None
+    if prop_type == 'select':
+        # Notion rejects commas in option names
+        return {"select": {"name": value.replace(',', ' ')[:100]}}
+    if prop_type == 'multi_select':
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        return {"multi_select": [{"name": name[:100]} for name in dict.fromkeys(names)]}
+    if prop_type == 'date':
+        if value.startswith('@'):
+            return {"date": {"start": datetime.now().strftime('%Y-%m-%d')}}
+        match = _DATE.search(value)
+        return {"date": {"start": match.group(0)}} if match else None
+    if prop_type == 'number':
+        match = _NUMBER.match(value)
+        return {"number": float(match.group(0)) if '.' in match.group(0) else int(match.group(0))} if match else None
+    return None
+
+
+def build_payload(parsed: Dict[str, Any], schema: Dict[str, Dict], title_property: str,
+                  is_new: bool = True) -> Dict[str, Any]:
+    """
+    Properties for one parsed template (relative dates like @Today only fill new pages)
+
+    Returns:
+        {'properties': {name: payload}, 'blocks': {name: page body blocks}, 'texts': {name: full text}}
+        Text properties too large for the property itself carry a marker; their
+        full text and blocks are returned alongside.
+    """
+    properties = {title_property: {"title": [{"text": {"content": parsed['prompt_id']}}]}}
+    blocks, texts = {}, {}
+
+    values = {name: body for name, body in parsed['sections'].items() if name != 'Prompt ID'}
+    values['Full Prompt'] = parsed['text']
+    for name, body in values.items():
+        prop_schema = schema.get(name)
+        if prop_schema is None:
+            continue
+        # Full Prompt is declared as a formula but stored as rich text
+        if prop_schema['type'] in ('rich_text', 'formula') and body.strip():
+            properties[name], field_blocks = encode_text(name, body)
+            if field_blocks:
+                blocks[name] = field_blocks
+                texts[name] = body
+        elif prop_schema['type'] not in ('rich_text', 'formula'):
+            if prop_schema['type'] == 'date' and body.strip().startswith('@') and not is_new:
+                continue
+            converted = property_value(prop_schema['type'], body)
+            if converted is not None:
+                properties[name] = converted
+    return {'properties': properties, 'blocks': blocks, 'texts': texts}
+
+
+def content_hash(properties: Dict[str, Dict]) -> str:
+    """Hash over canonical property values - equal for a payload and a page storing the same content"""
+    canonical = {name: canonical_property_value(prop) for name, prop in properties.items()}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+                          .encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+KHAOS Chunked Text - NO MORE SILENT AMPUTATIONS AT 2000 CHARACTERS
+Notion caps a rich_text object at 2000 characters and only returns the first
+25 objects of a property inline. Long text is therefore stored in two tiers:
+
+- up to INLINE_SEGMENT_LIMIT segments: split across the property's rich_text
+  array (extraction joins all segments)
+- larger: the page body holds the text in code blocks tagged with the field
+  name and content hash; the property keeps a marker (length + hash) and a
+  preview, so list and metadata reads stay small and the body is only fetched
+  when the field is actually decoded
+
+Reassembled text is checked against the marker's length and hash.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+SEGMENT_LIMIT = 2000
+INLINE_SEGMENT_LIMIT = 20
+BLOCK_SEGMENT_LIMIT = 50
+
+_MARKER = re.compile(r'^⟦khaos:blocks (\d+) chars sha256:([0-9a-f]{16})⟧\n?')
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _utf16_length(text: str) -> int:
+    """Length as Notion counts it (JavaScript string length)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def split_segments(text: str, limit: int = SEGMENT_LIMIT) -> List[str]:
+    """Split text into segments Notion accepts, preferring line and word boundaries; ''.join() restores it"""
+    segments = []
+    start = 0
+    while start < len(text):
+        end = min(start + limit, len(text))
+        # Astral characters (emoji) count twice in Notion's limit
+        while _utf16_length(text[start:end]) > limit:
+            end -= max(1, (_utf16_length(text[start:end]) - limit + 1) // 2)
+        if end < len(text):
+            boundary = max(text.rfind('\n', start, end), text.rfind(' ', start, end))
+            if boundary > start + limit // 2:
+                end = boundary + 1
+        segments.append(text[start:end])
+        start = end
+    return segments
+
+
+def rich_text(segments: List[str]) -> List[Dict]:
+    return [{"type": "text", "text": {"content": segment}} for segment in segments]
+
+
+def block_tag(field: str, digest: str) -> str:
+    """Caption identifying the body blocks of one field version"""
+    return f"khaos-chunk:{field}:{digest}"
+
+
+def encode_text(field: str, text: str) -> Tuple[Dict, List[Dict]]:
+    """
+    Property value (and page body blocks, for large text) storing text losslessly
+
+    Returns:
+        (property value, blocks) - blocks is empty when the text fits in the property
+    """
+    segments = split_segments(text)
+    if len(segments) <= INLINE_SEGMENT_LIMIT:
+        return {"rich_text": rich_text(segments)}, []
+
+    digest = text_digest(text)
+    marker = f"⟦khaos:blocks {len(text)} chars sha256:{digest}⟧\n"
+    preview = split_segments(text, SEGMENT_LIMIT - _utf16_length(marker))[0]
+    blocks = [
+        {
+            "object": "block",
+            "type": "code",
+            "code": {
+                "language": "plain text",
+                "caption": rich_text([block_tag(field, digest)]),
+                "rich_text": rich_text(segments[i:i + BLOCK_SEGMENT_LIMIT]),
+            },
+        }
+        for i in range(0, len(segments), BLOCK_SEGMENT_LIMIT)
+    ]
+    return {"rich_text": rich_text([marker + preview])}, blocks
+
+
+def parse_marker(value: Optional[str]) -> Optional[Tuple[int, str]]:
+    """(length, digest) when a property value points at page body blocks"""
+    match = _MARKER.match(value or '')
+    return (int(match.group(1)), match.group(2)) if match else None
+
+
+def is_chunk_block(block: Dict, field: str, digest: Optional[str] = None) -> bool:
+    """True for body blocks holding this field (any version, or the one with this digest)"""
+    if block.get('type') != 'code':
+        return False
+    caption = ''.join(part.get('plain_text', part.get('text', {}).get('content', ''))
+                      for part in block['code'].get('caption', []))
+    prefix = block_tag(field, digest) if digest else block_tag(field, '')
+    return caption == prefix if digest else caption.startswith(prefix)
+
+
+def decode_blocks(blocks: List[Dict], field: str, digest: str) -> str:
+    """Join the text of this field's body blocks, in page order"""
+    return ''.join(
+        part.get('plain_text', part.get('text', {}).get('content', ''))
+        for block in blocks if is_chunk_block(block, field, digest)
+        for part in block['code']['rich_text']
+    )
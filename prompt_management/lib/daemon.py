@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+KHAOS Daemon - THE ARCHAEOLOGIST NEVER GOES HOME
+An optional long-lived process that runs prompt_cli and lead_cli commands for
+their clients over a Unix domain socket. Everything a cold CLI call pays for
+again and again stays warm between commands: imported libraries, the Notion
+HTTP connection pool, database schemas, the lineage index and inheritance
+resolver, the search index and open local replicas (SQLite storage).
+
+    python prompt_cli.py daemon start      # then use both CLIs as usual
+    python prompt_cli.py daemon status
+    python prompt_cli.py daemon stop
+
+When the socket answers, the CLIs forward their arguments, working directory and
+configuration (PROMPT_*/NOTION_* or LEAD_* variables) and stream the output back;
+otherwise they run in-process exactly as before. Commands run one at a time.
+Set KHAOS_NO_DAEMON=1 to bypass a running daemon, KHAOS_DAEMON_SOCKET to move the socket.
+
+Warm objects may define begin_command() and end_command(); the daemon calls them
+around every command (e.g. to re-check index watermarks and flush pending writes).
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CLI name -> (script, environment variable prefixes that configure it)
+CLIS = {
+    'prompt': (os.path.join(_PACKAGE_DIR, "scripts", "prompt_cli.py"), ('PROMPT_', 'NOTION_')),
+    'lead': (os.path.join(os.path.dirname(_PACKAGE_DIR), "lead_generation", "scripts", "lead_cli.py"), ('LEAD_',)),
+}
+
+# Longest path a Unix socket address can hold (sun_path, with room for the terminator)
+_MAX_SOCKET_PATH = 100
+
+# Warm objects by (configuration, key); None outside the daemon
+_warm: Optional[Dict[tuple, Any]] = None
+_config: tuple = ()
+
+
+def socket_path() -> str:
+    path = os.getenv("KHAOS_DAEMON_SOCKET")
+    if path:
+        return path
+    from lib.local_store import cache_path
+    path = cache_path("daemon", "khaos.sock")
+    if len(path) > _MAX_SOCKET_PATH:
+        import tempfile
+        # The temp directory is shared: keep the socket in a directory only this user can enter
+        directory = os.path.join(tempfile.gettempdir(), f"khaos-daemon-{os.getuid()}")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        path = os.path.join(directory, "khaos.sock")
+    return path
+
+
+def _owned_socket(path: str) -> bool:
+    """True when the socket at path belongs to this user - commands carry credentials, never send them elsewhere"""
+    try:
+        return os.stat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _log_path() -> str:
+    from lib.local_store import cache_path
+    return cache_path("daemon", "daemon.log")
+
+
+def in_daemon() -> bool:
+    return _warm is not None
+
+
+def warm(key: Any, factory: Callable[[], Any]) -> Any:
+    """
+    In the daemon: one object per key and configuration, kept for the daemon's lifetime.
+    Anywhere else: a fresh factory() - callers need not know where they run.
+    """
+    if _warm is None:
+        return factory()
+    slot = (_config, key)
+    if slot not in _warm:
+        _warm[slot] = factory()
+    return _warm[slot]
+
+
+# ═══════════════════════════════════════════════════════════════
+# CLIENT
+# ═══════════════════════════════════════════════════════════════
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+def _request(message: Dict[str, Any], timeout: Optional[float] = 5.0) -> Optional[Dict[str, Any]]:
+    """One request/reply exchange (control messages); None when no daemon answers"""
+    path = socket_path()
+    if not _owned_socket(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            _send(sock, message)
+            line = sock.makefile('rb').readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
+
+
+def forward(cli: str, argv: List[str]) -> Optional[int]:
+    """
+    Run a CLI command in the daemon, streaming its output here
+
+    Returns:
+        The command's exit status, or None when there is no daemon to run it
+        (the caller then runs the command itself)
+    """
+    if _warm is not None or os.getenv("KHAOS_NO_DAEMON"):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    if not _owned_socket(path):
+        print(f"⚠️  Ignoring daemon socket {path}: it belongs to another user", file=sys.stderr)
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        # Stale socket left by a daemon that did not shut down cleanly
+        sock.close()
+        return None
+
+    prefixes = CLIS[cli][1]
+    with sock:
+        _send(sock, {'op': 'run', 'cli': cli, 'argv': argv, 'cwd': os.getcwd(),
+                     'env': {name: value for name, value in os.environ.items() if name.startswith(prefixes)}})
+        started = False
+        try:
+            for line in sock.makefile('rb'):
+                message = json.loads(line)
+                if 'refused' in message:
+                    return None
+                started = True
+                if 'out' in message:
+                    sys.stdout.write(message['out'])
+                    sys.stdout.flush()
+                elif 'err' in message:
+                    sys.stderr.write(message['err'])
+                    sys.stderr.flush()
+                elif 'exit' in message:
+                    return message['exit']
+        except KeyboardInterrupt:
+            print("\n⚠️  Interrupted - the daemon finishes the command in the background", file=sys.stderr)
+            return 130
+        except BrokenPipeError:
+            # Our reader went away (e.g. '| head'): stop quietly, as a local command would
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    if not started:
+        return None
+    print("❌ Lost the connection to the daemon mid-command (see 'daemon status' and its log)", file=sys.stderr)
+    return 1
+
+
+# ═══════════════════════════════════════════════════════════════
+# DAEMON
+# ═══════════════════════════════════════════════════════════════
+
+class _ClientStream(io.TextIOBase):
+    """sys.stdout/sys.stderr replacement that streams text to the connected client"""
+
+    def __init__(self, sock: socket.socket, channel: str):
+        self.sock = sock
+        self.channel = channel
+        self.buffer_text = ''
+        self.connected = True
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.buffer_text += text
+        if '\n' in text or len(self.buffer_text) > 4096:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer_text and self.connected:
+            try:
+                _send(self.sock, {self.channel: self.buffer_text})
+            except OSError:
+                # The client went away; the command still runs to completion
+                self.connected = False
+        self.buffer_text = ''
+
+
+class Daemon:
+    """Serves CLI commands over a Unix socket, one at a time, with warm state in between"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or socket_path()
+        self.started = time.time()
+        self.commands = 0
+        self.last_command: Optional[Dict[str, Any]] = None
+        self.stopping = False
+        self._modules: Dict[str, Any] = {}
+
+    def _cli_module(self, cli: str):
+        if cli not in self._modules:
+            script = CLIS[cli][0]
+            spec = importlib.util.spec_from_file_location(f"khaos_daemon_{cli}_cli", script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._modules[cli] = module
+        return self._modules[cli]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'pid': os.getpid(),
+            'socket': self.path,
+            'uptime_seconds': round(time.time() - self.started),
+            'commands': self.commands,
+            'last_command': self.last_command,
+            'warm': sorted({'/'.join(map(str, key)) if isinstance(key, tuple) else str(key) for _, key in _warm or ()}),
+            'clis_loaded': sorted(self._modules),
+        }
+
+    def run_command(self, sock: socket.socket, request: Dict[str, Any]):
+        global _config
+        cli = request.get('cli')
+        if cli not in CLIS:
+            _send(sock, {'refused': f"unknown CLI '{cli}'"})
+            return
+
+        prefixes = CLIS[cli][1]
+        env = {name: value for name, value in (request.get('env') or {}).items() if name.startswith(prefixes)}
+        saved_env = {name: value for name, value in os.environ.items() if name.startswith(prefixes)}
+        saved_argv, saved_cwd = sys.argv, os.getcwd()
+        stdout, stderr = _ClientStream(sock, 'out'), _ClientStream(sock, 'err')
+        status = 0
+        start = time.time()
+        try:
+            # The client's configuration applies for this command; warm objects are kept per configuration
+            for name in saved_env:
+                os.environ.pop(name, None)
+            os.environ.update(env)
+            _config = (cli, tuple(sorted(env.items())))
+            os.chdir(request.get('cwd') or saved_cwd)
+            sys.argv = [CLIS[cli][0], *request.get('argv', [])]
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                for obj in list(_warm.values()):
+                    if hasattr(obj, 'begin_command'):
+                        obj.begin_command()
+                try:
+                    self._cli_module(cli).main()
+                except SystemExit as e:
+                    status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    if not isinstance(e.code, (int, type(None))):
+                        print(e.code, file=sys.stderr)
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+                finally:
+                    for obj in list(_warm.values()):
+                        if hasattr(obj, 'end_command'):
+                            obj.end_command()
+        finally:
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+            for name in [name for name in os.environ if name.startswith(prefixes)]:
+                del os.environ[name]
+            os.environ.update(saved_env)
+            stdout.flush()
+            stderr.flush()
+        self.commands += 1
+        self.last_command = {'cli': cli, 'argv': request.get('argv', []), 'exit': status,
+                             'seconds': round(time.time() - start, 3)}
+        if stdout.connected:
+            try:
+                _send(sock, {'exit': status})
+            except OSError:
+                pass
+
+    def handle(self, sock: socket.socket):
+        line = sock.makefile('rb').readline()
+        if not line:
+            return
+        request = json.loads(line)
+        op = request.get('op')
+        if op == 'run':
+            self.run_command(sock, request)
+        elif op == 'status':
+            _send(sock, self.status())
+        elif op == 'stop':
+            self.stopping = True
+            _send(sock, {'stopping': True, 'pid': os.getpid()})
+        else:
+            _send(sock, {'refused': f"unknown op '{op}'"})
+
+    def serve(self):
+        global _warm
+        _warm = {}
+        if os.path.exists(self.path):
+            if _request({'op': 'status'}) is not None:
+                raise RuntimeError(f"a daemon is already listening on {self.path}")
+            os.unlink(self.path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Commands carry credentials: the socket is private to this user
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(1.0)
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, 'stopping', True))
+        print(f"🧠 KHAOS daemon {os.getpid()} listening on {self.path}", flush=True)
+        try:
+            while not self.stopping:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                except InterruptedError:
+                    continue
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        self.handle(conn)
+                    except Exception as e:
+                        print(f"⚠️  Request failed: {e}", flush=True)
+        finally:
+            server.close()
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+            print(f"👋 KHAOS daemon stopped after {self.commands} command(s)", flush=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONTROL
+# ═══════════════════════════════════════════════════════════════
+
+def daemon_status() -> Optional[Dict[str, Any]]:
+    return _request({'op': 'status'})
+
+
+def start_daemon(wait: float = 10.0) -> Optional[Dict[str, Any]]:
+    """Launch 'prompt_cli.py daemon run' detached; returns its status once it answers (None on failure)"""
+    status = daemon_status()
+    if status:
+        return status
+    import subprocess
+    with open(_log_path(), 'ab') as log:
+        subprocess.Popen([sys.executable, CLIS['prompt'][0], "daemon", "run"], stdin=subprocess.DEVNULL,
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True, cwd=_PACKAGE_DIR)
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        status = daemon_status()
+        if status:
+            return status
+    return None
+
+
+def stop_daemon(wait: float = 10.0) -> bool:
+    """Ask a running daemon to stop; True once its socket is gone (False if none was running)"""
+    if _request({'op': 'stop'}, timeout=None) is None:
+        return False
+    deadline = time.time() + wait
+    while time.time() < deadline and daemon_status() is not None:
+        time.sleep(0.05)
+    return True
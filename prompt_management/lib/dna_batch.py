@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+KHAOS DNA Batch Scorer - THE WHOLE LIBRARY IN ONE BREATH
+Complexity, effectiveness, viral coefficient and health status are weighted
+sums of count features. Here they are evaluated as NumPy vector operations over
+a prompts × features matrix, so thousands of prompts (or synthetic variants of
+them) are scored in milliseconds.
+
+The weightings mirror PromptArchaeologist._calculate_complexity,
+_predict_effectiveness, _assess_viral_potential and classify_health term for
+term, in the same order, so batch scores equal the scalar ones exactly.
+
+Requires numpy (pip install numpy); the scalar scorers do not.
+"""
+
+from typing import Dict, Iterable, List
+
+from lib.dna_features import (
+    extract_features, PERSONALITY_PATTERNS, CONFLICT_PAIRS, INSTRUCTION_MARKERS, CONDITIONAL_MARKERS,
+    FORMATTING_MARKERS, NUMBERING_MARKERS, VARIABLE_MARKERS, SECTION_MARKERS,
+    CATCHY_PHRASES, MEMORABLE_CONCEPTS, EMOTIONAL_HOOKS, METAPHOR_MARKERS, HUMOR_MARKERS
+)
+
+# Column layout of the feature matrix
+FEATURE_COLUMNS = (
+    'char_count',
+    'instruction_markers',
+    'conditional_markers',
+    'formatting_markers',
+    'personality_conflicts',
+    'numbering_markers',
+    'variable_markers',
+    'section_markers',
+    'specific_count',
+    'exactly_count',
+    'example_count',
+    'for_instance_count',
+    'constraint_markers',
+    'max_personality_ratio',
+    'catchy_phrases',
+    'memorable_concepts',
+    'emotional_hooks',
+    'has_metaphors',
+    'humor_level',
+    'word_count',
+    'unique_word_count',
+)
+COLUMN = {name: index for index, name in enumerate(FEATURE_COLUMNS)}
+
+HEALTH_LABELS = ("Excellent", "Healthy", "Problematic", "Needs Optimization")
+
+
+def _numpy():
+    """Import numpy on first use so the rest of the toolkit works without it"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Batch scoring requires numpy - install it with: pip install numpy")
+    return numpy
+
+
+def feature_row(prompt_text: str) -> List[float]:
+    """One matrix row: the count features of a prompt text, in FEATURE_COLUMNS order"""
+    features = extract_features(prompt_text)
+
+    trait_matches = [sum(1 for keyword in keywords if features.has_lower(keyword))
+                     for keywords in PERSONALITY_PATTERNS.values()]
+    total_matches = sum(trait_matches)
+    max_ratio = max(count / total_matches for count in trait_matches) if total_matches else 0.0
+
+    return [
+        features.char_count,
+        sum(features.count(m) for m in INSTRUCTION_MARKERS),
+        sum(features.count(m) for m in CONDITIONAL_MARKERS),
+        sum(features.count(m) for m in FORMATTING_MARKERS),
+        sum(1 for trait1, trait2 in CONFLICT_PAIRS if features.has_lower(trait1) and features.has_lower(trait2)),
+        sum(features.count(m) for m in NUMBERING_MARKERS),
+        sum(features.count(m) for m in VARIABLE_MARKERS),
+        sum(features.count(m) for m in SECTION_MARKERS),
+        features.count_lower('specific'),
+        features.count_lower('exactly'),
+        features.count_lower('example'),
+        features.count_lower('for instance'),
+        features.count('NEVER') + features.count('MUST'),
+        max_ratio,
+        sum(1 for phrase in CATCHY_PHRASES if features.has_lower(phrase)),
+        sum(1 for concept in MEMORABLE_CONCEPTS if features.has_lower(concept)),
+        sum(1 for hook in EMOTIONAL_HOOKS if features.has_lower(hook)),
+        1 if any(features.has_lower(metaphor) for metaphor in METAPHOR_MARKERS) else 0,
+        sum(1 for humor in HUMOR_MARKERS if features.has_lower(humor)),
+        features.word_count,
+        features.unique_word_count,
+    ]
+
+
+def feature_matrix(prompt_texts: Iterable[str]):
+    """Stack the feature rows of many prompt texts into a float64 matrix"""
+    np = _numpy()
+    rows = [feature_row(text) for text in prompt_texts]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_COLUMNS))
+
+
+def score_feature_matrix(matrix) -> Dict[str, object]:
+    """
+    Evaluate every DNA score for each row of a feature matrix
+
+    Returns:
+        Dict of arrays: complexity_score, effectiveness_score, viral_coefficient,
+        personality_conflicts and health_status (string labels)
+    """
+    np = _numpy()
+    col = {name: matrix[:, index] for name, index in COLUMN.items()}
+
+    # _calculate_complexity
+    complexity = np.minimum(
+        col['char_count'] / 1000 * 0.15 +
+        col['instruction_markers'] / 10 * 0.25 +
+        col['conditional_markers'] / 5 * 0.20 +
+        col['formatting_markers'] / 10 * 0.10 +
+        col['personality_conflicts'] * 0.15 +
+        col['numbering_markers'] * 0.10 +
+        col['variable_markers'] * 0.05,
+        10.0
+    )
+
+    # _predict_effectiveness
+    factors = (
+        np.maximum(0, 10 - complexity),
+        10 - (col['max_personality_ratio'] * 10),
+        np.minimum(col['specific_count'] * 2 + col['exactly_count'] * 2, 10),
+        np.minimum(col['example_count'] * 3 + col['for_instance_count'] * 2, 10),
+        np.maximum(0, 10 - col['constraint_markers'] * 0.5),
+        np.minimum(col['section_markers'], 10),
+        10 - np.abs(col['char_count'] - 2000) / 200,
+    )
+    total = np.zeros(len(matrix))
+    for factor in factors:
+        total = total + factor
+    effectiveness = np.minimum(np.maximum(total / len(factors), 0), 10) / 10
+
+    # _assess_viral_potential
+    words = col['word_count']
+    uniqueness = np.divide(col['unique_word_count'], words, out=np.zeros(len(matrix)), where=words > 0)
+    viral = np.minimum(
+        col['catchy_phrases'] * 0.3 +
+        col['memorable_concepts'] * 0.2 +
+        col['emotional_hooks'] * 0.2 +
+        col['has_metaphors'] * 0.15 +
+        col['humor_level'] * 0.1 +
+        uniqueness * 0.05,
+        1.0
+    )
+
+    conflicts = col['personality_conflicts']
+    return {
+        'complexity_score': complexity,
+        'effectiveness_score': effectiveness,
+        'viral_coefficient': viral,
+        'personality_conflicts': conflicts,
+        'health_status': classify_health_bulk(effectiveness, complexity, conflicts),
+    }
+
+
+def classify_health_bulk(effectiveness, complexity, conflicts):
+    """Vector form of PromptArchaeologist.classify_health (first matching rule wins)"""
+    np = _numpy()
+    conditions = [
+        (effectiveness > 0.8) & (complexity < 6) & (conflicts == 0),
+        (effectiveness > 0.7) & (complexity < 7),
+        (effectiveness < 0.4) | (complexity > 8) | (conflicts > 2),
+    ]
+    return np.select(conditions, list(HEALTH_LABELS[:3]), default=HEALTH_LABELS[3])
+
+
+def score_texts(prompt_texts: Iterable[str]) -> Dict[str, object]:
+    """Feature extraction plus vectorised scoring in one call"""
+    return score_feature_matrix(feature_matrix(prompt_texts))
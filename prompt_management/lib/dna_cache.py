@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+KHAOS DNA Profile Cache - ANALYZE ONCE, COMPARE FOREVER
+DNA profiles depend only on prompt content, so they are cached on disk keyed
+by content hash. Compare, optimize and reports reuse them; only prompts whose
+content actually changed are re-analysed.
+"""
+
+import copy
+import os
+from typing import Any, Dict, Optional
+
+from lib.local_store import cache_path, load_json, save_json
+
+
+class DNAProfileCache:
+    """One JSON file per content hash under <cache>/dna/"""
+
+    def __init__(self, analysis_version: str):
+        # Profiles computed by an older scorer are treated as misses
+        self.analysis_version = analysis_version
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, content_hash: str) -> str:
+        return cache_path("dna", content_hash[:2], f"{content_hash}.json")
+
+    def get(self, content_hash: str, prompt_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached profile for this content (re-labelled with prompt_id), or None"""
+        path = self._path(content_hash)
+        entry = load_json(path) if os.path.exists(path) else None
+        if not entry or entry.get('analysis_version') != self.analysis_version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        profile = copy.deepcopy(entry['profile'])
+        if prompt_id:
+            profile['prompt_id'] = prompt_id
+        return profile
+
+    def put(self, dna_profile: Dict[str, Any]):
+        """Store a freshly computed profile under its content hash"""
+        save_json(self._path(dna_profile['content_hash']), {
+            'analysis_version': self.analysis_version,
+            'profile': dna_profile
+        })
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+KHAOS DNA Feature Extractor - ONE PASS, EVERY MARKER
+All keyword, marker and conflict-pair patterns the DNA scorers look for are
+compiled into a single multi-pattern automaton. One scan of the prompt text
+yields every count; the scorers in PromptArchaeologist read from that feature
+vector instead of re-lowercasing and re-scanning the text dozens of times.
+
+Counts reproduce the semantics of the original scorers exactly:
+- case-sensitive markers count like str.count (non-overlapping, left to right)
+- keywords count like text.lower().count / `keyword in text.lower()`
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+# ═══════════════════════════════════════════════════════════════
+# PATTERN TABLES (shared by the extractor and the scorers)
+# ═══════════════════════════════════════════════════════════════
+
+PERSONALITY_PATTERNS = {
+    'sarcasm': ['sarcastic', 'wit', 'humor', 'cynical', 'dry humor', 'ironic', 'sardonic'],
+    'helpfulness': ['helpful', 'assist', 'support', 'guide', 'aid', 'service', 'beneficial'],
+    'authority': ['expert', 'professional', 'authority', 'specialist', 'authoritative', 'definitive'],
+    'creativity': ['creative', 'innovative', 'imaginative', 'original', 'inventive', 'artistic'],
+    'analysis': ['analyze', 'examine', 'assess', 'evaluate', 'investigate', 'scrutinize', 'dissect'],
+    'empathy': ['empathetic', 'understanding', 'compassionate', 'caring', 'sensitive'],
+    'formality': ['formal', 'professional', 'business', 'corporate', 'official'],
+    'casualness': ['casual', 'informal', 'relaxed', 'friendly', 'conversational']
+}
+
+CONFLICT_PAIRS = [
+    ('professional', 'casual'),
+    ('formal', 'informal'),
+    ('urgent', 'patient'),
+    ('detailed', 'concise'),
+    ('serious', 'humorous'),
+    ('authoritative', 'humble'),
+    ('creative', 'analytical'),
+    ('empathetic', 'detached'),
+    ('helpful', 'sarcastic')
+]
+
+INSTRUCTION_MARKERS = ['MUST', 'NEVER', 'ALWAYS', 'SHOULD']
+CONDITIONAL_MARKERS = ['IF', 'WHEN', 'UNLESS', 'EXCEPT']
+FORMATTING_MARKERS = ['```', '###', '---', '===']
+NUMBERING_MARKERS = ['1.', '2.', '3.']
+VARIABLE_MARKERS = ['{', '[', '$']
+SECTION_MARKERS = ['#', '===', '---']
+STRUCTURE_MARKERS = ['SYSTEM_INSTRUCTION', 'You are', 'OUTPUT']
+
+PERSONALITY_DEFINITION_TRAITS = ['sarcastic', 'helpful', 'professional', 'creative']
+SPECIFICITY_KEYWORDS = ['specific', 'exactly']
+EXAMPLE_KEYWORDS = ['example', 'for instance']
+STRUCTURE_KEYWORDS = ['format']
+
+CATCHY_PHRASES = ['Complexity Whisperer', 'KHAOS', 'meme machine', 'digital DNA']
+MEMORABLE_CONCEPTS = ['Schrödinger', 'quantum', 'evolution', 'archaeology']
+EMOTIONAL_HOOKS = ['chaos', 'beautiful', 'magnificent', 'brilliant']
+METAPHOR_MARKERS = ['like', 'as if', 'imagine', 'picture']
+HUMOR_MARKERS = ['sarcastic', 'wit', 'humor', 'funny', 'amusing']
+
+# Matched against the original text
+CASE_SENSITIVE_PATTERNS = (
+    INSTRUCTION_MARKERS + CONDITIONAL_MARKERS + FORMATTING_MARKERS + NUMBERING_MARKERS +
+    VARIABLE_MARKERS + SECTION_MARKERS + STRUCTURE_MARKERS
+)
+
+# Matched against text.lower()
+CASE_INSENSITIVE_PATTERNS = (
+    [keyword for keywords in PERSONALITY_PATTERNS.values() for keyword in keywords] +
+    [trait for pair in CONFLICT_PAIRS for trait in pair] +
+    PERSONALITY_DEFINITION_TRAITS + SPECIFICITY_KEYWORDS + EXAMPLE_KEYWORDS + STRUCTURE_KEYWORDS +
+    CATCHY_PHRASES + MEMORABLE_CONCEPTS + EMOTIONAL_HOOKS + METAPHOR_MARKERS + HUMOR_MARKERS
+)
+
+# The two domains are scanned as one string joined by a separator no pattern contains
+_DOMAIN_SEPARATOR = '\x00'
+
+
+class MultiPatternMatcher:
+    """
+    Compiled multi-pattern automaton (Aho-Corasick equivalent)
+
+    The pattern set is folded into a trie and compiled to a single regular
+    expression, so matching runs in the C regex engine. At each position the
+    trie yields the longest pattern starting there; every other pattern starting
+    at that position is one of its prefixes, which are precomputed - so one scan
+    recovers all (overlapping) occurrences of every pattern.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted(set(patterns))
+        if not self.patterns or any(not p or _DOMAIN_SEPARATOR in p for p in self.patterns):
+            raise ValueError("Patterns must be non-empty and must not contain the domain separator")
+
+        self._regex = re.compile(_trie_to_regex(self.patterns))
+        pattern_set = set(self.patterns)
+        self._prefix_chain = {
+            pattern: [pattern[:i] for i in range(1, len(pattern) + 1) if pattern[:i] in pattern_set]
+            for pattern in self.patterns
+        }
+
+    def occurrences(self, text: str) -> Dict[str, List[int]]:
+        """Start offsets of every occurrence of every pattern, in text order"""
+        found: Dict[str, List[int]] = {}
+        search = self._regex.search
+        position = 0
+        while True:
+            match = search(text, position)
+            if match is None:
+                return found
+            start = match.start()
+            for pattern in self._prefix_chain[match.group()]:
+                found.setdefault(pattern, []).append(start)
+            position = start + 1
+
+
+def _trie_to_regex(patterns: List[str]) -> str:
+    """Fold literal patterns into a trie-shaped regex that prefers the longest match"""
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        terminal = '' in node
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if terminal else '')
+
+    return build(trie)
+
+
+def _non_overlapping(starts: List[int], length: int) -> int:
+    """Count occurrences the way str.count does: leftmost first, no overlaps"""
+    count = 0
+    next_free = 0
+    for start in starts:
+        if start >= next_free:
+            count += 1
+            next_free = start + length
+    return count
+
+
+class DNAFeatures:
+    """Feature vector of one prompt text: marker counts plus word/line statistics"""
+
+    __slots__ = ('cased', 'lowered', 'char_count', 'word_count', 'unique_word_count',
+                 'line_count', 'instruction_lines')
+
+    def __init__(self, cased: Dict[str, int], lowered: Dict[str, int], char_count: int, word_count: int,
+                 unique_word_count: int, line_count: int, instruction_lines: int):
+        self.cased = cased
+        self.lowered = lowered
+        self.char_count = char_count
+        self.word_count = word_count
+        self.unique_word_count = unique_word_count
+        self.line_count = line_count
+        self.instruction_lines = instruction_lines
+
+    def count(self, marker: str) -> int:
+        """Case-sensitive occurrences (str.count semantics)"""
+        return self.cased[marker]
+
+    def count_lower(self, keyword: str) -> int:
+        """Occurrences in the lowercased text"""
+        return self.lowered[keyword.lower()]
+
+    def has(self, marker: str) -> bool:
+        return self.cased[marker] > 0
+
+    def has_lower(self, keyword: str) -> bool:
+        return self.lowered[keyword.lower()] > 0
+
+
+_MATCHER = MultiPatternMatcher(CASE_SENSITIVE_PATTERNS + [p.lower() for p in CASE_INSENSITIVE_PATTERNS])
+_CASED = sorted(set(CASE_SENSITIVE_PATTERNS))
+_LOWERED = sorted(set(p.lower() for p in CASE_INSENSITIVE_PATTERNS))
+
+
+@lru_cache(maxsize=32)
+def extract_features(prompt_text: str) -> DNAFeatures:
+    """Every count the DNA scorers need, from a single automaton pass"""
+    lowered_text = prompt_text.lower()
+    offset = len(prompt_text) + len(_DOMAIN_SEPARATOR)
+    occurrences = _MATCHER.occurrences(prompt_text + _DOMAIN_SEPARATOR + lowered_text)
+
+    cased = {}
+    for marker in _CASED:
+        starts = [s for s in occurrences.get(marker, ()) if s < offset]
+        cased[marker] = _non_overlapping(starts, len(marker))
+
+    lowered = {}
+    for keyword in _LOWERED:
+        starts = [s for s in occurrences.get(keyword, ()) if s >= offset]
+        lowered[keyword] = _non_overlapping(starts, len(keyword))
+
+    words = prompt_text.split()
+    lines = prompt_text.split('\n')
+
+    return DNAFeatures(
+        cased=cased,
+        lowered=lowered,
+        char_count=len(prompt_text),
+        word_count=len(words),
+        unique_word_count=len(set(lowered_text.split())),
+        line_count=len(lines),
+        instruction_lines=len([line for line in lines if line.strip().startswith(('-', '•', '1.', '2.', '3.'))])
+    )
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+KHAOS Inheritance - CHILDREN GET THE PERSONA FOR FREE
+A child prompt is composed from its parents (the lineage DAG) section by section:
+
+- a section the child leaves out or leaves empty is inherited
+- a section the child writes replaces the inherited one
+- a body whose first line is a directive combines the two:
+      @inherit   keep the inherited text (the explicit form of leaving it out)
+      @extend    the inherited text, then the child's
+      @prepend   the child's text, then the inherited
+      @remove    drop the section
+- with several parents, the first one listed wins where they disagree
+
+Resolutions are memoised under a key hashing the prompt's ID, its own sections
+and the keys of its parents, i.e. its whole ancestry (the ID is in it because a
+resolution names the prompts its sections came from). Editing a prompt changes
+its key and its descendants' keys and nothing else, so after an edit every
+unaffected subtree is reused, and resolving the library composes each shared
+ancestor once.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from lib.lineage import LineageIndex
+from lib.prompt_archaeologist import DNA_CONTENT_FIELDS
+from lib.prompt_parser import header_name
+
+# Sections a child inherits, in rendering order
+INHERITED_SECTIONS = (*DNA_CONTENT_FIELDS, 'Core Message', 'Execution Parameters')
+
+DIRECTIVES = ('@inherit', '@extend', '@prepend', '@remove')
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def split_directive(body: str) -> tuple:
+    """'@extend\\nMore text' -> ('@extend', 'More text'); bodies without a directive -> (None, body)"""
+    first_line, _, rest = body.partition('\n')
+    directive = first_line.strip().lower()
+    if directive in DIRECTIVES:
+        return directive, rest.strip()
+    return None, body
+
+
+class InheritanceResolver:
+    """Composes prompts from their ancestors with per-ancestry memoisation"""
+
+    def __init__(self, lineage: LineageIndex):
+        self.lineage = lineage
+        # Prompt ID -> own non-empty sections, and its Version (a label, not part of the ancestry key)
+        self.sections: Dict[str, Dict[str, str]] = {}
+        self.versions: Dict[str, str] = {}
+        self._digests: Dict[str, str] = {}
+        # Prompt ID -> ancestry key, and ancestry key -> {'sections', 'origins'}
+        self._keys: Dict[str, str] = {}
+        self._memo: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.composed = 0
+        self.reused = 0
+
+    # ═══════════════════════════════════════════════════════════════
+    # LOADING AND INVALIDATION
+    # ═══════════════════════════════════════════════════════════════
+
+    def update(self, prompt_id: str, sections: Dict[str, Optional[str]]) -> bool:
+        """Set a prompt's own sections; returns False (and keeps every memo) when they did not change"""
+        own = {field: sections[field].strip() for field in INHERITED_SECTIONS
+               if sections.get(field) and sections[field].strip()}
+        if self.sections.get(prompt_id) == own:
+            return False
+        self.sections[prompt_id] = own
+        self.invalidate(prompt_id)
+        return True
+
+    def remove(self, prompt_id: str):
+        if self.sections.pop(prompt_id, None) is not None:
+            self.versions.pop(prompt_id, None)
+            self.invalidate(prompt_id)
+
+    def apply_pages(self, records: Iterable) -> List[str]:
+        """
+        Patch parents and sections from scanned prompt records (the lineage index is patched too)
+
+        Returns:
+            Prompts whose own sections or parents changed - they and their descendants get re-resolved
+        """
+        records = [record for record in records if record.get('Prompt ID')]
+        previous_parents = {record['Prompt ID']: self.lineage.parents(record['Prompt ID']) for record in records}
+        self.lineage.apply_pages(records)
+
+        changed = []
+        for record in records:
+            prompt_id = record['Prompt ID']
+            self.versions[prompt_id] = record.get('Version') or ''
+            relinked = self.lineage.parents(prompt_id) != previous_parents[prompt_id]
+            if self.update(prompt_id, {field: record.get(field) for field in INHERITED_SECTIONS}) or relinked:
+                self.invalidate(prompt_id)
+                changed.append(prompt_id)
+        return changed
+
+    def invalidate(self, prompt_id: str):
+        """Forget the ancestry keys of a prompt and its descendants (nothing else is affected)"""
+        self._digests.pop(prompt_id, None)
+        self._keys.pop(prompt_id, None)
+        for descendant, _ in self.lineage.descendants(prompt_id):
+            self._keys.pop(descendant, None)
+
+    def prune(self) -> int:
+        """Drop memoised resolutions no current prompt resolves to; returns how many were dropped"""
+        live = set(self._keys.values())
+        stale = [key for key in self._memo if key not in live]
+        for key in stale:
+            del self._memo[key]
+        return len(stale)
+
+    # ═══════════════════════════════════════════════════════════════
+    # RESOLUTION
+    # ═══════════════════════════════════════════════════════════════
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self.sections
+
+    def resolve(self, prompt_id: str) -> Dict[str, Any]:
+        """
+        The composed prompt
+
+        Returns:
+            {'prompt_id', 'version', 'key', 'sections': {field: text}, 'origins': {field: contributing prompt(s)}}
+        """
+        if prompt_id not in self.sections:
+            raise KeyError(prompt_id)
+        if prompt_id in self._keys:
+            self.reused += 1
+        else:
+            self._settle_ancestry(prompt_id)
+        key = self._keys[prompt_id]
+        return {'prompt_id': prompt_id, 'version': self.versions.get(prompt_id, ''), 'key': key, **self._memo[key]}
+
+    def resolve_all(self) -> Dict[str, Dict[str, Any]]:
+        """Every prompt in the library; shared ancestors are composed once"""
+        return {prompt_id: self.resolve(prompt_id) for prompt_id in sorted(self.sections)}
+
+    def ancestry_key(self, prompt_id: str) -> str:
+        """Hash over the prompt's ID and own sections and those of all its ancestors"""
+        return self.resolve(prompt_id)['key']
+
+    def _settle_ancestry(self, prompt_id: str):
+        """Key (and compose, unless memoised) the prompt and every unkeyed ancestor, parents first"""
+        # Iterative post-order walk so deep chains cannot hit the recursion limit; parent cycles are cut
+        stack = [(prompt_id, False)]
+        in_progress = set()
+        edges: Dict[str, List[str]] = {}
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._keys or (current in in_progress and not expanded):
+                continue
+            if not expanded:
+                edges[current] = [parent for parent in self.lineage.parents(current)
+                                  if parent in self.sections and parent not in in_progress]
+                pending = [parent for parent in edges[current] if parent not in self._keys]
+                if pending:
+                    in_progress.add(current)
+                    stack.append((current, True))
+                    stack.extend((parent, False) for parent in pending)
+                    continue
+            in_progress.discard(current)
+            self._settle(current, [parent for parent in edges[current] if parent in self._keys])
+
+    def _settle(self, prompt_id: str, parents: List[str]):
+        if prompt_id not in self._digests:
+            self._digests[prompt_id] = _digest(self.sections[prompt_id])
+        key = _digest([prompt_id, self._digests[prompt_id], [self._keys[parent] for parent in parents]])
+        if key in self._memo:
+            self.reused += 1
+        else:
+            self._memo[key] = self._compose(prompt_id, [self._memo[self._keys[parent]] for parent in parents])
+            self.composed += 1
+        self._keys[prompt_id] = key
+
+    def _compose(self, prompt_id: str, parent_results: List[Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """Apply the prompt's own sections over its parents' resolutions"""
+        sections: Dict[str, str] = {}
+        origins: Dict[str, str] = {}
+        # Later parents first, so the first listed parent overwrites them
+        for parent in reversed(parent_results):
+            sections.update(parent['sections'])
+            origins.update(parent['origins'])
+
+        for field, body in self.sections[prompt_id].items():
+            directive, text = split_directive(body)
+            inherited = sections.get(field)
+            if directive == '@inherit' or (directive in ('@extend', '@prepend') and not text):
+                continue
+            if directive == '@remove':
+                sections.pop(field, None)
+                origins.pop(field, None)
+            elif directive == '@extend' and inherited:
+                sections[field] = f"{inherited}\n\n{text}"
+                origins[field] = f"{origins[field]} + {prompt_id}"
+            elif directive == '@prepend' and inherited:
+                sections[field] = f"{text}\n\n{inherited}"
+                origins[field] = f"{prompt_id} + {origins[field]}"
+            else:
+                sections[field] = text
+                origins[field] = prompt_id
+
+        return {
+            'sections': {field: sections[field] for field in INHERITED_SECTIONS if field in sections},
+            'origins': {field: origins[field] for field in INHERITED_SECTIONS if field in origins},
+        }
+
+    # ═══════════════════════════════════════════════════════════════
+    # RENDERING
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def render(resolved: Dict[str, Any]) -> str:
+        """The composed prompt in template form (PROMPT_ID: first, then one header per section)"""
+        parts = [f"PROMPT_ID: {resolved['prompt_id']}"]
+        parts.extend(f"{header_name(field)}: {text}" for field, text in resolved['sections'].items())
+        return '\n\n'.join(parts) + '\n'
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+KHAOS Lineage Engine - THE FAMILY TREE OF EVERY PROMPT
+Parent relations ('Parent Prompts' text and the 'Parent Prompt' relation) are
+loaded in one bulk scan into forward (child -> parents) and reverse
+(parent -> children) adjacency indexes. Ancestor and descendant queries are
+answered by BFS over the index and memoised until the graph changes.
+
+The index is cached on disk with a last_edited_time watermark: later loads
+only fetch pages edited since, and patch their nodes in place.
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lib.local_store import cache_path, load_json, save_json
+
+INDEX_VERSION = 1
+
+# 'Parent Prompts' values that mean "no parent"
+NO_PARENT_MARKERS = {'', 'root', 'none', 'n/a', 'na', '-', 'null'}
+
+_PARENT_SEPARATOR = re.compile(r'[,;\n]|\s+&\s+|\s+and\s+')
+_PARENTHETICAL = re.compile(r'\([^)]*\)')
+
+
+def parse_parent_prompts(value: Optional[str]) -> List[str]:
+    """'khaos-core-persona, khaos-coder (v2)' -> ['khaos-core-persona', 'khaos-coder']"""
+    parents = []
+    for part in _PARENT_SEPARATOR.split(_PARENTHETICAL.sub('', value or '')):
+        name = part.strip().strip('"\'`*')
+        if name.lower() not in NO_PARENT_MARKERS and name not in parents:
+            parents.append(name)
+    return parents
+
+
+class LineageIndex:
+    """Forward and reverse parent/child adjacency over Prompt IDs"""
+
+    def __init__(self, database_id: Optional[str] = None):
+        self.database_id = database_id
+        self.watermark: Optional[str] = None
+        # page id -> {'prompt_id', 'parents' (Prompt IDs), 'relation_parents' (page ids), 'last_edited'}
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self._parents: Dict[str, List[str]] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._ancestor_memo: Dict[str, List[Tuple[str, int]]] = {}
+        self._descendant_memo: Dict[str, List[Tuple[str, int]]] = {}
+        self._generation_memo: Dict[str, int] = {}
+
+    # ═══════════════════════════════════════════════════════════════
+    # BUILDING AND PATCHING
+    # ═══════════════════════════════════════════════════════════════
+
+    def apply_pages(self, records: Iterable) -> int:
+        """Insert or replace the nodes of scanned prompt records; returns how many were applied"""
+        applied = 0
+        for record in records:
+            page = record.page
+            self.nodes[page['id']] = {
+                'prompt_id': record.get('Prompt ID') or page['id'],
+                'parents': parse_parent_prompts(record.get('Parent Prompts')),
+                'relation_parents': list(record.get('Parent Prompt') or []),
+                'last_edited': page.get('last_edited_time'),
+            }
+            if page.get('last_edited_time') and (self.watermark is None or page['last_edited_time'] > self.watermark):
+                self.watermark = page['last_edited_time']
+            applied += 1
+        self._rebuild_adjacency()
+        return applied
+
+    def remove_page(self, page_id: str):
+        """Drop a page (e.g. after it was archived)"""
+        if self.nodes.pop(page_id, None) is not None:
+            self._rebuild_adjacency()
+
+    def _rebuild_adjacency(self):
+        """Derive both adjacency indexes from the nodes; clears every memo"""
+        prompt_of_page = {page_id: node['prompt_id'] for page_id, node in self.nodes.items()}
+
+        parents: Dict[str, List[str]] = {}
+        for node in self.nodes.values():
+            merged = parents.setdefault(node['prompt_id'], [])
+            related = [prompt_of_page[page_id] for page_id in node['relation_parents'] if page_id in prompt_of_page]
+            for parent in node['parents'] + related:
+                if parent != node['prompt_id'] and parent not in merged:
+                    merged.append(parent)
+
+        children: Dict[str, List[str]] = {}
+        for child, child_parents in parents.items():
+            for parent in child_parents:
+                children.setdefault(parent, []).append(child)
+
+        self._parents = parents
+        self._children = {parent: sorted(kids) for parent, kids in children.items()}
+        self._ancestor_memo.clear()
+        self._descendant_memo.clear()
+        self._generation_memo.clear()
+
+    # ═══════════════════════════════════════════════════════════════
+    # QUERIES
+    # ═══════════════════════════════════════════════════════════════
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self._parents or prompt_id in self._children
+
+    def parents(self, prompt_id: str) -> List[str]:
+        return list(self._parents.get(prompt_id, []))
+
+    def children(self, prompt_id: str) -> List[str]:
+        return list(self._children.get(prompt_id, []))
+
+    def ancestors(self, prompt_id: str) -> List[Tuple[str, int]]:
+        """(ancestor, distance) pairs, nearest first"""
+        if prompt_id not in self._ancestor_memo:
+            self._ancestor_memo[prompt_id] = self._bfs(prompt_id, self._parents)
+        return self._ancestor_memo[prompt_id]
+
+    def descendants(self, prompt_id: str) -> List[Tuple[str, int]]:
+        """(descendant, distance) pairs, nearest first"""
+        if prompt_id not in self._descendant_memo:
+            self._descendant_memo[prompt_id] = self._bfs(prompt_id, self._children)
+        return self._descendant_memo[prompt_id]
+
+    def generation(self, prompt_id: str) -> int:
+        """1 for roots, otherwise one more than the deepest parent (cycles are cut)"""
+        if prompt_id in self._generation_memo:
+            return self._generation_memo[prompt_id]
+
+        # Iterative post-order walk so deep chains cannot hit the recursion limit
+        stack = [(prompt_id, False)]
+        in_progress = set()
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._generation_memo:
+                continue
+            parents = [p for p in self._parents.get(current, []) if p not in in_progress]
+            if expanded or not parents:
+                known = [self._generation_memo[p] for p in parents if p in self._generation_memo]
+                self._generation_memo[current] = 1 + max(known, default=0)
+                in_progress.discard(current)
+                continue
+            in_progress.add(current)
+            stack.append((current, True))
+            stack.extend((parent, False) for parent in parents if parent not in self._generation_memo)
+        return self._generation_memo[prompt_id]
+
+    def roots(self) -> List[str]:
+        """Prompts without parents, plus referenced parents that are not in the library"""
+        all_ids = set(self._parents) | set(self._children)
+        return sorted(prompt_id for prompt_id in all_ids if not self._parents.get(prompt_id))
+
+    def is_known(self, prompt_id: str) -> bool:
+        """True if the prompt exists in the library (not just referenced as a parent)"""
+        return prompt_id in self._parents
+
+    @staticmethod
+    def _bfs(start: str, adjacency: Dict[str, List[str]]) -> List[Tuple[str, int]]:
+        distances = {start: 0}
+        queue = deque([start])
+        found = []
+        while queue:
+            current = queue.popleft()
+            for neighbour in adjacency.get(current, []):
+                if neighbour not in distances:
+                    distances[neighbour] = distances[current] + 1
+                    found.append((neighbour, distances[neighbour]))
+                    queue.append(neighbour)
+        return found
+
+    # ═══════════════════════════════════════════════════════════════
+    # RENDERING
+    # ═══════════════════════════════════════════════════════════════
+
+    def render_tree(self, root: str, rendered: Optional[set] = None) -> List[str]:
+        """Tree lines below one prompt; subtrees already shown are referenced, not repeated"""
+        rendered = set() if rendered is None else rendered
+        lines = [self._label(root)]
+        rendered.add(root)
+        stack = [(child, '', index == len(self.children(root)) - 1)
+                 for index, child in reversed(list(enumerate(self.children(root))))]
+        while stack:
+            node, prefix, last = stack.pop()
+            branch = '└── ' if last else '├── '
+            if node in rendered:
+                lines.append(f"{prefix}{branch}{self._label(node)} ↑ (see above)")
+                continue
+            rendered.add(node)
+            lines.append(f"{prefix}{branch}{self._label(node)}")
+            kids = self.children(node)
+            child_prefix = prefix + ('    ' if last else '│   ')
+            stack.extend((child, child_prefix, index == len(kids) - 1)
+                         for index, child in reversed(list(enumerate(kids))))
+        return lines
+
+    def render_forest(self) -> List[str]:
+        """Every family tree in the library; prompts trapped in parent cycles are listed last"""
+        lines = []
+        rendered = set()
+        for root in self.roots():
+            lines.extend(self.render_tree(root, rendered))
+            lines.append('')
+
+        orphans = sorted(set(self._parents) - rendered)
+        if orphans:
+            lines.append("⚠️  Parent cycles (no root ancestor):")
+            lines.extend(f"  • {prompt_id} ← {', '.join(self.parents(prompt_id))}" for prompt_id in orphans)
+        return lines
+
+    def _label(self, prompt_id: str) -> str:
+        label = f"{prompt_id} (Gen {self.generation(prompt_id)})"
+        return label if self.is_known(prompt_id) else f"{prompt_id} ❓ not in library"
+
+    # ═══════════════════════════════════════════════════════════════
+    # DISK CACHE
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _cache_file() -> str:
+        return cache_path("lineage", "index.json")
+
+    @classmethod
+    def load(cls, database_id: str) -> Optional['LineageIndex']:
+        """Cached index for this database, or None"""
+        data = load_json(cls._cache_file())
+        if not data or data.get('version') != INDEX_VERSION or data.get('database_id') != database_id:
+            return None
+        index = cls(database_id)
+        index.watermark = data.get('watermark')
+        index.nodes = data.get('nodes', {})
+        index._rebuild_adjacency()
+        return index
+
+    def save(self):
+        save_json(self._cache_file(), {
+            'version': INDEX_VERSION,
+            'database_id': self.database_id,
+            'watermark': self.watermark,
+            'nodes': self.nodes,
+        })
+
+    @classmethod
+    def invalidate(cls):
+        """Forget the cached index (the next load rebuilds from a full scan)"""
+        save_json(cls._cache_file(), {})
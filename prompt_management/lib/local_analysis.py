@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+KHAOS Local Analysis - DNA TESTS BEFORE THE SPECIMEN LEAVES THE LAB
+Analyses template files straight from disk with the pure archaeology core:
+no Notion client, no network calls. Files are parsed and scored in a process
+pool and results are yielded as soon as each file is done.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from lib.prompt_archaeologist import DNA_CONTENT_FIELDS, get_worker_archaeologist
+from lib.prompt_parser import parse_prompt_text
+
+TEMPLATE_EXTENSIONS = ('.txt', '.md')
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """Resolve files, directories (recursively, templates only) and globs to a de-duplicated file list"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(TEMPLATE_EXTENSIONS))
+        elif glob.has_magic(pattern):
+            files.extend(path for path in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(path))
+        else:
+            files.append(pattern)
+
+    seen = set()
+    unique = []
+    for path in files:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def read_template(path: str) -> Dict[str, Any]:
+    """
+    Parse a template file into the prompt record analysis works on
+
+    Structured templates are analysed on their content sections, exactly like a
+    prompt stored in Notion. Free-form documents (no recognised sections) are
+    analysed as a whole.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+
+    archaeologist = get_worker_archaeologist()
+    sections = parse_prompt_text(text)
+    prompt_text = archaeologist.compose_prompt_text(sections, DNA_CONTENT_FIELDS)
+    return {
+        'prompt_id': sections.get('Prompt ID') or os.path.splitext(os.path.basename(path))[0],
+        'sections': sections,
+        'structured': bool(prompt_text),
+        'prompt_text': prompt_text or text.strip(),
+    }
+
+
+def analyze_template_file(path: str) -> Dict[str, Any]:
+    """Analysis row for one file (process pool entry point; errors are reported, not raised)"""
+    try:
+        template = read_template(path)
+        if not template['prompt_text']:
+            return {'file': path, 'prompt_id': template['prompt_id'], 'error': 'empty file'}
+
+        archaeologist = get_worker_archaeologist()
+        dna_profile = archaeologist.build_dna_profile(template['prompt_id'], template['prompt_text'])
+    except Exception as e:
+        return {'file': path, 'error': str(e)}
+
+    return {
+        'file': path,
+        'prompt_id': template['prompt_id'],
+        'structured': template['structured'],
+        'sections': len(template['sections']),
+        'content_hash': dna_profile['content_hash'],
+        'token_count': dna_profile['token_count'],
+        'complexity_score': round(dna_profile['complexity_score'], 2),
+        'effectiveness_score': round(dna_profile['effectiveness_score'], 3),
+        'viral_coefficient': round(dna_profile['viral_potential']['viral_coefficient'], 2),
+        'personality_conflicts': dna_profile['personality_conflicts'],
+        'health_status': archaeologist.classify_health(dna_profile),
+    }
+
+
+def analyze_files(paths: List[str], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Analyse files in a process pool, yielding one row per file in input order as results arrive"""
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield analyze_template_file(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(analyze_template_file, paths)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+KHAOS Local Store - WHERE THE ARCHAEOLOGIST KEEPS THE FIELD NOTES
+Shared location and atomic JSON helpers for every on-disk cache and index,
+so repeat commands can skip work instead of re-asking Notion.
+
+Set PROMPT_CACHE_DIR in .env to move the store (default: prompt_management/.khaos_cache)
+"""
+
+import json
+import os
+import tempfile
+from typing import Any
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".khaos_cache")
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Load .env into the environment once (python-dotenv is only imported the first time)"""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def cache_path(*parts: str) -> str:
+    """Absolute path inside the local store; parent directories are created on demand"""
+    root = os.getenv("PROMPT_CACHE_DIR") or DEFAULT_CACHE_DIR
+    path = os.path.join(root, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def load_json(path: str, default: Any = None) -> Any:
+    """Read a JSON file, returning default when it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path: str, data: Any):
+    """Write JSON atomically (temp file + rename) so readers never see a torn file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
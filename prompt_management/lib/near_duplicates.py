@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+KHAOS Near-Duplicate Detector - FINDING THE CLONES IN THE GENE POOL
+MinHash signatures over word shingles, grouped with LSH banding, so close
+copies are found without comparing every prompt with every other one.
+
+- each prompt's content becomes a set of 5-word shingles
+- a 128-value MinHash signature estimates Jaccard similarity between sets
+- signatures are split into bands; prompts sharing any band bucket become
+  candidates. A pair of similarity s is a candidate with probability
+  1-(1-s^rows)^bands, so the band shape is derived from the threshold: the
+  longest bands that still catch pairs at the threshold 99% of the time
+  (0.5 -> 42 bands of 3, 0.3 -> 64 bands of 2, 0.8 -> 21 bands of 6)
+- candidates are verified against the threshold and joined into clusters
+
+Signatures are cached on disk by content hash (the DNA Hash), so reruns only
+shingle and hash prompts whose content changed.
+"""
+
+import random
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Sequence, Tuple
+
+from lib.local_store import cache_path, load_json, save_json
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+DEFAULT_THRESHOLD = 0.5
+# Chance a pair exactly at the threshold must have of becoming a candidate
+CANDIDATE_RECALL = 0.99
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r'\w+')
+
+# Fixed seed: signatures must be comparable across runs and machines
+_rng = random.Random(20250520)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+# Cached signatures are only valid for the parameters that produced them
+SIGNATURE_PARAMS = f"k{SHINGLE_SIZE}-p{NUM_PERMUTATIONS}-s20250520"
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Hashed word n-grams of the lowercased text (stable across processes)"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(shingle_set: set) -> List[int]:
+    """MinHash signature: the minimum of each universal hash permutation over the shingle set"""
+    if not shingle_set:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    values = list(shingle_set)
+    return [min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in values) for a, b in _PERMUTATIONS]
+
+
+def estimated_similarity(signature_a: Sequence[int], signature_b: Sequence[int]) -> float:
+    """Fraction of agreeing signature positions - an unbiased Jaccard estimate"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+class SignatureCache:
+    """MinHash signatures keyed by content hash, in one JSON file under <cache>/minhash/"""
+
+    def __init__(self):
+        self.path = cache_path("minhash", "signatures.json")
+        stored = load_json(self.path, default={}) or {}
+        self._signatures = stored.get('signatures', {}) if stored.get('params') == SIGNATURE_PARAMS else {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def signature(self, content_hash: str, text: str) -> List[int]:
+        """Cached signature for this content, computed on a miss"""
+        signature = self._signatures.get(content_hash)
+        if signature is not None:
+            self.hits += 1
+            return signature
+
+        self.misses += 1
+        signature = minhash_signature(shingles(text))
+        self._signatures[content_hash] = signature
+        self._dirty = True
+        return signature
+
+    def save(self):
+        if self._dirty:
+            save_json(self.path, {'params': SIGNATURE_PARAMS, 'signatures': self._signatures})
+            self._dirty = False
+
+
+def band_shape(threshold: float, recall: float = CANDIDATE_RECALL) -> Tuple[int, int]:
+    """
+    (bands, rows per band) for a similarity threshold
+
+    Longer bands mean fewer false candidates; the longest ones are chosen for which a
+    pair at the threshold still becomes a candidate with at least the given probability.
+    """
+    for rows in range(NUM_PERMUTATIONS, 1, -1):
+        bands = NUM_PERMUTATIONS // rows
+        if 1 - (1 - max(threshold, 0.0) ** rows) ** bands >= recall:
+            return bands, rows
+    return NUM_PERMUTATIONS, 1
+
+
+def candidate_pairs(signatures: Dict[str, List[int]], threshold: float = DEFAULT_THRESHOLD) -> set:
+    """LSH banding: keys that share at least one identical band (band shape from the threshold)"""
+    bands, rows = band_shape(threshold)
+    candidates = set()
+    for band in range(bands):
+        start = band * rows
+        buckets = defaultdict(list)
+        for key, signature in signatures.items():
+            buckets[tuple(signature[start:start + rows])].append(key)
+        for members in buckets.values():
+            if len(members) > 1:
+                candidates.update(combinations(sorted(members), 2))
+    return candidates
+
+
+def find_duplicate_clusters(signatures: Dict[str, List[int]],
+                            threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Group near-duplicates
+
+    Args:
+        signatures: key (Prompt ID or file) -> MinHash signature
+        threshold: minimum estimated Jaccard similarity for a pair to count
+
+    Returns:
+        Clusters, most similar first: {'members': [...], 'pairs': [(a, b, similarity), ...]}
+    """
+    pairs = []
+    for a, b in candidate_pairs(signatures, threshold):
+        similarity = estimated_similarity(signatures[a], signatures[b])
+        if similarity >= threshold:
+            pairs.append((a, b, similarity))
+
+    # Union-find over the verified pairs
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for a, b, _ in pairs:
+        parent[find(a)] = find(b)
+
+    clusters = defaultdict(lambda: {'members': set(), 'pairs': []})
+    for a, b, similarity in pairs:
+        cluster = clusters[find(a)]
+        cluster['members'].update((a, b))
+        cluster['pairs'].append((a, b, similarity))
+
+    result = []
+    for cluster in clusters.values():
+        result.append({
+            'members': sorted(cluster['members']),
+            'pairs': sorted(cluster['pairs'], key=lambda pair: -pair[2])
+        })
+    return sorted(result, key=lambda cluster: -cluster['pairs'][0][2])
+
+
+def detect_duplicates(items: List[Tuple[str, str, str]], threshold: float = DEFAULT_THRESHOLD) -> Dict:
+    """
+    Near-duplicate clusters for (key, content_hash, text) items, using the signature cache
+
+    Returns:
+        {'clusters': [...], 'computed': signatures computed, 'cached': signatures reused}
+    """
+    cache = SignatureCache()
+    signatures = {key: cache.signature(content_hash, text) for key, content_hash, text in items}
+    cache.save()
+    return {
+        'clusters': find_duplicate_clusters(signatures, threshold),
+        'computed': cache.misses,
+        'cached': cache.hits,
+    }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+KHAOS Notion Write Buffer - SAY IT ONCE, AND ONLY IF IT CHANGED
+Write-behind layer for page property updates:
+- outgoing properties are diffed against the last known page state, so
+  re-sending identical values costs nothing
+- timestamp-only updates (Last Modified, Analysis Date) are dropped
+- several pending updates to one page merge into a single page update
+- pending writes flush at a size threshold, on demand and at exit
+"""
+
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from lib.rate_limit import RateLimiter
+
+# Bookkeeping stamps: written alongside real changes, never on their own
+TOUCH_PROPERTIES = frozenset({'Last Modified', 'Last Modification Date', 'Analysis Date', 'Last Analysis Date'})
+
+
+def canonical_property_value(prop: Optional[Dict]) -> Any:
+    """Reduce an outgoing payload or a stored page property to a comparable value"""
+    if not prop:
+        return None
+    for text_key in ('title', 'rich_text'):
+        if text_key in prop:
+            return ''.join(part.get('plain_text', part.get('text', {}).get('content', ''))
+                           for part in prop[text_key] or [])
+    if 'number' in prop:
+        return prop['number']
+    if 'select' in prop:
+        return (prop['select'] or {}).get('name')
+    if 'multi_select' in prop:
+        return tuple(option['name'] for option in prop['multi_select'] or [])
+    if 'date' in prop:
+        return (prop['date'] or {}).get('start')
+    if 'relation' in prop:
+        return tuple(rel['id'] for rel in prop['relation'] or [])
+    if 'checkbox' in prop:
+        return prop['checkbox']
+    # Unknown shapes never compare equal, so they are always sent
+    return object()
+
+
+class NotionWriteBuffer:
+    """Coalescing, no-op-suppressing buffer in front of a storage backend's page updates"""
+
+    def __init__(self, storage, limiter: Optional[RateLimiter] = None,
+                 max_pending: int = 25, max_workers: int = 4):
+        self.storage = storage
+        self.limiter = limiter or RateLimiter()
+        self.max_pending = max_pending
+        self.max_workers = max_workers
+        self._known: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.RLock()
+        self.stats = {'requested': 0, 'suppressed': 0, 'merged': 0, 'sent': 0, 'failed': 0}
+        # Executors are shut down by the time atexit handlers run: send leftovers one by one
+        atexit.register(self.flush, concurrent=False)
+
+    def observe(self, page_id: str, page_properties: Dict[str, Dict]):
+        """Record the state of a page as last read from the store"""
+        with self._lock:
+            self._known[page_id] = page_properties
+
+    def update(self, page_id: str, properties: Dict[str, Dict], touched: bool = False) -> str:
+        """
+        Stage a property update for a page
+
+        Args:
+            touched: the page was just changed by a direct write, so timestamps are sent even on their own
+
+        Returns:
+            'suppressed' when nothing would change, otherwise 'queued'
+        """
+        with self._lock:
+            self.stats['requested'] += 1
+            changed = self._diff(page_id, properties)
+            pending = self._pending.get(page_id, {})
+
+            # Timestamps alone are not worth an API call
+            if not (set(changed) | set(pending)) - (set() if touched else TOUCH_PROPERTIES):
+                self.stats['suppressed'] += 1
+                return 'suppressed'
+
+            if page_id in self._pending:
+                self.stats['merged'] += 1
+            self._pending[page_id] = {**pending, **changed}
+            should_flush = len(self._pending) >= self.max_pending
+
+        if should_flush:
+            self.flush()
+        return 'queued'
+
+    def record(self, page_id: str, properties: Dict[str, Dict]):
+        """Note properties just written to the store directly, so staging them again is a no-op"""
+        with self._lock:
+            known = self._known.get(page_id)
+            if known is not None:
+                self._known[page_id] = {**known, **properties}
+
+    def discard(self, page_id: str):
+        """Forget pending writes and known state for a page (e.g. after archiving it)"""
+        with self._lock:
+            self._pending.pop(page_id, None)
+            self._known.pop(page_id, None)
+
+    def clear(self):
+        """Start afresh: forget known page state (pages may have changed elsewhere) and the counters"""
+        with self._lock:
+            self._known.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def flush(self, concurrent: bool = True) -> List[str]:
+        """Send every pending update, one page update per page; returns failed page ids"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return []
+
+        if concurrent and len(batch) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batch))) as pool:
+                results = list(pool.map(lambda item: self._send(*item), batch.items()))
+        else:
+            results = [self._send(*item) for item in batch.items()]
+        return [page_id for page_id, ok in zip(batch, results) if not ok]
+
+    def report(self) -> str:
+        """One-line summary of how many API calls coalescing saved"""
+        saved = self.stats['requested'] - self.stats['sent'] - self.stats['failed']
+        return (f"📉 Write coalescing: {self.stats['requested']} updates requested, "
+                f"{self.stats['sent']} API calls sent ({saved} saved: "
+                f"{self.stats['suppressed']} no-ops, {self.stats['merged']} merged)")
+
+    def _diff(self, page_id: str, properties: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Keep only the properties whose value differs from the last known state"""
+        known = self._known.get(page_id)
+        if known is None:
+            return dict(properties)
+        return {name: value for name, value in properties.items()
+                if canonical_property_value(value) != canonical_property_value(known.get(name))}
+
+    def _send(self, page_id: str, properties: Dict[str, Dict]) -> bool:
+        try:
+            self.limiter.call(self.storage.update, page_id, properties)
+        except Exception as e:
+            print(f"❌ Error updating page {page_id}: {e}")
+            with self._lock:
+                self.stats['failed'] += 1
+            return False
+
+        with self._lock:
+            self.stats['sent'] += 1
+            if page_id in self._known:
+                self._known[page_id] = {**self._known[page_id], **properties}
+        return True
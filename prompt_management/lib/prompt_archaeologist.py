@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+KHAOS Prompt Archaeologist - PURE DNA ANALYSIS CORE
+Everything needed to analyze prompt text, with no Notion dependency.
+Safe to run in worker processes: the batch commands fan analysis out across CPUs.
+"""
+
+import hashlib
+import random
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
+
+from lib.dna_features import (
+    extract_features, PERSONALITY_PATTERNS, CONFLICT_PAIRS, INSTRUCTION_MARKERS, CONDITIONAL_MARKERS,
+    FORMATTING_MARKERS, NUMBERING_MARKERS, VARIABLE_MARKERS, SECTION_MARKERS, PERSONALITY_DEFINITION_TRAITS,
+    EXAMPLE_KEYWORDS, CATCHY_PHRASES, MEMORABLE_CONCEPTS, EMOTIONAL_HOOKS, METAPHOR_MARKERS, HUMOR_MARKERS
+)
+from lib.token_counter import count_tokens
+
+# Content fields combined into the analysed prompt text (order matters for the DNA hash)
+DNA_CONTENT_FIELDS = (
+    'Purpose', 'Context', 'System Instructions', 'Instruction',
+    'User Input Expectation', 'Output Format', 'Few-Shot Examples', 'Notes'
+)
+
+# The Prompt Archaeologist's analytical personality
+ARCHAEOLOGIST_PERSONALITY = MappingProxyType({
+    "sherlock_holmes_deduction": 0.60,
+    "marie_kondo_organization": 0.25,
+    "attenborough_fascination": 0.15
+})
+
+ANALYSIS_PHRASES = MappingProxyType({
+    "sherlock": (
+        "Fascinating specimen you've brought me",
+        "Elementary pattern recognition reveals",
+        "The evidence clearly indicates",
+        "Deductive analysis suggests",
+        "Most curious behavioral patterns detected"
+    ),
+    "kondo": (
+        "This prompt does not spark joy",
+        "Time for some surgical reorganization",
+        "Let's declutter this instruction chaos",
+        "Ruthless optimization is required",
+        "Marie would not approve of this mess"
+    ),
+    "attenborough": (
+        "Observe this remarkable evolutionary adaptation",
+        "In the wild digital ecosystem",
+        "This species of prompt has developed",
+        "Natural selection has favored",
+        "A truly magnificent specimen"
+    )
+})
+
+
+class PromptArchaeologist:
+    """The analytical personality and DNA scoring algorithms behind every report"""
+    
+    # Bump whenever a scorer changes so cached DNA profiles are recomputed
+    ANALYSIS_VERSION = "2"
+    
+    # The analytical personality, shared by every instance
+    archaeologist_personality = ARCHAEOLOGIST_PERSONALITY
+    analysis_phrases = ANALYSIS_PHRASES
+    
+    def _get_analysis_phrase(self, personality_type: str) -> str:
+        """Get a contextual phrase based on personality type"""
+        return random.choice(self.analysis_phrases[personality_type])
+    
+    # ═══════════════════════════════════════════════════════════════
+    # DNA PROFILE ASSEMBLY
+    # ═══════════════════════════════════════════════════════════════
+    
+    def compose_prompt_text(self, prompt_data, content_fields) -> str:
+        """Combine the content fields of a prompt record into the analysed text"""
+        content_parts = []
+        
+        for field in content_fields:
+            field_content = prompt_data.get(field, '')
+            if field_content and field_content.strip():
+                content_parts.append(f"{field}: {field_content}")
+        
+        return '\n\n'.join(content_parts)
+    
+    def build_dna_profile(self, prompt_id: str, prompt_text: str) -> Dict[str, Any]:
+        """Run every DNA scorer over the prompt text - no I/O, no side effects"""
+        personality_ratios = self._extract_personality_patterns(prompt_text)
+        complexity_score = self._calculate_complexity(prompt_text)
+        
+        return {
+            'prompt_id': prompt_id,
+            'content_hash': self._generate_content_hash(prompt_text),
+            'personality_ratios': personality_ratios,
+            'token_count': self._estimate_token_count(prompt_text),
+            'complexity_score': complexity_score,
+            # Effectiveness prediction with personality context
+            'effectiveness_score': self._predict_effectiveness(prompt_text, personality_ratios, complexity_score),
+            'personality_conflicts': self._detect_personality_conflicts(prompt_text),
+            'instruction_analysis': self._analyze_instruction_structure(prompt_text),
+            'viral_potential': self._assess_viral_potential(prompt_text),
+            'analysis_timestamp': datetime.now().isoformat()
+        }
+    
+    def classify_health(self, dna_profile: Dict[str, Any]) -> str:
+        """Health Status label for a DNA profile (lib.dna_batch applies the same thresholds in bulk)"""
+        effectiveness = dna_profile['effectiveness_score']
+        complexity = dna_profile['complexity_score']
+        conflicts = dna_profile['personality_conflicts']
+        
+        if effectiveness > 0.8 and complexity < 6 and conflicts == 0:
+            return "Excellent"
+        elif effectiveness > 0.7 and complexity < 7:
+            return "Healthy"
+        elif effectiveness < 0.4 or complexity > 8 or conflicts > 2:
+            return "Problematic"
+        else:
+            return "Needs Optimization"
+    
+    # ═══════════════════════════════════════════════════════════════
+    # DNA SCORING ALGORITHMS
+    # Every scorer reads the single-pass feature vector from lib.dna_features
+    # ═══════════════════════════════════════════════════════════════
+    
+    def _generate_content_hash(self, prompt_text: str) -> str:
+        """Generate unique hash for prompt content"""
+        return hashlib.sha256(prompt_text.encode()).hexdigest()[:16]
+    
+    def _extract_personality_patterns(self, prompt_text: str) -> Dict[str, float]:
+        """Extract personality ratios from prompt text - the digital psychology"""
+        features = extract_features(prompt_text)
+        
+        ratios = {}
+        total_matches = 0
+        
+        # Count matches for each personality trait
+        for trait, keywords in PERSONALITY_PATTERNS.items():
+            matches = sum(1 for keyword in keywords if features.has_lower(keyword))
+            ratios[trait] = matches
+            total_matches += matches
+        
+        # Normalize to percentages
+        if total_matches > 0:
+            ratios = {trait: (count / total_matches) for trait, count in ratios.items()}
+        else:
+            ratios = {trait: 0.0 for trait in PERSONALITY_PATTERNS.keys()}
+            
+        return ratios
+    
+    def _estimate_token_count(self, prompt_text: str) -> int:
+        """Token count from the bundled offline BPE vocabulary (word heuristic if it is missing)"""
+        return count_tokens(prompt_text)
+    
+    def _calculate_complexity(self, prompt_text: str) -> float:
+        """Calculate prompt complexity score - detect Frankenstein monsters"""
+        features = extract_features(prompt_text)
+        factors = {
+            'length': features.char_count / 1000,  # Normalize by character count
+            'instruction_density': sum(features.count(m) for m in INSTRUCTION_MARKERS) / 10,
+            'conditional_logic': sum(features.count(m) for m in CONDITIONAL_MARKERS) / 5,
+            'formatting_complexity': sum(features.count(m) for m in FORMATTING_MARKERS) / 10,
+            'personality_conflicts': self._detect_personality_conflicts(prompt_text),
+            'nested_instructions': sum(features.count(m) for m in NUMBERING_MARKERS),
+            'variable_usage': sum(features.count(m) for m in VARIABLE_MARKERS)
+        }
+        
+        # Weighted complexity score
+        complexity = (
+            factors['length'] * 0.15 +
+            factors['instruction_density'] * 0.25 +
+            factors['conditional_logic'] * 0.20 +
+            factors['formatting_complexity'] * 0.10 +
+            factors['personality_conflicts'] * 0.15 +
+            factors['nested_instructions'] * 0.10 +
+            factors['variable_usage'] * 0.05
+        )
+        
+        return min(complexity, 10.0)  # Cap at 10
+    
+    def _detect_personality_conflicts(self, prompt_text: str) -> float:
+        """Detect conflicting personality instructions - the prompt therapy session"""
+        features = extract_features(prompt_text)
+        return sum(1 for trait1, trait2 in CONFLICT_PAIRS
+                   if features.has_lower(trait1) and features.has_lower(trait2))
+    
+    def _analyze_instruction_structure(self, prompt_text: str) -> Dict[str, Any]:
+        """Analyze the structure and organization of instructions"""
+        features = extract_features(prompt_text)
+        structure_analysis = {
+            'has_system_instruction': features.has('SYSTEM_INSTRUCTION') or features.has('You are'),
+            'has_examples': any(features.has_lower(keyword) for keyword in EXAMPLE_KEYWORDS),
+            'has_constraints': features.has('NEVER') or features.has('MUST'),
+            'has_output_format': features.has('OUTPUT') or features.has_lower('format'),
+            'has_personality_definition': any(features.has_lower(trait) for trait in PERSONALITY_DEFINITION_TRAITS),
+            'instruction_count': features.instruction_lines,
+            'section_count': sum(features.count(m) for m in SECTION_MARKERS),
+            'word_count': features.word_count,
+            'line_count': features.line_count
+        }
+        
+        return structure_analysis
+    
+    def _assess_viral_potential(self, prompt_text: str) -> Dict[str, Any]:
+        """Assess the viral/meme potential of the prompt"""
+        features = extract_features(prompt_text)
+        viral_indicators = {
+            'catchy_phrases': sum(1 for phrase in CATCHY_PHRASES if features.has_lower(phrase)),
+            'memorable_concepts': sum(1 for concept in MEMORABLE_CONCEPTS if features.has_lower(concept)),
+            'emotional_hooks': sum(1 for hook in EMOTIONAL_HOOKS if features.has_lower(hook)),
+            'has_metaphors': any(features.has_lower(metaphor) for metaphor in METAPHOR_MARKERS),
+            'humor_level': sum(1 for humor in HUMOR_MARKERS if features.has_lower(humor)),
+            'uniqueness_score': features.unique_word_count / features.word_count if features.word_count else 0
+        }
+        
+        # Calculate overall viral coefficient
+        viral_coefficient = (
+            viral_indicators['catchy_phrases'] * 0.3 +
+            viral_indicators['memorable_concepts'] * 0.2 +
+            viral_indicators['emotional_hooks'] * 0.2 +
+            (1 if viral_indicators['has_metaphors'] else 0) * 0.15 +
+            viral_indicators['humor_level'] * 0.1 +
+            viral_indicators['uniqueness_score'] * 0.05
+        )
+        
+        viral_indicators['viral_coefficient'] = min(viral_coefficient, 1.0)
+        return viral_indicators
+    
+    def _predict_effectiveness(self, prompt_text: str, personality_ratios: Optional[Dict[str, float]] = None,
+                               complexity: Optional[float] = None) -> float:
+        """Predict prompt effectiveness - the crystal ball algorithm"""
+        if personality_ratios is None:
+            personality_ratios = self._extract_personality_patterns(prompt_text)
+        if complexity is None:
+            complexity = self._calculate_complexity(prompt_text)
+        features = extract_features(prompt_text)
+        
+        # Heuristic-based effectiveness prediction
+        factors = {
+            'clarity': max(0, 10 - complexity),
+            'personality_balance': 10 - (max(personality_ratios.values()) * 10) if personality_ratios else 5,
+            'instruction_specificity': min(features.count_lower('specific') * 2 + 
+                                        features.count_lower('exactly') * 2, 10),
+            'example_presence': min(features.count_lower('example') * 3 + 
+                                  features.count_lower('for instance') * 2, 10),
+            'constraint_balance': max(0, 10 - (features.count('NEVER') + features.count('MUST')) * 0.5),
+            'structure_quality': min(sum(features.count(m) for m in SECTION_MARKERS), 10),
+            'length_optimization': 10 - abs(features.char_count - 2000) / 200  # Optimal around 2000 chars
+        }
+        
+        effectiveness = sum(factors.values()) / len(factors)
+        return min(max(effectiveness, 0), 10) / 10  # Normalize to 0-1
+    
+    def generate_analysis_report(self, dna_profile: Dict[str, Any]) -> str:
+        """Generate the archaeological analysis report - our scientific paper"""
+        if not dna_profile:
+            return "❌ No DNA profile provided for analysis"
+        
+        report = f"""
+🔬 PROMPT ARCHAEOLOGICAL ANALYSIS REPORT
+{'='*60}
+
+SPECIMEN ID: {dna_profile['prompt_id']}
+ANALYSIS DATE: {dna_profile['analysis_timestamp'][:19]}
+CONTENT HASH: {dna_profile['content_hash']}
+
+🧬 GENETIC ANALYSIS:
+Token Count: ~{dna_profile['token_count']} tokens
+Complexity Score: {dna_profile['complexity_score']:.2f}/10
+Effectiveness Prediction: {dna_profile['effectiveness_score']:.1%}
+Personality Conflicts: {dna_profile['personality_conflicts']} detected
+
+🎭 PERSONALITY PROFILE:
+"""
+        
+        # Add personality breakdown
+        for trait, ratio in dna_profile['personality_ratios'].items():
+            if ratio > 0:
+                bar_length = int(ratio * 20)  # Scale to 20 chars max
+                bar = '█' * bar_length + '░' * (20 - bar_length)
+                report += f"  {trait.title():<12}: {ratio:.1%} |{bar}|\n"
+        
+        # Add deductive analysis
+        report += f"\n🕵️ DEDUCTIVE ANALYSIS:\n"
+        
+        if dna_profile['complexity_score'] > 7:
+            report += f"  • {self._get_analysis_phrase('kondo')} - complexity overload detected.\n"
+        
+        if dna_profile['effectiveness_score'] > 0.8:
+            report += f"  • {self._get_analysis_phrase('attenborough')} - highly optimized specimen.\n"
+        elif dna_profile['effectiveness_score'] < 0.4:
+            report += f"  • {self._get_analysis_phrase('sherlock')} - significant optimization needed.\n"
+        
+        # Add viral potential
+        viral_coeff = dna_profile['viral_potential']['viral_coefficient']
+        report += f"\n🦠 VIRAL POTENTIAL:\n"
+        report += f"  Viral Coefficient: {viral_coeff:.2f}/1.0\n"
+        report += f"  Meme Potential: {'High' if viral_coeff > 0.7 else 'Moderate' if viral_coeff > 0.4 else 'Low'}\n"
+        
+        return report
+    
+    def generate_optimization_suggestions(self, dna_profile: Dict[str, Any]) -> List[str]:
+        """Generate specific optimization suggestions based on DNA analysis"""
+        suggestions = []
+        
+        if not dna_profile:
+            return ["❌ Cannot generate suggestions without DNA profile"]
+        
+        # Complexity-based suggestions
+        if dna_profile['complexity_score'] > 7:
+            suggestions.append("🔧 COMPLEXITY REDUCTION: Simplify instruction structure - current complexity is overwhelming")
+        
+        # Effectiveness-based suggestions
+        if dna_profile['effectiveness_score'] < 0.5:
+            suggestions.append("📈 EFFECTIVENESS BOOST: Add specific examples and clearer output format")
+        
+        # Personality conflict suggestions
+        if dna_profile['personality_conflicts'] > 1:
+            suggestions.append("🎭 PERSONALITY THERAPY: Resolve conflicting personality instructions")
+        
+        # Structure-based suggestions
+        struct = dna_profile['instruction_analysis']
+        if not struct['has_examples']:
+            suggestions.append("📚 ADD EXAMPLES: Include concrete examples to improve clarity")
+        
+        if not struct['has_output_format']:
+            suggestions.append("📝 OUTPUT FORMAT: Define clear output format expectations")
+        
+        if not struct['has_constraints']:
+            suggestions.append("🚫 ADD CONSTRAINTS: Include specific constraints and boundaries")
+        
+        # Token optimization
+        if dna_profile['token_count'] > 4000:
+            suggestions.append("✂️ TOKEN DIET: Reduce token count for better efficiency")
+        elif dna_profile['token_count'] < 500:
+            suggestions.append("🔍 MORE DETAIL: Add more specific instructions and context")
+        
+        # Viral potential suggestions
+        if dna_profile['viral_potential']['viral_coefficient'] < 0.3:
+            suggestions.append("🦠 VIRAL BOOST: Add memorable phrases or concepts to increase shareability")
+        
+        if not suggestions:
+            suggestions.append("✨ WELL OPTIMIZED: This prompt appears to be in excellent condition!")
+        
+        return suggestions
+
+
+# ═══════════════════════════════════════════════════════════════
+# PROCESS POOL ENTRY POINT
+# ═══════════════════════════════════════════════════════════════
+
+_worker_archaeologist = None
+
+def get_worker_archaeologist() -> PromptArchaeologist:
+    """The archaeologist of the current (worker) process, created on first use"""
+    global _worker_archaeologist
+    if _worker_archaeologist is None:
+        _worker_archaeologist = PromptArchaeologist()
+    return _worker_archaeologist
+
+def analyze_prompt_text(job: Tuple[str, str]) -> Dict[str, Any]:
+    """Build a DNA profile for (prompt_id, prompt_text) inside a worker process"""
+    prompt_id, prompt_text = job
+    return get_worker_archaeologist().build_dna_profile(prompt_id, prompt_text)
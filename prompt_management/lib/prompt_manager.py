@@ -8,27 +8,184 @@ Because evolution requires coordination, not chaos.
 import os
 import sys
 import json
-import re
-import hashlib
-import random
-from typing import Dict, List, Any, Optional
-from dotenv import load_dotenv
-from notion_client import Client
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Iterable, Callable
 from datetime import datetime
 
-load_dotenv()
+# Allow running this module directly (python lib/prompt_manager.py)
+_package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _package_dir not in sys.path:
+    sys.path.append(_package_dir)
 
-class PromptManager:
-    def __init__(self):
-        # Use the correct token name from DB checker
-        self.notion = Client(auth=os.getenv("PROMPT_SECURITY_TOKEN"))
-        self.database_id = os.getenv("PROMPT_DATABASE_ID")
+from lib.prompt_archaeologist import PromptArchaeologist, analyze_prompt_text, DNA_CONTENT_FIELDS
+from lib.prompt_schema import PROMPT_SCHEMA
+from lib.local_store import load_environment
+from lib.dna_cache import DNAProfileCache
+from lib.notion_writer import NotionWriteBuffer
+from lib.storage import StorageBackend, open_storage
+from lib.near_duplicates import DEFAULT_THRESHOLD, detect_duplicates
+from lib.lineage import LineageIndex
+from lib.inheritance import INHERITED_SECTIONS, InheritanceResolver
+from lib.version_store import VersionStore
+from lib.search_index import SearchIndex
+from lib.trait_space import TraitSpace
+from lib.prompt_parser import ParseError, parse_prompt_document
+from lib.chunked_text import encode_text, parse_marker, is_chunk_block, decode_blocks, text_digest
+
+# Core content projection used when include_all_properties=False (what `read` displays)
+CORE_PROPERTIES = (
+    'Prompt ID', 'Version', 'Type', 'Author', 'Language', 'Parent Prompts',
+    *DNA_CONTENT_FIELDS,
+    'Execution Parameters', 'Personality Mix'
+)
+
+# Stored analysis results consulted by health checks
+ANALYSIS_PROPERTIES = ('DNA Hash', 'Complexity Score', 'Effectiveness Score', 'Health Status')
+
+# Properties the lineage index is built from
+LINEAGE_PROPERTIES = ('Prompt ID', 'Parent Prompts', 'Parent Prompt')
+
+# Properties prompt inheritance is resolved from (parents and inheritable sections, in one scan;
+# Version labels the resolved output)
+INHERITANCE_PROPERTIES = (*LINEAGE_PROPERTIES, 'Version', *INHERITED_SECTIONS)
+
+# Incremental scans never return archived pages: every Nth resolver refresh also checks which pages still exist
+RESOLVER_RECONCILE_EVERY = 10
+
+# Text sections a template file contributes besides Version and Full Prompt
+TEMPLATE_TEXT_FIELDS = (*DNA_CONTENT_FIELDS, 'Core Message', 'Execution Parameters', 'Author', 'Language',
+                        'Parent Prompts')
+
+# DNA profile metrics stored with each snapshot record
+SNAPSHOT_DNA_METRICS = ('complexity_score', 'effectiveness_score', 'token_count', 'personality_conflicts')
+
+# Properties the full-text search index is built from
+SEARCH_PROPERTIES = ('Prompt ID', *DNA_CONTENT_FIELDS)
+
+
+class PromptRecord(Mapping):
+    """
+    Lazy, projection-aware view over a Notion prompt page.
+    Behaves like the dict read_prompt used to return, but decodes a property
+    only on first access and computes population metadata on demand.
+    """
+    
+    def __init__(self, page: Dict, schema: Dict[str, Dict], extractor: Callable,
+                 fields: Optional[Iterable[str]] = None):
+        self._page = page
+        self._schema = schema
+        self._extractor = extractor
+        self._fields = tuple(schema.keys()) if fields is None else tuple(f for f in fields if f in schema)
+        self._decoded = {"id": page['id']}
+    
+    @property
+    def page(self) -> Dict:
+        """The raw Notion page this record wraps"""
+        return self._page
+    
+    @property
+    def fields(self) -> tuple:
+        """Property names included in this projection"""
+        return self._fields
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._decoded:
+            return self._decoded[key]
+        if key == "_metadata":
+            self._decoded[key] = self._compute_metadata()
+            return self._decoded[key]
+        if key not in self._fields:
+            raise KeyError(key)
         
-        # Initialize the Prompt Archaeologist personality
-        self._initialize_archaeologist_personality()
+        prop_schema = self._schema[key]
+        try:
+            value = self._extractor(self._page, key, prop_schema)
+        except Exception as e:
+            # Graceful degradation - use default value
+            value = prop_schema.get('default', None)
+            print(f"⚠️  Property extraction failed for {key}: {e}")
         
-        # Load the complete expected schema from DB checker
-        self.expected_schema = self._get_complete_schema()
+        self._decoded[key] = value
+        return value
+    
+    def __iter__(self):
+        yield "id"
+        yield from self._fields
+        yield "_metadata"
+    
+    def __len__(self) -> int:
+        return len(self._fields) + 2
+    
+    def __contains__(self, key) -> bool:
+        return key in ("id", "_metadata") or key in self._fields
+    
+    def __repr__(self) -> str:
+        return f"PromptRecord(id={self._page['id']!r}, fields={len(self._fields)}, decoded={len(self._decoded) - 1})"
+    
+    def _compute_metadata(self) -> Dict[str, Any]:
+        """Population statistics over the projected properties (decodes all of them)"""
+        populated_count = sum(1 for field in self._fields if _is_populated_value(self[field]))
+        total = len(self._fields)
+        return {
+            "populated_properties": populated_count,
+            "total_properties": total,
+            "population_percentage": (populated_count / total) * 100 if total else 0.0,
+            "extraction_timestamp": datetime.now().isoformat()
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode every projected property into a plain dict (includes _metadata)"""
+        return {key: self[key] for key in self}
+
+
+def _is_populated_value(value: Any) -> bool:
+    """Check if a property value is considered 'populated' (not empty/None)"""
+    if value is None:
+        return False
+    if isinstance(value, str) and value.strip() == "":
+        return False
+    if isinstance(value, (list, tuple)) and len(value) == 0:
+        return False
+    if isinstance(value, Mapping) and len(value) == 0:
+        return False
+    return True
+
+
+class PromptManager(PromptArchaeologist):
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        # Credentials and storage settings come from .env
+        load_environment()
+        
+        # Pages live in Notion unless another backend is passed or selected by PROMPT_STORAGE
+        self.storage = storage or open_storage()
+        self.database_id = self.storage.database_id
+        
+        # Database schema is retrieved once per manager, not once per operation
+        self._database_schema = None
+        
+        # Page property updates go through a coalescing write-behind buffer
+        self.writer = NotionWriteBuffer(self.storage, self.storage.limiter)
+        
+        # DNA profiles are cached on disk by content hash
+        self.dna_cache = DNAProfileCache(self.ANALYSIS_VERSION)
+        
+        # Lineage and search indexes are loaded on first query
+        self._lineage_index = None
+        self._search_index = None
+        
+        # Resolved (inherited) prompts are memoised for the life of the manager
+        self._inheritance_resolver = None
+        self._resolver_refreshes = 0
+        
+        # In-memory indexes to re-check against Notion before their next use (see begin_command)
+        self._stale_indexes = set()
+        
+        # Every analysed state of every prompt is kept in the local version store
+        self.versions = VersionStore()
+        
+        # The complete expected schema (shared and read-only)
+        self.expected_schema = PROMPT_SCHEMA
         
         if not self.database_id:
             print("❌ PROMPT_DATABASE_ID not found in .env")
@@ -36,513 +193,126 @@ class PromptManager:
             print("Example: PROMPT_DATABASE_ID=bf9c35d5e8a646c7b5476c57a91234ef")
             return
     
-    def _get_complete_schema(self) -> Dict[str, Dict]:
-        """
-        COMPLETE 38-PROPERTY SCHEMA DEFINITION
-        Single source of truth for ALL database properties with validation rules
-        """
-        return {
-            # ═══════════════════════════════════════════════════════════════
-            # TITLE PROPERTIES (1)
-            # ═══════════════════════════════════════════════════════════════
-            "Prompt ID": {
-                "type": "title",
-                "required": True,
-                "description": "Primary identifier - auto-title field",
-                "validation": "non_empty_string"
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # RICH_TEXT PROPERTIES (16) 
-            # ═══════════════════════════════════════════════════════════════
-            "Author": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Prompt creator/author",
-                "validation": "string",
-                "default": ""
-            },
-            "Context": {
-                "type": "rich_text", 
-                "required": False,
-                "description": "Background and environmental setup",
-                "validation": "string",
-                "default": ""
-            },
-            "Core Message": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Central theme or message",
-                "validation": "string",
-                "default": ""
-            },
-            "DNA Hash": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Content fingerprint for uniqueness tracking", 
-                "validation": "string",
-                "default": ""
-            },
-            "Execution Parameters": {
-                "type": "rich_text",
-                "required": False,
-                "description": "JSON configuration parameters",
-                "validation": "string",
-                "default": ""
-            },
-            "Few-Shot Examples": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Training examples and demonstrations",
-                "validation": "string", 
-                "default": ""
-            },
-            "Instruction": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Core behavioral directives",
-                "validation": "string",
-                "default": ""
-            },
-            "Language": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Primary language (en, de, etc.)",
-                "validation": "string",
-                "default": "en"
-            },
-            "Notes": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Usage notes and tips",
-                "validation": "string",
-                "default": ""
-            },
-            "Output Format": {
-                "type": "rich_text",
-                "required": False,
-                "description": "How responses should be structured",
-                "validation": "string",
-                "default": ""
-            },
-            "Parent Prompts": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Parent prompt relationships (ROOT for top-level)",
-                "validation": "string",
-                "default": "ROOT"
-            },
-            "Personality Mix": {
-                "type": "rich_text",
-                "required": False,
-                "description": "JSON of personality trait ratios",
-                "validation": "string",
-                "default": ""
-            },
-            "Purpose": {
-                "type": "rich_text",
-                "required": True,
-                "description": "What this prompt achieves",
-                "validation": "non_empty_string"
-            },
-            "System Instructions": {
-                "type": "rich_text",
-                "required": False,
-                "description": "Core AI personality and role definition",
-                "validation": "string",
-                "default": ""
-            },
-            "User Input Expectation": {
-                "type": "rich_text",
-                "required": False,
-                "description": "What kind of input to expect",
-                "validation": "string",
-                "default": ""
-            },
-            "Version": {
-                "type": "rich_text",
-                "required": True,
-                "description": "Semantic version number",
-                "validation": "non_empty_string"
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # SELECT PROPERTIES (5)
-            # ═══════════════════════════════════════════════════════════════
-            "Cynefin Zone": {
-                "type": "select",
-                "required": False,
-                "options": [
-                    {"name": "simple", "color": "green"},
-                    {"name": "complicated", "color": "blue"},
-                    {"name": "complex", "color": "yellow"},
-                    {"name": "chaotic", "color": "red"},
-                    {"name": "disorder", "color": "gray"}
-                ],
-                "description": "Cynefin complexity domain",
-                "validation": "select_option",
-                "default": None
-            },
-            "Health Status": {
-                "type": "select",
-                "required": False,
-                "options": [
-                    {"name": "Healthy", "color": "green"},
-                    {"name": "Needs Optimization", "color": "yellow"},
-                    {"name": "Problematic", "color": "red"},
-                    {"name": "Excellent", "color": "blue"},
-                    {"name": "Unanalyzed", "color": "gray"}
-                ],
-                "description": "Current health assessment",
-                "validation": "select_option",
-                "default": "Unanalyzed"
-            },
-            "Personality Intensity": {
-                "type": "select",
-                "required": False,
-                "options": [
-                    {"name": "40%", "color": "gray"},
-                    {"name": "50%", "color": "blue"},
-                    {"name": "60%", "color": "green"},
-                    {"name": "70%", "color": "yellow"},
-                    {"name": "80%", "color": "red"}
-                ],
-                "description": "Personality strength setting",
-                "validation": "select_option",
-                "default": None
-            },
-            "Security Level": {
-                "type": "select",
-                "required": False,
-                "options": [
-                    {"name": "public", "color": "green"},
-                    {"name": "client", "color": "blue"},
-                    {"name": "private", "color": "orange"},
-                    {"name": "classified", "color": "red"}
-                ],
-                "description": "Access control level",
-                "validation": "select_option",
-                "default": "public"
-            },
-            "Type": {
-                "type": "select",
-                "required": True,
-                "options": [
-                    {"name": "meta", "color": "red"},
-                    {"name": "consultation", "color": "blue"},
-                    {"name": "workshop", "color": "green"},
-                    {"name": "analysis", "color": "yellow"},
-                    {"name": "creation", "color": "purple"},
-                    {"name": "viral", "color": "orange"},
-                    {"name": "coding-companion", "color": "pink"}
-                ],
-                "description": "Prompt category classification",
-                "validation": "select_option"
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # MULTI_SELECT PROPERTIES (4)
-            # ═══════════════════════════════════════════════════════════════
-            "Models": {
-                "type": "multi_select",
-                "required": False,
-                "options": [
-                    {"name": "GPT-4", "color": "green"},
-                    {"name": "Claude 3", "color": "blue"},
-                    {"name": "Claude 3.7 Sonnet", "color": "purple"},
-                    {"name": "Claude Sonnet 4", "color": "red"},
-                    {"name": "Perplexity", "color": "yellow"},
-                    {"name": "Grok 3", "color": "orange"},
-                    {"name": "Gemini 2.5 Pro", "color": "pink"}
-                ],
-                "description": "Compatible AI models",
-                "validation": "multi_select_options",
-                "default": []
-            },
-            "Tags": {
-                "type": "multi_select",
-                "required": False,
-                "options": [
-                    {"name": "meta", "color": "red"},
-                    {"name": "template", "color": "blue"},
-                    {"name": "orchestration", "color": "green"},
-                    {"name": "persona", "color": "yellow"},
-                    {"name": "core", "color": "purple"},
-                    {"name": "sarcasm", "color": "orange"},
-                    {"name": "consulting", "color": "pink"},
-                    {"name": "transformation", "color": "gray"},
-                    {"name": "complexity", "color": "brown"},
-                    {"name": "optimization", "color": "default"}
-                ],
-                "description": "Searchable categorization tags",
-                "validation": "multi_select_options",
-                "default": []
-            },
-            "Usage Contexts": {
-                "type": "multi_select",
-                "required": False,
-                "options": [
-                    {"name": "EU AI Act", "color": "blue"},
-                    {"name": "Workshops", "color": "green"},
-                    {"name": "Coding", "color": "purple"},
-                    {"name": "Sales", "color": "yellow"},
-                    {"name": "Content Creation", "color": "orange"},
-                    {"name": "Consulting", "color": "red"}
-                ],
-                "description": "Where this prompt is used",
-                "validation": "multi_select_options",
-                "default": []
-            },
-            "Viral Hooks": {
-                "type": "multi_select",
-                "required": False,
-                "options": [
-                    {"name": "Schrödinger's Agile", "color": "blue"},
-                    {"name": "Complexity Whisperer", "color": "green"},
-                    {"name": "AI Act Navigator", "color": "purple"},
-                    {"name": "Meme Machine", "color": "orange"},
-                    {"name": "KHAOS", "color": "red"},
-                    {"name": "TARS-style wit", "color": "yellow"},
-                    {"name": "Philosophical Musings", "color": "gray"},
-                    {"name": "Optimization Addict", "color": "pink"},
-                    {"name": "Digital Archaeologist", "color": "brown"},
-                    {"name": "Prompt DNA", "color": "default"},
-                    {"name": "Archaeological Analysis", "color": "default"}
-                ],
-                "description": "Memorable phrases and concepts",
-                "validation": "multi_select_options",
-                "default": []
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # NUMBER PROPERTIES (5)
-            # ═══════════════════════════════════════════════════════════════
-            "Complexity Score": {
-                "type": "number",
-                "required": False,
-                "description": "Calculated complexity rating (0-10)",
-                "validation": "number_range",
-                "min_value": 0,
-                "max_value": 10,
-                "default": None
-            },
-            "Effectiveness Score": {
-                "type": "number", 
-                "required": False,
-                "description": "Predicted effectiveness (0-1)",
-                "validation": "number_range",
-                "min_value": 0,
-                "max_value": 1,
-                "default": None
-            },
-            "Generation": {
-                "type": "number",
-                "required": False,
-                "description": "Evolution generation number",
-                "validation": "number_range",
-                "min_value": 0,
-                "max_value": None,
-                "default": 0
-            },
-            "Temperature": {
-                "type": "number",
-                "required": False,
-                "description": "AI model temperature setting (0.0-1.0)",
-                "validation": "number_range",
-                "min_value": 0.0,
-                "max_value": 1.0,
-                "default": None
-            },
-            "Viral Coefficient": {
-                "type": "number",
-                "required": False,
-                "description": "Meme propagation potential (0-1)",
-                "validation": "number_range",
-                "min_value": 0,
-                "max_value": 1,
-                "default": None
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # DATE PROPERTIES (5)
-            # ═══════════════════════════════════════════════════════════════
-            "Analysis Date": {
-                "type": "date",
-                "required": False,
-                "description": "When last analyzed for health/effectiveness",
-                "validation": "iso_date",
-                "default": None
-            },
-            "Creation Date": {
-                "type": "date",
-                "required": False,
-                "description": "When prompt was created",
-                "validation": "iso_date",
-                "default": None
-            },
-            "Last Analysis Date": {
-                "type": "date",
-                "required": False,
-                "description": "When last archaeological analysis was performed",
-                "validation": "iso_date",
-                "default": None
-            },
-            "Last Modification Date": {
-                "type": "date",
-                "required": False,
-                "description": "When prompt was last updated",
-                "validation": "iso_date",
-                "default": None
-            },
-            "Last Modified": {
-                "type": "date",
-                "required": False,
-                "description": "When prompt was last updated (duplicate field)",
-                "validation": "iso_date",
-                "default": None
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # RELATION PROPERTIES (1)
-            # ═══════════════════════════════════════════════════════════════
-            "Parent Prompt": {
-                "type": "relation",
-                "required": False,
-                "description": "Parent-child relationships for lineage tracking",
-                "validation": "relation_id",
-                "default": None
-            },
-            
-            # ═══════════════════════════════════════════════════════════════
-            # FORMULA PROPERTIES (1) - READ ONLY
-            # ═══════════════════════════════════════════════════════════════
-            "Full Prompt": {
-                "type": "formula",
-                "required": False,
-                "description": "Complete formatted prompt (generated from all fields)",
-                "validation": "read_only",
-                "default": ""
-            }
-        }
+    # ═══════════════════════════════════════════════════════════════
+    # LONG-LIVED MANAGERS (lib.daemon)
+    # ═══════════════════════════════════════════════════════════════
     
-    def _initialize_archaeologist_personality(self):
-        """Initialize the Prompt Archaeologist's analytical personality"""
-        self.archaeologist_personality = {
-            "sherlock_holmes_deduction": 0.60,
-            "marie_kondo_organization": 0.25, 
-            "attenborough_fascination": 0.15
-        }
+    def begin_command(self):
+        """
+        Called by the daemon before each command run on this (warm) manager
         
-        self.analysis_phrases = {
-            "sherlock": [
-                "Fascinating specimen you've brought me",
-                "Elementary pattern recognition reveals",
-                "The evidence clearly indicates",
-                "Deductive analysis suggests",
-                "Most curious behavioral patterns detected"
-            ],
-            "kondo": [
-                "This prompt does not spark joy",
-                "Time for some surgical reorganization",
-                "Let's declutter this instruction chaos",
-                "Ruthless optimization is required",
-                "Marie would not approve of this mess"
-            ],
-            "attenborough": [
-                "Observe this remarkable evolutionary adaptation",
-                "In the wild digital ecosystem",
-                "This species of prompt has developed",
-                "Natural selection has favored",
-                "A truly magnificent specimen"
-            ]
-        }
+        Pages may have been edited in Notion since the last command: the in-memory lineage
+        index and inheritance resolver are patched with one filtered query on their next use,
+        and write suppression forgets the property values it last saw.
+        """
+        self._stale_indexes.update(('lineage', 'resolver'))
+        self.writer.clear()
     
-    def _get_analysis_phrase(self, personality_type: str) -> str:
-        """Get a contextual phrase based on personality type"""
-        return random.choice(self.analysis_phrases[personality_type])
+    def end_command(self):
+        """Called by the daemon after each command: nothing is left queued between commands"""
+        failed_pages = self.writer.flush()
+        if failed_pages:
+            print(f"⚠️  {len(failed_pages)} queued update(s) failed")
     
     # ═══════════════════════════════════════════════════════════════
     # ENHANCED ARCHAEOLOGICAL DNA ANALYSIS (SYNCHRONIZED)
     # ═══════════════════════════════════════════════════════════════
     
-    def analyze_prompt_dna(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+    def analyze_prompt_dna(self, prompt_id: str, prompt_data: Optional[Mapping] = None,
+                           persist: bool = True) -> Optional[Dict[str, Any]]:
         """
         ENHANCED: Analyze prompt structure and store results in database
         Now automatically updates the Notion database with analysis results
-        """
-        print(f"🔍 {self._get_analysis_phrase('sherlock')}...")
         
-        # First, retrieve the prompt
-        prompt_data = self.read_prompt(prompt_id)
+        Args:
+            prompt_id: Prompt to analyze
+            prompt_data: Record already read by the caller (skips the re-read)
+            persist: Write the results back to Notion (False = read-only analysis)
+        """
+        # First, retrieve the prompt - only the content fields are decoded
+        if prompt_data is None:
+            prompt_data = self.read_prompt(prompt_id, fields=DNA_CONTENT_FIELDS)
         if not prompt_data:
             print(f"❌ Cannot analyze non-existent prompt: {prompt_id}")
             return None
         
-        # Combine all content fields for analysis (Full Prompt is empty, so build it)
-        content_parts = []
-        content_fields = [
-            'Purpose', 'Context', 'System Instructions', 'Instruction', 
-            'User Input Expectation', 'Output Format', 'Few-Shot Examples', 'Notes'
-        ]
+        dna_profile = self.compute_prompt_dna(prompt_id, prompt_data)
         
-        for field in content_fields:
-            field_content = prompt_data.get(field, '')
-            if field_content and field_content.strip():
-                content_parts.append(f"{field}: {field_content}")
+        # NEW: Automatically store analysis results in database
+        if dna_profile and persist:
+            self._store_analysis_results(prompt_id, dna_profile, page_id=prompt_data['id'])
         
-        prompt_text = '\n\n'.join(content_parts)
+        return dna_profile
+    
+    def compute_prompt_dna(self, prompt_id: str, prompt_data: Optional[Mapping] = None,
+                           use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Pure analysis step - never writes to Notion
+        Reuses the cached profile when this exact content has been analysed before
+        
+        Args:
+            prompt_id: Prompt to analyze
+            prompt_data: Record already read by the caller (skips the read)
+            use_cache: Consult and populate the on-disk DNA profile cache
+        """
+        if prompt_data is None:
+            prompt_data = self.read_prompt(prompt_id, fields=DNA_CONTENT_FIELDS)
+        if not prompt_data:
+            print(f"❌ Cannot analyze non-existent prompt: {prompt_id}")
+            return None
+        
+        # Combine all content fields for analysis (Full Prompt is empty, so build it)
+        prompt_text = self.compose_prompt_text(prompt_data, DNA_CONTENT_FIELDS)
         
         if not prompt_text:
             print(f"❌ No prompt content found for: {prompt_id}")
             return None
         
-        # Extract DNA components
-        dna_profile = {
-            'prompt_id': prompt_id,
-            'content_hash': self._generate_content_hash(prompt_text),
-            'personality_ratios': self._extract_personality_patterns(prompt_text),
-            'token_count': self._estimate_token_count(prompt_text),
-            'complexity_score': self._calculate_complexity(prompt_text),
-            'effectiveness_score': self._predict_effectiveness(prompt_text),
-            'personality_conflicts': self._detect_personality_conflicts(prompt_text),
-            'instruction_analysis': self._analyze_instruction_structure(prompt_text),
-            'viral_potential': self._assess_viral_potential(prompt_text),
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        content_hash = self._generate_content_hash(prompt_text)
+        if use_cache:
+            cached_profile = self.dna_cache.get(content_hash, prompt_id)
+            if cached_profile:
+                print(f"🗄️  Reusing cached DNA profile for {prompt_id} ({content_hash})")
+                self._record_version(prompt_id, prompt_text, cached_profile)
+                return cached_profile
         
-        # Add effectiveness prediction with personality context
-        dna_profile['effectiveness_score'] = self._predict_effectiveness(
-            prompt_text, 
-            dna_profile['personality_ratios']
-        )
+        print(f"🔍 {self._get_analysis_phrase('sherlock')}...")
         
-        # NEW: Automatically store analysis results in database
-        self._store_analysis_results(prompt_id, dna_profile)
+        # Extract DNA components
+        dna_profile = self.build_dna_profile(prompt_id, prompt_text)
+        
+        if use_cache:
+            self.dna_cache.put(dna_profile)
         
+        self._record_version(prompt_id, prompt_text, dna_profile)
         return dna_profile
     
-    def _store_analysis_results(self, prompt_id: str, dna_profile: Dict[str, Any]):
-        """Store archaeological analysis results directly in the Notion database"""
+    def _record_version(self, prompt_id: str, prompt_text: str, dna_profile: Dict[str, Any]) -> bool:
+        """Add the analysed state to the local version store (no-op when the DNA Hash is unchanged)"""
         try:
-            # Get the existing record
-            existing_record = self.read_prompt(prompt_id)
-            if not existing_record:
-                print(f"❌ Cannot store analysis for non-existent prompt: {prompt_id}")
-                return False
+            return self.versions.record(prompt_id, prompt_text, dna_profile, self.classify_health(dna_profile))
+        except Exception as e:
+            print(f"⚠️  Could not record version for {prompt_id}: {e}")
+            return False
+    
+    def _store_analysis_results(self, prompt_id: str, dna_profile: Dict[str, Any], page_id: Optional[str] = None,
+                                quiet: bool = False):
+        """
+        Store archaeological analysis results in the Notion database
+        Staged in the write buffer: unchanged results cost no API call, and the
+        update is sent on the next flush (threshold, explicit or at exit)
+        """
+        try:
+            # Resolve the page only when the caller has not already done so
+            if page_id is None:
+                existing_record = self.read_prompt(prompt_id, fields=())
+                if not existing_record:
+                    print(f"❌ Cannot store analysis for non-existent prompt: {prompt_id}")
+                    return False
+                page_id = existing_record['id']
             
             # Determine health status
-            effectiveness = dna_profile['effectiveness_score']
-            complexity = dna_profile['complexity_score']
-            conflicts = dna_profile['personality_conflicts']
-            
-            if effectiveness > 0.8 and complexity < 6 and conflicts == 0:
-                health_status = "Excellent"
-            elif effectiveness > 0.7 and complexity < 7:
-                health_status = "Healthy"
-            elif effectiveness < 0.4 or complexity > 8 or conflicts > 2:
-                health_status = "Problematic"
-            else:
-                health_status = "Needs Optimization"
+            health_status = self.classify_health(dna_profile)
             
             # Prepare properties for update
             properties = {
@@ -570,14 +340,15 @@ class PromptManager:
             }
             
             # Update the page with analysis results
-            self.notion.pages.update(
-                page_id=existing_record['id'],
-                properties=properties
-            )
+            status = self.writer.update(page_id, properties)
             
-            print(f"✅ Stored analysis results for: {prompt_id}")
-            print(f"   Health Status: {health_status}")
-            print(f"   DNA Hash: {dna_profile['content_hash']}")
+            if not quiet:
+                if status == 'suppressed':
+                    print(f"✅ Analysis results unchanged for: {prompt_id} (no write needed)")
+                else:
+                    print(f"✅ Stored analysis results for: {prompt_id}")
+                print(f"   Health Status: {health_status}")
+                print(f"   DNA Hash: {dna_profile['content_hash']}")
             
             return True
             
@@ -585,6 +356,195 @@ class PromptManager:
             print(f"❌ Error storing analysis results: {e}")
             return False
     
+    # ═══════════════════════════════════════════════════════════════
+    # BATCH LIBRARY ANALYSIS (HASH-SKIPPING, PARALLEL)
+    # ═══════════════════════════════════════════════════════════════
+    
+    def analyze_library(self, changed_only: bool = False, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyze the whole prompt library in one sweep
+        
+        The library is loaded with a single paginated scan, content hashes are computed
+        locally, and (with changed_only) prompts whose stored DNA Hash still matches are
+        skipped. Remaining prompts are analysed in a process pool and their results
+        written back concurrently under the shared Notion rate limit.
+        
+        Args:
+            changed_only: Skip prompts whose stored DNA Hash matches their current content
+            workers: Parallelism for analysis and write-back (default: CPU count)
+        
+        Returns:
+            Summary with counts of analysed, unchanged, empty and failed prompts
+        """
+        workers = workers or os.cpu_count() or 1
+        summary = {'total': 0, 'analyzed': 0, 'unchanged': 0, 'empty': 0, 'failed': [], 'profiles': []}
+        
+        print("📚 Loading prompt library...")
+        records = self.scan_library(fields=('Prompt ID', 'DNA Hash', *DNA_CONTENT_FIELDS))
+        summary['total'] = len(records)
+        
+        # Phase 1: local hashing decides what actually needs work
+        jobs = []
+        for record in records:
+            prompt_text = self.compose_prompt_text(record, DNA_CONTENT_FIELDS)
+            if not prompt_text:
+                summary['empty'] += 1
+                continue
+            if changed_only and record['DNA Hash'] == self._generate_content_hash(prompt_text):
+                summary['unchanged'] += 1
+                continue
+            jobs.append((record['Prompt ID'], prompt_text, record['id']))
+        
+        # The scan already holds every content field - refresh the search index for free
+        self._index_search_records(records, full_scan=True)
+        
+        print(f"🧬 {len(jobs)} to analyze, {summary['unchanged']} unchanged, {summary['empty']} without content")
+        if not jobs:
+            return summary
+        
+        # Phase 2: CPU-bound analysis across processes (cached profiles are reused as-is)
+        profiles = self._compute_profiles([job[:2] for job in jobs], workers)
+        for (prompt_id, prompt_text, _), profile in zip(jobs, profiles):
+            self._record_version(prompt_id, prompt_text, profile)
+        
+        # Phase 3: stage every result, then flush concurrently under the shared rate limit
+        for (prompt_id, _, page_id), profile in zip(jobs, profiles):
+            self._store_analysis_results(prompt_id, profile, page_id, quiet=True)
+        failed_pages = set(self.writer.flush())
+        
+        for (prompt_id, _, page_id), profile in zip(jobs, profiles):
+            if page_id in failed_pages:
+                summary['failed'].append(prompt_id)
+            else:
+                summary['analyzed'] += 1
+                summary['profiles'].append(profile)
+        
+        return summary
+    
+    def _compute_profiles(self, jobs: List[tuple], workers: int) -> List[Dict[str, Any]]:
+        """DNA profiles for (prompt_id, prompt_text) jobs: cache hits first, the rest in a process pool"""
+        profiles = [self.dna_cache.get(self._generate_content_hash(prompt_text), prompt_id)
+                    for prompt_id, prompt_text in jobs]
+        pending = [i for i, profile in enumerate(profiles) if profile is None]
+        texts = [jobs[i] for i in pending]
+        if workers > 1 and len(texts) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                computed = list(pool.map(analyze_prompt_text, texts, chunksize=max(1, len(texts) // (workers * 4))))
+        else:
+            computed = [analyze_prompt_text(job) for job in texts]
+        for i, profile in zip(pending, computed):
+            profiles[i] = profile
+            self.dna_cache.put(profile)
+        return profiles
+    
+    def score_library(self) -> List[Dict[str, Any]]:
+        """
+        Score every prompt in the library with the vectorised batch scorer
+        
+        Read-only and much cheaper than analyze_library: only the headline scores
+        and health status are computed (no report material, nothing written back).
+        Requires numpy.
+        
+        Returns:
+            One dict per prompt with content: prompt_id, complexity_score,
+            effectiveness_score, viral_coefficient, personality_conflicts, health_status
+        """
+        from lib.dna_batch import score_texts
+        
+        records = self.scan_library(fields=('Prompt ID', *DNA_CONTENT_FIELDS))
+        prompt_ids, texts = [], []
+        for record in records:
+            prompt_text = self.compose_prompt_text(record, DNA_CONTENT_FIELDS)
+            if prompt_text:
+                prompt_ids.append(record['Prompt ID'])
+                texts.append(prompt_text)
+        
+        scores = score_texts(texts)
+        return [
+            {
+                'prompt_id': prompt_id,
+                'complexity_score': float(scores['complexity_score'][i]),
+                'effectiveness_score': float(scores['effectiveness_score'][i]),
+                'viral_coefficient': float(scores['viral_coefficient'][i]),
+                'personality_conflicts': int(scores['personality_conflicts'][i]),
+                'health_status': str(scores['health_status'][i])
+            }
+            for i, prompt_id in enumerate(prompt_ids)
+        ]
+    
+    def find_duplicate_prompts(self, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+        """
+        Cluster near-duplicate prompts in the library (MinHash/LSH, see lib.near_duplicates)
+        
+        One paginated scan loads the content; MinHash signatures are cached by content
+        hash, so reruns only process prompts whose content changed.
+        
+        Returns:
+            {'clusters': [...], 'computed': n, 'cached': n, 'scanned': n}
+        """
+        records = self.scan_library(fields=('Prompt ID', *DNA_CONTENT_FIELDS))
+        items = []
+        for record in records:
+            prompt_text = self.compose_prompt_text(record, DNA_CONTENT_FIELDS)
+            if prompt_text:
+                items.append((record['id'], self._generate_content_hash(prompt_text), prompt_text))
+        
+        # Pages are the unit (copies often share a Prompt ID); label them for display
+        labels = self._page_labels(records)
+        
+        result = detect_duplicates(items, threshold)
+        for cluster in result['clusters']:
+            cluster['members'] = [labels[page_id] for page_id in cluster['members']]
+            cluster['pairs'] = [(labels[a], labels[b], similarity) for a, b, similarity in cluster['pairs']]
+        result['scanned'] = len(items)
+        return result
+    
+    @staticmethod
+    def _page_labels(records: Iterable[PromptRecord]) -> Dict[str, str]:
+        """page id -> Prompt ID, suffixed with the page id where several pages share one"""
+        prompt_ids = {record['id']: record['Prompt ID'] or 'Untitled' for record in records}
+        id_counts = {}
+        for prompt_id in prompt_ids.values():
+            id_counts[prompt_id] = id_counts.get(prompt_id, 0) + 1
+        return {page_id: prompt_id if id_counts[prompt_id] == 1 else f"{prompt_id} [{page_id[:8]}]"
+                for page_id, prompt_id in prompt_ids.items()}
+    
+    def build_trait_space(self, workers: Optional[int] = None) -> TraitSpace:
+        """
+        Trait vectors of the whole library as one matrix (see lib.trait_space)
+        
+        One paginated scan loads the content; profiles come from the DNA cache, and
+        prompts never analysed before are analysed in a process pool. Requires numpy.
+        """
+        records = self.scan_library(fields=('Prompt ID', *DNA_CONTENT_FIELDS))
+        labels = self._page_labels(records)
+        
+        jobs, page_ids = [], []
+        for record in records:
+            prompt_text = self.compose_prompt_text(record, DNA_CONTENT_FIELDS)
+            if prompt_text:
+                jobs.append((record['Prompt ID'], prompt_text))
+                page_ids.append(record['id'])
+        
+        profiles = self._compute_profiles(jobs, workers or os.cpu_count() or 1)
+        return TraitSpace([labels[page_id] for page_id in page_ids], profiles)
+    
+    def scan_library(self, fields: Optional[Iterable[str]] = None, filter: Optional[Dict] = None) -> List[PromptRecord]:
+        """Load every prompt page with one paginated query and wrap each in a lazy record"""
+        return [self._record_from_page(page, fields) for page in self._query_all_pages(filter=filter)]
+    
+    def _query_all_pages(self, filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None) -> List[Dict]:
+        """Follow the store's cursor pagination until the whole result set is loaded"""
+        pages = []
+        cursor = None
+        while True:
+            response = self.storage.query(filter=filter, sorts=sorts, page_size=100, start_cursor=cursor)
+            pages.extend(response['results'])
+            if not response.get('has_more'):
+                return pages
+            cursor = response['next_cursor']
+    
     # ═══════════════════════════════════════════════════════════════
     # ENHANCED SETUP METHOD (MATCHING DB CHECKER SCHEMA)
     # ═══════════════════════════════════════════════════════════════
@@ -596,7 +556,7 @@ class PromptManager:
         """
         # First check if we can access the database
         try:
-            db = self.notion.databases.retrieve(database_id=self.database_id)
+            db = self.storage.retrieve_database()
             print(f"Found existing database: {db['title'][0]['plain_text'] if db.get('title') else 'Untitled'}")
             
             # Check title property
@@ -628,9 +588,9 @@ class PromptManager:
             prop_definition = {"type": prop_config['type']}
             
             if prop_config['type'] == 'select':
-                prop_definition['select'] = {"options": prop_config.get('options', [])}
+                prop_definition['select'] = {"options": [dict(option) for option in prop_config.get('options', ())]}
             elif prop_config['type'] == 'multi_select':
-                prop_definition['multi_select'] = {"options": prop_config.get('options', [])}
+                prop_definition['multi_select'] = {"options": [dict(option) for option in prop_config.get('options', ())]}
             elif prop_config['type'] == 'number':
                 prop_definition['number'] = {"format": "number"}
             elif prop_config['type'] == 'rich_text':
@@ -649,7 +609,7 @@ class PromptManager:
             print("🔍 Setting up complete archaeological database schema...")
             
             # Get current properties 
-            db = self.notion.databases.retrieve(database_id=self.database_id)
+            db = self.storage.retrieve_database()
             current_properties = db.get('properties', {})
             
             # Add only properties that don't exist yet
@@ -665,10 +625,8 @@ class PromptManager:
                 return True
                 
             # Update the database with new properties
-            response = self.notion.databases.update(
-                database_id=self.database_id,
-                properties=properties_to_add
-            )
+            response = self.storage.update_database(properties_to_add)
+            self._database_schema = None  # schema changed - drop the cached copy
             
             print("✅ Database schema updated successfully!")
             print(f"Database: {response['title'][0]['plain_text'] if response.get('title') else 'Untitled'}")
@@ -714,7 +672,7 @@ class PromptManager:
                 prompt_id = prompt['Prompt ID']
                 
                 # Check if prompt has been analyzed
-                prompt_data = self.read_prompt(prompt_id, include_all_properties=True)
+                prompt_data = self.read_prompt(prompt_id, fields=ANALYSIS_PROPERTIES)
                 
                 if not prompt_data or not prompt_data.get('DNA Hash'):
                     # Prompt hasn't been analyzed yet
@@ -793,75 +751,72 @@ class PromptManager:
     # ENHANCED READ METHOD (INCLUDES ANALYSIS DATA)
     # ═══════════════════════════════════════════════════════════════
     
-    def read_prompt(self, prompt_id: str, include_all_properties: bool = True) -> Optional[Dict[str, Any]]:
+    def read_prompt(self, prompt_id: str, include_all_properties: bool = True,
+                    fields: Optional[Iterable[str]] = None) -> Optional[PromptRecord]:
         """
         COMPLETE 38-PROPERTY SOVEREIGNTY READ OPERATION
-        Retrieves ALL database properties with proper type handling and validation
+        Retrieves the prompt page and returns a lazy record over the requested properties
         
         Args:
             prompt_id: Unique identifier for the prompt
-            include_all_properties: If True, retrieves all 38 properties; if False, only core content
+            include_all_properties: If True, exposes all 38 properties; if False, only core content
+            fields: Explicit projection - property names the caller needs (overrides include_all_properties)
         
         Returns:
-            Dict containing all prompt data with proper type conversion, or None if not found
+            PromptRecord (dict-like; properties decode on first access, '_metadata' on demand),
+            or None if not found
         """
         try:
-            # Get database schema for title property identification
-            db = self.notion.databases.retrieve(database_id=self.database_id)
-            title_property_name = self._get_title_property_name(db)
-            
-            if not title_property_name:
-                print("❌ Error: No title property found in the database")
+            page = self._query_prompt_page(prompt_id)
+            if not page:
                 return None
             
-            # Query the database for the prompt
-            response = self.notion.databases.query(
-                database_id=self.database_id,
-                filter={
-                    "property": title_property_name,
-                    "title": {"equals": prompt_id}
-                }
-            )
+            if fields is None and not include_all_properties:
+                fields = CORE_PROPERTIES
             
-            if not response['results']:
-                print(f"❌ Prompt not found: {prompt_id}")
-                return None
-                
-            page = response['results'][0]
-            
-            # Extract ALL 38 properties with type-safe extraction
-            extracted_data = {"id": page['id']}
-            populated_count = 0
-            
-            for prop_name, prop_schema in self.expected_schema.items():
-                try:
-                    value = self._extract_property_by_type(page, prop_name, prop_schema)
-                    extracted_data[prop_name] = value
-                    
-                    # Count populated properties (non-empty, non-None values)
-                    if self._is_property_populated_value(value):
-                        populated_count += 1
-                        
-                except Exception as e:
-                    # Graceful degradation - use default value
-                    extracted_data[prop_name] = prop_schema.get('default', None)
-                    print(f"⚠️  Property extraction failed for {prop_name}: {e}")
-            
-            # Add metadata about property population
-            extracted_data["_metadata"] = {
-                "populated_properties": populated_count,
-                "total_properties": len(self.expected_schema),
-                "population_percentage": (populated_count / len(self.expected_schema)) * 100,
-                "extraction_timestamp": datetime.now().isoformat()
-            }
-            
-            print(f"✅ Retrieved prompt: {prompt_id} ({populated_count}/{len(self.expected_schema)} properties populated)")
-            return extracted_data
+            print(f"✅ Retrieved prompt: {prompt_id}")
+            return self._record_from_page(page, fields)
             
         except Exception as e:
             print(f"❌ Error reading prompt: {e}")
             return None
     
+    def _query_prompt_page(self, prompt_id: str) -> Optional[Dict]:
+        """Query the database for the raw page of a prompt (one API call once the schema is cached)"""
+        title_property_name = self._get_title_property()
+        
+        if not title_property_name:
+            print("❌ Error: No title property found in the database")
+            return None
+        
+        response = self.storage.query(
+            filter={
+                "property": title_property_name,
+                "title": {"equals": prompt_id}
+            }
+        )
+        
+        if not response['results']:
+            print(f"❌ Prompt not found: {prompt_id}")
+            return None
+        
+        return response['results'][0]
+    
+    def _record_from_page(self, page: Dict, fields: Optional[Iterable[str]] = None) -> PromptRecord:
+        """Wrap a raw Notion page in a lazy record with the given projection"""
+        self.writer.observe(page['id'], page['properties'])
+        return PromptRecord(page, self.expected_schema, self._extract_property_by_type, fields)
+    
+    def _get_database_schema(self, refresh: bool = False) -> Dict:
+        """Retrieve the database object once and reuse it for the lifetime of the manager"""
+        if self._database_schema is None or refresh:
+            self._database_schema = self.storage.retrieve_database()
+        return self._database_schema
+    
+    def _get_title_property(self) -> Optional[str]:
+        """Name of the database title property (cached with the database schema)"""
+        return self._get_title_property_name(self._get_database_schema())
+    
     def _get_title_property_name(self, db: Dict) -> Optional[str]:
         """Find the title property name in the database schema"""
         for prop_name, prop in db['properties'].items():
@@ -883,8 +838,13 @@ class PromptManager:
         """
         prop_type = prop_schema['type']
         
+        # Full Prompt is declared as a formula, but databases created by the init
+        # script (and every create/update) store it as rich text
+        if prop_type == 'formula' and 'rich_text' in page['properties'].get(prop_name, {}):
+            prop_type = 'rich_text'
+        
         if prop_type == 'title':
-            return self._extract_text_property(page, prop_name)
+            return self._extract_title_property(page, prop_name)
         elif prop_type == 'rich_text':
             return self._extract_text_property(page, prop_name)
         elif prop_type == 'select':
@@ -905,23 +865,79 @@ class PromptManager:
     
     def _is_property_populated_value(self, value: Any) -> bool:
         """Check if a property value is considered 'populated' (not empty/None)"""
-        if value is None:
-            return False
-        if isinstance(value, str) and value.strip() == "":
-            return False
-        if isinstance(value, list) and len(value) == 0:
-            return False
-        if isinstance(value, dict) and len(value) == 0:
-            return False
-        return True
+        return _is_populated_value(value)
     
     def _extract_text_property(self, page, prop_name):
-        """Helper to safely extract rich text properties"""
+        """Helper to safely extract rich text properties (all segments; chunked text is reassembled)"""
         try:
             prop = page['properties'].get(prop_name, {})
-            if prop.get('rich_text') and len(prop['rich_text']) > 0:
-                return prop['rich_text'][0]['plain_text']
+            text = ''.join(part['plain_text'] for part in prop.get('rich_text') or [])
+        except:
             return ""
+        
+        marker = parse_marker(text)
+        if marker:
+            return self._load_chunked_text(page['id'], prop_name, text, *marker)
+        return text
+    
+    def _load_chunked_text(self, page_id: str, field: str, stored: str, length: int, digest: str) -> str:
+        """Reassemble a large field from its page body blocks (only runs when the field is decoded)"""
+        try:
+            text = decode_blocks(self._list_page_blocks(page_id), field, digest)
+            if len(text) == length and text_digest(text) == digest:
+                return text
+            print(f"⚠️  {field}: page body does not match its marker ({len(text)}/{length} chars) - showing preview")
+        except Exception as e:
+            print(f"⚠️  {field}: could not load page body ({e}) - showing preview")
+        return stored.split('\n', 1)[-1]
+    
+    def _list_page_blocks(self, page_id: str) -> List[Dict]:
+        """Top-level body blocks of a page, following pagination"""
+        blocks = []
+        cursor = None
+        while True:
+            response = self.storage.list_blocks(page_id, start_cursor=cursor)
+            blocks.extend(response['results'])
+            if not response.get('has_more'):
+                return blocks
+            cursor = response['next_cursor']
+    
+    def _replace_chunked_text(self, page_id: str, field: str, text: str, stored_value: Optional[Dict]) -> tuple:
+        """
+        Property value for an updated large field of an existing page, and whether it was already written
+        
+        New body blocks are appended before the marker changes. When a previous
+        version's blocks have to go, the new value is written right away (not
+        through the write buffer) and they are removed only after that write
+        succeeded, so readers never see a marker without its blocks (callers then
+        stage Last Modified with touched=True). Unchanged text costs no API call.
+        """
+        value, blocks = encode_text(field, text)
+        stored_text = ''.join(part.get('plain_text', '') for part in (stored_value or {}).get('rich_text') or [])
+        if ''.join(part['text']['content'] for part in value['rich_text']) == stored_text:
+            return value, False
+        
+        limiter = self.writer.limiter
+        for block in blocks:
+            limiter.call(self.storage.append_blocks, page_id, [block])
+        old_marker = parse_marker(stored_text)
+        if old_marker:
+            # A failed write raises here and leaves the old marker with its blocks
+            limiter.call(self.storage.update, page_id, {field: value})
+            self.writer.record(page_id, {field: value})
+            for block in self._list_page_blocks(page_id):
+                if is_chunk_block(block, field, old_marker[1]):
+                    limiter.call(self.storage.delete_block, block['id'])
+            return value, True
+        return value, False
+    
+    def _extract_title_property(self, page, prop_name):
+        """Helper to safely extract the title property (whatever the database calls it)"""
+        try:
+            prop = page['properties'].get(prop_name)
+            if not prop or 'title' not in prop:
+                prop = next((p for p in page['properties'].values() if 'title' in p), {})
+            return ''.join(part['plain_text'] for part in prop.get('title', []))
         except:
             return ""
     
@@ -992,269 +1008,195 @@ class PromptManager:
         except:
             return ""
     
-    # ═══════════════════════════════════════════════════════════════
-    # KEEP ALL EXISTING METHODS (DNA analysis, etc.)
-    # ═══════════════════════════════════════════════════════════════
-    
-    def _generate_content_hash(self, prompt_text: str) -> str:
-        """Generate unique hash for prompt content"""
-        return hashlib.sha256(prompt_text.encode()).hexdigest()[:16]
-    
-    def _extract_personality_patterns(self, prompt_text: str) -> Dict[str, float]:
-        """Extract personality ratios from prompt text - the digital psychology"""
-        patterns = {
-            'sarcasm': ['sarcastic', 'wit', 'humor', 'cynical', 'dry humor', 'ironic', 'sardonic'],
-            'helpfulness': ['helpful', 'assist', 'support', 'guide', 'aid', 'service', 'beneficial'],
-            'authority': ['expert', 'professional', 'authority', 'specialist', 'authoritative', 'definitive'],
-            'creativity': ['creative', 'innovative', 'imaginative', 'original', 'inventive', 'artistic'],
-            'analysis': ['analyze', 'examine', 'assess', 'evaluate', 'investigate', 'scrutinize', 'dissect'],
-            'empathy': ['empathetic', 'understanding', 'compassionate', 'caring', 'sensitive'],
-            'formality': ['formal', 'professional', 'business', 'corporate', 'official'],
-            'casualness': ['casual', 'informal', 'relaxed', 'friendly', 'conversational']
-        }
-        
-        ratios = {}
-        total_matches = 0
+    def load_lineage_index(self, rebuild: bool = False) -> LineageIndex:
+        """
+        Parent/child index of the whole library
         
-        # Count matches for each personality trait
-        for trait, keywords in patterns.items():
-            matches = sum(1 for keyword in keywords if keyword.lower() in prompt_text.lower())
-            ratios[trait] = matches
-            total_matches += matches
+        First use (or rebuild=True) costs one full paginated scan. Afterwards the cached
+        index is patched with only the pages edited since its watermark.
+        """
+        if self._lineage_index is not None and not rebuild:
+            if 'lineage' not in self._stale_indexes:
+                return self._lineage_index
+            if self._inheritance_resolver is not None:
+                # The resolver shares this index: patch both with its one query
+                return self.load_inheritance_resolver(refresh=True).lineage
         
-        # Normalize to percentages
-        if total_matches > 0:
-            ratios = {trait: (count / total_matches) for trait, count in ratios.items()}
+        if rebuild:
+            index = None
         else:
-            ratios = {trait: 0.0 for trait in patterns.keys()}
-            
-        return ratios
-    
-    def _estimate_token_count(self, prompt_text: str) -> int:
-        """Estimate token count (rough approximation)"""
-        # Rough estimation: 1 token ≈ 0.75 words
-        word_count = len(prompt_text.split())
-        return int(word_count * 1.3)
-    
-    def _calculate_complexity(self, prompt_text: str) -> float:
-        """Calculate prompt complexity score - detect Frankenstein monsters"""
-        factors = {
-            'length': len(prompt_text) / 1000,  # Normalize by character count
-            'instruction_density': (prompt_text.count('MUST') + prompt_text.count('NEVER') + 
-                                  prompt_text.count('ALWAYS') + prompt_text.count('SHOULD')) / 10,
-            'conditional_logic': (prompt_text.count('IF') + prompt_text.count('WHEN') + 
-                                prompt_text.count('UNLESS') + prompt_text.count('EXCEPT')) / 5,
-            'formatting_complexity': (prompt_text.count('```') + prompt_text.count('###') + 
-                                    prompt_text.count('---') + prompt_text.count('===')) / 10,
-            'personality_conflicts': self._detect_personality_conflicts(prompt_text),
-            'nested_instructions': prompt_text.count('1.') + prompt_text.count('2.') + prompt_text.count('3.'),
-            'variable_usage': prompt_text.count('{') + prompt_text.count('[') + prompt_text.count('$')
-        }
-        
-        # Weighted complexity score
-        complexity = (
-            factors['length'] * 0.15 +
-            factors['instruction_density'] * 0.25 +
-            factors['conditional_logic'] * 0.20 +
-            factors['formatting_complexity'] * 0.10 +
-            factors['personality_conflicts'] * 0.15 +
-            factors['nested_instructions'] * 0.10 +
-            factors['variable_usage'] * 0.05
-        )
-        
-        return min(complexity, 10.0)  # Cap at 10
-    
-    def _detect_personality_conflicts(self, prompt_text: str) -> float:
-        """Detect conflicting personality instructions - the prompt therapy session"""
-        conflicts = [
-            ('professional', 'casual'),
-            ('formal', 'informal'),
-            ('urgent', 'patient'),
-            ('detailed', 'concise'),
-            ('serious', 'humorous'),
-            ('authoritative', 'humble'),
-            ('creative', 'analytical'),
-            ('empathetic', 'detached'),
-            ('helpful', 'sarcastic')
-        ]
-        
-        conflict_score = 0
-        detected_conflicts = []
-        
-        for trait1, trait2 in conflicts:
-            if trait1 in prompt_text.lower() and trait2 in prompt_text.lower():
-                conflict_score += 1
-                detected_conflicts.append((trait1, trait2))
-                
-        return conflict_score
-    
-    def _analyze_instruction_structure(self, prompt_text: str) -> Dict[str, Any]:
-        """Analyze the structure and organization of instructions"""
-        structure_analysis = {
-            'has_system_instruction': 'SYSTEM_INSTRUCTION' in prompt_text or 'You are' in prompt_text,
-            'has_examples': 'example' in prompt_text.lower() or 'for instance' in prompt_text.lower(),
-            'has_constraints': 'NEVER' in prompt_text or 'MUST' in prompt_text,
-            'has_output_format': 'OUTPUT' in prompt_text or 'format' in prompt_text.lower(),
-            'has_personality_definition': any(trait in prompt_text.lower() for trait in ['sarcastic', 'helpful', 'professional', 'creative']),
-            'instruction_count': len([line for line in prompt_text.split('\n') if line.strip().startswith(('-', '•', '1.', '2.', '3.'))]),
-            'section_count': prompt_text.count('#') + prompt_text.count('===') + prompt_text.count('---'),
-            'word_count': len(prompt_text.split()),
-            'line_count': len(prompt_text.split('\n'))
-        }
-        
-        return structure_analysis
-    
-    def _assess_viral_potential(self, prompt_text: str) -> Dict[str, Any]:
-        """Assess the viral/meme potential of the prompt"""
-        viral_indicators = {
-            'catchy_phrases': sum(1 for phrase in ['Complexity Whisperer', 'KHAOS', 'meme machine', 'digital DNA'] 
-                                if phrase.lower() in prompt_text.lower()),
-            'memorable_concepts': sum(1 for concept in ['Schrödinger', 'quantum', 'evolution', 'archaeology'] 
-                                   if concept.lower() in prompt_text.lower()),
-            'emotional_hooks': sum(1 for hook in ['chaos', 'beautiful', 'magnificent', 'brilliant'] 
-                                 if hook.lower() in prompt_text.lower()),
-            'has_metaphors': any(metaphor in prompt_text.lower() for metaphor in ['like', 'as if', 'imagine', 'picture']),
-            'humor_level': sum(1 for humor in ['sarcastic', 'wit', 'humor', 'funny', 'amusing'] 
-                             if humor.lower() in prompt_text.lower()),
-            'uniqueness_score': len(set(prompt_text.lower().split())) / len(prompt_text.split()) if prompt_text.split() else 0
-        }
-        
-        # Calculate overall viral coefficient
-        viral_coefficient = (
-            viral_indicators['catchy_phrases'] * 0.3 +
-            viral_indicators['memorable_concepts'] * 0.2 +
-            viral_indicators['emotional_hooks'] * 0.2 +
-            (1 if viral_indicators['has_metaphors'] else 0) * 0.15 +
-            viral_indicators['humor_level'] * 0.1 +
-            viral_indicators['uniqueness_score'] * 0.05
-        )
-        
-        viral_indicators['viral_coefficient'] = min(viral_coefficient, 1.0)
-        return viral_indicators
-    
-    def _predict_effectiveness(self, prompt_text: str, personality_ratios: Optional[Dict[str, float]] = None) -> float:
-        """Predict prompt effectiveness - the crystal ball algorithm"""
-        if personality_ratios is None:
-            personality_ratios = self._extract_personality_patterns(prompt_text)
-        
-        # Heuristic-based effectiveness prediction
-        factors = {
-            'clarity': max(0, 10 - self._calculate_complexity(prompt_text)),
-            'personality_balance': 10 - (max(personality_ratios.values()) * 10) if personality_ratios else 5,
-            'instruction_specificity': min(prompt_text.lower().count('specific') * 2 + 
-                                        prompt_text.lower().count('exactly') * 2, 10),
-            'example_presence': min(prompt_text.lower().count('example') * 3 + 
-                                  prompt_text.lower().count('for instance') * 2, 10),
-            'constraint_balance': max(0, 10 - (prompt_text.count('NEVER') + prompt_text.count('MUST')) * 0.5),
-            'structure_quality': min(prompt_text.count('#') + prompt_text.count('===') + 
-                                   prompt_text.count('---'), 10),
-            'length_optimization': 10 - abs(len(prompt_text) - 2000) / 200  # Optimal around 2000 chars
-        }
+            index = self._lineage_index or LineageIndex.load(self.database_id)
+        self._stale_indexes.discard('lineage')
+        if index is None:
+            index = LineageIndex(self.database_id)
+            index.apply_pages(self.scan_library(fields=LINEAGE_PROPERTIES))
+        else:
+            # Without a watermark (built on an empty library) only a full scan finds new pages
+            since = ({"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": index.watermark}}
+                     if index.watermark else None)
+            changed = self.scan_library(fields=LINEAGE_PROPERTIES, filter=since)
+            index.apply_pages(changed)
         
-        effectiveness = sum(factors.values()) / len(factors)
-        return min(max(effectiveness, 0), 10) / 10  # Normalize to 0-1
+        index.save()
+        self._lineage_index = index
+        return index
     
-    def generate_analysis_report(self, dna_profile: Dict[str, Any]) -> str:
-        """Generate the archaeological analysis report - our scientific paper"""
-        if not dna_profile:
-            return "❌ No DNA profile provided for analysis"
-        
-        report = f"""
-🔬 PROMPT ARCHAEOLOGICAL ANALYSIS REPORT
-{'='*60}
-
-SPECIMEN ID: {dna_profile['prompt_id']}
-ANALYSIS DATE: {dna_profile['analysis_timestamp'][:19]}
-CONTENT HASH: {dna_profile['content_hash']}
-
-🧬 GENETIC ANALYSIS:
-Token Count: ~{dna_profile['token_count']} tokens
-Complexity Score: {dna_profile['complexity_score']:.2f}/10
-Effectiveness Prediction: {dna_profile['effectiveness_score']:.1%}
-Personality Conflicts: {dna_profile['personality_conflicts']} detected
-
-🎭 PERSONALITY PROFILE:
-"""
-        
-        # Add personality breakdown
-        for trait, ratio in dna_profile['personality_ratios'].items():
-            if ratio > 0:
-                bar_length = int(ratio * 20)  # Scale to 20 chars max
-                bar = '█' * bar_length + '░' * (20 - bar_length)
-                report += f"  {trait.title():<12}: {ratio:.1%} |{bar}|\n"
-        
-        # Add deductive analysis
-        report += f"\n🕵️ DEDUCTIVE ANALYSIS:\n"
-        
-        if dna_profile['complexity_score'] > 7:
-            report += f"  • {self._get_analysis_phrase('kondo')} - complexity overload detected.\n"
+    # ═══════════════════════════════════════════════════════════════
+    # PROMPT INHERITANCE
+    # ═══════════════════════════════════════════════════════════════
+    
+    def load_inheritance_resolver(self, refresh: bool = False, rebuild: bool = False) -> InheritanceResolver:
+        """
+        Inheritance resolver over the whole library (see lib.inheritance)
         
-        if dna_profile['effectiveness_score'] > 0.8:
-            report += f"  • {self._get_analysis_phrase('attenborough')} - highly optimized specimen.\n"
-        elif dna_profile['effectiveness_score'] < 0.4:
-            report += f"  • {self._get_analysis_phrase('sherlock')} - significant optimization needed.\n"
+        First use (or rebuild=True) costs one paginated scan that loads parents and
+        inheritable sections together and also rebuilds the lineage index. refresh=True
+        patches it with only the pages edited since its watermark; just the prompts whose
+        own sections or parents changed (plus their descendants) lose their memoised
+        resolutions. Every RESOLVER_RECONCILE_EVERY refreshes, prompts archived (or
+        renamed) in Notion are dropped as well - edit-time queries never return them.
+        """
+        resolver = None if rebuild else self._inheritance_resolver
+        if resolver is not None and not refresh and 'resolver' not in self._stale_indexes:
+            return resolver
         
-        # Add viral potential
-        viral_coeff = dna_profile['viral_potential']['viral_coefficient']
-        report += f"\n🦠 VIRAL POTENTIAL:\n"
-        report += f"  Viral Coefficient: {viral_coeff:.2f}/1.0\n"
-        report += f"  Meme Potential: {'High' if viral_coeff > 0.7 else 'Moderate' if viral_coeff > 0.4 else 'Low'}\n"
+        self._stale_indexes.difference_update(('lineage', 'resolver'))
+        if resolver is None:
+            resolver = InheritanceResolver(LineageIndex(self.database_id))
+            resolver.apply_pages(self.scan_library(fields=INHERITANCE_PROPERTIES))
+        else:
+            # Without a watermark (built on an empty library) only a full scan finds new pages
+            watermark = resolver.lineage.watermark
+            since = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}} if watermark else None
+            changed = self.scan_library(fields=INHERITANCE_PROPERTIES, filter=since)
+            # Resolutions from before the previous refresh are dropped; the last generation is kept for reuse
+            resolver.prune()
+            resolver.apply_pages(changed)
+            self._resolver_refreshes += 1
+            if self._resolver_refreshes % RESOLVER_RECONCILE_EVERY == 0:
+                self._drop_vanished_prompts(resolver)
         
-        return report
+        resolver.lineage.save()
+        self._lineage_index = resolver.lineage
+        self._inheritance_resolver = resolver
+        return resolver
     
-    def generate_optimization_suggestions(self, dna_profile: Dict[str, Any]) -> List[str]:
-        """Generate specific optimization suggestions based on DNA analysis"""
-        suggestions = []
-        
-        if not dna_profile:
-            return ["❌ Cannot generate suggestions without DNA profile"]
-        
-        # Complexity-based suggestions
-        if dna_profile['complexity_score'] > 7:
-            suggestions.append("🔧 COMPLEXITY REDUCTION: Simplify instruction structure - current complexity is overwhelming")
+    def _drop_vanished_prompts(self, resolver: InheritanceResolver) -> List[str]:
+        """Remove prompts whose pages are gone from the library (one scan, only titles decoded)"""
+        live_pages = {page['id']: self._extract_title_property(page, 'Prompt ID') for page in self._query_all_pages()}
+        live_prompts = set(live_pages.values())
         
-        # Effectiveness-based suggestions
-        if dna_profile['effectiveness_score'] < 0.5:
-            suggestions.append("📈 EFFECTIVENESS BOOST: Add specific examples and clearer output format")
+        # Prompts first, while the lineage still knows their descendants (they get re-resolved)
+        vanished = [prompt_id for prompt_id in resolver.sections if prompt_id not in live_prompts]
+        for prompt_id in vanished:
+            resolver.remove(prompt_id)
+        for page_id in [page_id for page_id in resolver.lineage.nodes if page_id not in live_pages]:
+            resolver.lineage.remove_page(page_id)
+        return vanished
+    
+    def resolve_prompt(self, prompt_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Compose a prompt from its ancestors with section-level overrides
         
-        # Personality conflict suggestions
-        if dna_profile['personality_conflicts'] > 1:
-            suggestions.append("🎭 PERSONALITY THERAPY: Resolve conflicting personality instructions")
+        Returns:
+            {'prompt_id', 'key', 'sections', 'origins', 'ancestors', 'text'} or {'prompt_id', 'error'}
+        """
+        try:
+            resolver = self.load_inheritance_resolver(refresh=refresh)
+        except Exception as e:
+            return {'prompt_id': prompt_id, 'error': str(e)}
         
-        # Structure-based suggestions
-        struct = dna_profile['instruction_analysis']
-        if not struct['has_examples']:
-            suggestions.append("📚 ADD EXAMPLES: Include concrete examples to improve clarity")
+        if prompt_id not in resolver:
+            return {'prompt_id': prompt_id, 'error': f"Prompt '{prompt_id}' not found in the library"}
         
-        if not struct['has_output_format']:
-            suggestions.append("📝 OUTPUT FORMAT: Define clear output format expectations")
+        resolved = resolver.resolve(prompt_id)
+        resolved['ancestors'] = [ancestor for ancestor, _ in resolver.lineage.ancestors(prompt_id)]
+        resolved['text'] = resolver.render(resolved)
+        return resolved
+    
+    # ═══════════════════════════════════════════════════════════════
+    # FULL-TEXT SEARCH (LOCAL BM25 INDEX)
+    # ═══════════════════════════════════════════════════════════════
+    
+    def load_search_index(self, refresh: bool = False, rebuild: bool = False) -> SearchIndex:
+        """
+        Full-text index of the whole library
         
-        if not struct['has_constraints']:
-            suggestions.append("🚫 ADD CONSTRAINTS: Include specific constraints and boundaries")
+        Built with one full scan the first time (or with rebuild=True). Afterwards it is
+        used as cached; refresh=True patches it with the pages edited since its watermark,
+        re-tokenising only prompts whose content hash changed.
+        """
+        if self._search_index is not None and not (refresh or rebuild):
+            return self._search_index
         
-        # Token optimization
-        if dna_profile['token_count'] > 4000:
-            suggestions.append("✂️ TOKEN DIET: Reduce token count for better efficiency")
-        elif dna_profile['token_count'] < 500:
-            suggestions.append("🔍 MORE DETAIL: Add more specific instructions and context")
+        index = None if rebuild else (self._search_index or SearchIndex.load(self.database_id))
+        if index is None:
+            self._search_index = SearchIndex(self.database_id)
+            self._index_search_records(self.scan_library(fields=SEARCH_PROPERTIES), full_scan=True)
+        else:
+            self._search_index = index
+            if refresh and index.watermark:
+                changed = self.scan_library(
+                    fields=SEARCH_PROPERTIES,
+                    filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": index.watermark}}
+                )
+                self._index_search_records(changed)
+            elif refresh:
+                # No watermark (built on an empty library): only a full scan finds new pages
+                self._index_search_records(self.scan_library(fields=SEARCH_PROPERTIES), full_scan=True)
+        return self._search_index
+    
+    def _index_search_records(self, records: Iterable[PromptRecord], full_scan: bool = False) -> int:
+        """Patch the search index from scanned records; returns how many prompts were re-indexed"""
+        index = self._search_index or SearchIndex.load(self.database_id) or SearchIndex(self.database_id)
+        self._search_index = index
         
-        # Viral potential suggestions
-        if dna_profile['viral_potential']['viral_coefficient'] < 0.3:
-            suggestions.append("🦠 VIRAL BOOST: Add memorable phrases or concepts to increase shareability")
+        updated = 0
+        seen = []
+        for record in records:
+            seen.append(record['id'])
+            index.note_edited(record.page.get('last_edited_time'))
+            prompt_text = self.compose_prompt_text(record, DNA_CONTENT_FIELDS)
+            if not prompt_text:
+                index.remove(record['id'])
+                continue
+            fields = {field: record.get(field) for field in DNA_CONTENT_FIELDS if record.get(field)}
+            if index.update(record['id'], record['Prompt ID'], self._generate_content_hash(prompt_text), fields):
+                updated += 1
         
-        if not suggestions:
-            suggestions.append("✨ WELL OPTIMIZED: This prompt appears to be in excellent condition!")
+        removed = index.retain(seen) if full_scan else 0
+        index.save()
+        return updated + removed
+    
+    def search_prompts(self, query: str, limit: int = 10, refresh: bool = False) -> Dict[str, Any]:
+        """
+        BM25-ranked full-text search over every content field
         
-        return suggestions
+        Returns:
+            {'hits': [...], 'indexed': prompts in the index, 'watermark': last edit the index has seen}
+        """
+        index = self.load_search_index(refresh=refresh)
+        return {'hits': index.search(query, limit), 'indexed': len(index), 'watermark': index.watermark}
     
     def trace_prompt_lineage(self, prompt_id: str) -> Dict[str, Any]:
-        """Trace prompt family tree - basic implementation for now"""
+        """Trace prompt family tree: ancestors and descendants with their generations"""
+        try:
+            index = self.load_lineage_index()
+        except Exception as e:
+            return {'prompt_id': prompt_id, 'error': str(e)}
+        
+        if not index.is_known(prompt_id):
+            return {'prompt_id': prompt_id, 'error': f"Prompt '{prompt_id}' not found in the library"}
+        
         return {
             'prompt_id': prompt_id,
-            'ancestors': [],
-            'descendants': [],
-            'generation': 0,
-            'note': 'Full lineage tracing requires enhanced parent-child relationship implementation'
+            'generation': index.generation(prompt_id),
+            'parents': index.parents(prompt_id),
+            'ancestors': [{'prompt_id': ancestor, 'generation': index.generation(ancestor), 'distance': distance,
+                           'in_library': index.is_known(ancestor)}
+                          for ancestor, distance in index.ancestors(prompt_id)],
+            'descendants': [{'prompt_id': descendant, 'generation': index.generation(descendant), 'distance': distance}
+                            for descendant, distance in index.descendants(prompt_id)]
         }
     
     # ═══════════════════════════════════════════════════════════════
@@ -1262,57 +1204,47 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
     # ═══════════════════════════════════════════════════════════════
     
     def parse_prompt_file(self, file_path):
-        """Parse a prompt file into structured data."""
+        """
+        Parse a prompt file into structured data
+        
+        One pass over the file (lib.prompt_parser) collects every section, including
+        the multi-line content sections DNA analysis reads. Problems are reported
+        with file and line; warnings (repeated or misspelt headers) do not block.
+        
+        Returns:
+            Property name -> value (every section, normalised dates, Models as a list,
+            Full Prompt), or None when the file cannot be used
+        """
         try:
-            with open(file_path, 'r') as f:
+            with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
-            # Extract key sections using regex
-            prompt_data = {}
-            
-            # Extract basic metadata
-            prompt_data['Prompt ID'] = re.search(r'PROMPT_ID:\s*(.+)', content).group(1).strip()
-            prompt_data['Version'] = re.search(r'VERSION:\s*(.+)', content).group(1).strip()
-            prompt_data['Purpose'] = re.search(r'PURPOSE:\s*(.+)', content).group(1).strip()
-            
-            # Try to extract other fields, some might be missing
-            try:
-                prompt_data['Type'] = re.search(r'PROMPT_TYPE:\s*(.+)', content).group(1).strip()
-            except:
-                prompt_data['Type'] = "meta"  # Default
-                
-            # Extract date information
-            try:
-                creation_date = re.search(r'CREATION_DATE:\s*(.+)', content).group(1).strip()
-                if creation_date == '@Today':
-                    creation_date = datetime.now().strftime('%Y-%m-%d')
-                prompt_data['Creation Date'] = creation_date
-            except:
-                prompt_data['Creation Date'] = datetime.now().strftime('%Y-%m-%d')
-                
-            try:
-                modified_date = re.search(r'LAST_MODIFIED_DATE:\s*(.+)', content).group(1).strip()
-                if modified_date.startswith('@'):
-                    modified_date = datetime.now().strftime('%Y-%m-%d')
-                prompt_data['Last Modified'] = modified_date
-            except:
-                prompt_data['Last Modified'] = datetime.now().strftime('%Y-%m-%d')
-            
-            # Extract complex fields
-            try:
-                models_section = re.search(r'MODELS:\s*(.+)', content).group(1).strip()
-                prompt_data['Models'] = [m.strip() for m in models_section.split(',')]
-            except:
-                prompt_data['Models'] = ["GPT-4", "Claude 3"]
-                
-            # Store full content
-            prompt_data['Full Prompt'] = content
-            
-            return prompt_data
-            
-        except Exception as e:
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading prompt file: {e}")
+            return None
+        
+        try:
+            document = parse_prompt_document(content, source=file_path)
+        except ParseError as e:
             print(f"❌ Error parsing prompt file: {e}")
             return None
+        for warning in document['warnings']:
+            print(f"⚠️  {warning}")
+        
+        prompt_data = dict(document['sections'])
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        prompt_data.setdefault('Type', "meta")  # Default
+        for date_field in ('Creation Date', 'Last Modified'):
+            if not prompt_data.get(date_field) or prompt_data[date_field].startswith('@'):
+                prompt_data[date_field] = today
+        
+        models = [m.strip() for m in prompt_data.get('Models', '').split(',') if m.strip()]
+        prompt_data['Models'] = models or ["GPT-4", "Claude 3"]
+        
+        # Store full content
+        prompt_data['Full Prompt'] = content
+        
+        return prompt_data
     
     def create_prompt(self, file_path):
         """Create a new prompt in the database from a file."""
@@ -1322,15 +1254,8 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
             return False
         
         try:
-            # Get the database to determine the title property name
-            db = self.notion.databases.retrieve(database_id=self.database_id)
-            title_property_name = None
-            
-            # Find the title property
-            for prop_name, prop in db['properties'].items():
-                if prop['type'] == 'title':
-                    title_property_name = prop_name
-                    break
+            # Get the title property name (database schema is cached per manager)
+            title_property_name = self._get_title_property()
             
             if not title_property_name:
                 print("❌ Error: No title property found in the database")
@@ -1364,21 +1289,21 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
                     "multi_select": [{"name": model} for model in prompt_data['Models']]
                 }
                 
+            children = []
             if 'Full Prompt' in prompt_data:
-                # Truncate if needed as Notion has limits
-                full_prompt = prompt_data['Full Prompt']
-                if len(full_prompt) > 2000:
-                    full_prompt = full_prompt[:1997] + "..."
-                    
-                properties["Full Prompt"] = {
-                    "rich_text": [{"text": {"content": full_prompt}}]
-                }
+                # Long text is split across segments (and the page body when large)
+                properties["Full Prompt"], children = encode_text('Full Prompt', prompt_data['Full Prompt'])
             
-            # Create the page
-            response = self.notion.pages.create(
-                parent={"database_id": self.database_id},
-                properties=properties
-            )
+            # Content sections (what DNA analysis reads) are stored the same way
+            for field in TEMPLATE_TEXT_FIELDS:
+                if prompt_data.get(field) and field not in properties:
+                    properties[field], field_blocks = encode_text(field, prompt_data[field])
+                    children.extend(field_blocks)
+            
+            # Create the page (with the first body block in the same call)
+            response = self.storage.create(properties, children=children[:1])
+            for block in children[1:]:
+                self.writer.limiter.call(self.storage.append_blocks, response['id'], [block])
             
             print(f"✅ Created prompt: {prompt_data['Prompt ID']}")
             return response['id']
@@ -1387,10 +1312,243 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
             print(f"❌ Error creating prompt: {e}")
             return False
     
+    def import_templates(self, paths: List[str], workers: Optional[int] = None,
+                         dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Upsert a tree of template files into the library
+        
+        Files are parsed in a process pool and matched against existing pages by
+        Prompt ID using one library scan. A file whose properties hash the same as
+        its page's is skipped without an API call. Changed pages get only their
+        changed properties, and new pages are created. Both run concurrently under the
+        shared Notion rate limit.
+        
+        Args:
+            paths: Files, directories or globs
+            workers: Parallelism for parsing and upserts (default: CPU count)
+            dry_run: Work out what would change, write nothing
+        
+        Returns:
+            {'files', 'created', 'updated', 'unchanged', 'skipped': [(file, reason)], 'failed': [(file, error)],
+             'warnings': [located parser warnings]}
+        """
+        from lib.bulk_import import parse_import_file
+        from lib.local_analysis import expand_paths
+        
+        workers = workers or os.cpu_count() or 1
+        files = expand_paths(paths)
+        summary = {'files': len(files), 'created': [], 'updated': [], 'unchanged': [], 'skipped': [], 'failed': [],
+                   'warnings': []}
+        if not files:
+            return summary
+        
+        # Phase 1: parse every file in a process pool
+        if workers > 1 and len(files) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+                parsed_files = list(pool.map(parse_import_file, files))
+        else:
+            parsed_files = [parse_import_file(path) for path in files]
+        
+        return self._upsert_parsed(parsed_files, summary, workers, dry_run)
+    
+    def _upsert_parsed(self, parsed_files: List[Dict[str, Any]], summary: Dict[str, Any], workers: int,
+                       dry_run: bool, pages: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
+        """
+        Create or update pages from parsed templates (see import_templates); fills in summary
+        
+        pages: Prompt ID -> page map the caller keeps current (skips the library scan);
+               created pages are added to it
+        """
+        from lib.bulk_import import build_payload, content_hash
+        
+        # Phase 2: one scan maps Prompt IDs to existing pages
+        title_property = self._get_title_property()
+        if pages is None:
+            pages = {}
+            for record in self.scan_library(fields=('Prompt ID',)):
+                pages.setdefault(record['Prompt ID'], record.page)
+        
+        # Phase 3: diff each file against its page by content hash
+        creates, updates = [], []
+        claimed = {}
+        for parsed in parsed_files:
+            if 'error' in parsed:
+                summary['failed'].append((parsed['file'], parsed['error']))
+                continue
+            summary['warnings'].extend(parsed['warnings'])
+            prompt_id = parsed['prompt_id']
+            if not prompt_id:
+                summary['skipped'].append((parsed['file'], "no PROMPT_ID - not a prompt template"))
+                continue
+            if prompt_id in claimed:
+                summary['skipped'].append((parsed['file'], f"Prompt ID {prompt_id} already imported from {claimed[prompt_id]}"))
+                continue
+            claimed[prompt_id] = parsed['file']
+            
+            page = pages.get(prompt_id)
+            payload = build_payload(parsed, self.expected_schema, title_property, is_new=page is None)
+            if page is None:
+                creates.append((parsed, payload))
+                continue
+            
+            stored = {name: page['properties'].get(name) for name in payload['properties']}
+            if content_hash(payload['properties']) == content_hash(stored):
+                summary['unchanged'].append(prompt_id)
+                continue
+            changed = [name for name, prop in payload['properties'].items()
+                       if content_hash({name: prop}) != content_hash({name: stored[name]})]
+            updates.append((parsed, payload, page, changed))
+        
+        if dry_run:
+            summary['created'] = [parsed['prompt_id'] for parsed, _ in creates]
+            summary['updated'] = [parsed['prompt_id'] for parsed, *_ in updates]
+            return summary
+        
+        # Phase 4: creates run concurrently under the shared rate limit; updates are staged
+        # in the write buffer (which sends only changed properties) and flushed concurrently
+        limiter = self.writer.limiter
+        
+        def create(parsed, payload):
+            children = [block for blocks in payload['blocks'].values() for block in blocks]
+            response = limiter.call(self.storage.create, payload['properties'], children=children[:1])
+            for block in children[1:]:
+                limiter.call(self.storage.append_blocks, response['id'], [block])
+            pages[parsed['prompt_id']] = response
+            return 'created'
+        
+        def update(parsed, payload, page, changed):
+            properties = {}
+            written = False
+            for name in changed:
+                if name in payload['texts']:
+                    properties[name], direct = self._replace_chunked_text(page['id'], name, payload['texts'][name],
+                                                                          page['properties'].get(name))
+                    written = written or direct
+                else:
+                    properties[name] = payload['properties'][name]
+            # A changed Last Modified stamp alone is not worth a write - unless a field was written directly
+            staged = self.writer.update(page['id'], properties, touched=written)
+            return 'unchanged' if staged == 'suppressed' and not written else 'updated'
+        
+        staged = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(create, *job): job for job in creates}
+            futures.update({pool.submit(update, *job): job for job in updates})
+            for future in as_completed(futures):
+                parsed = futures[future][0]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    summary['failed'].append((parsed['file'], str(e)))
+                    continue
+                if outcome == 'updated':
+                    staged[futures[future][2]['id']] = parsed
+                else:
+                    summary[outcome].append(parsed['prompt_id'])
+        
+        failed_pages = set(self.writer.flush())
+        for page_id, parsed in staged.items():
+            if page_id in failed_pages:
+                summary['failed'].append((parsed['file'], "page update failed"))
+            else:
+                summary['updated'].append(parsed['prompt_id'])
+        
+        return summary
+    
+    # ═══════════════════════════════════════════════════════════════
+    # SNAPSHOTS (OFFLINE COPIES OF THE WHOLE LIBRARY)
+    # ═══════════════════════════════════════════════════════════════
+    
+    def export_snapshot(self, path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Write every prompt (all properties) and its DNA metrics to one snapshot file (see lib.snapshot)
+        
+        One paginated scan loads the library; DNA profiles come from the cache and prompts
+        never analysed before are analysed in a process pool.
+        
+        Returns:
+            {'records', 'bytes', 'analyzed'}
+        """
+        from lib.snapshot import write_snapshot
+        
+        records = self.scan_library()
+        texts = [self.compose_prompt_text(record, DNA_CONTENT_FIELDS) for record in records]
+        misses = self.dna_cache.misses
+        profiles = iter(self._compute_profiles(
+            [(record['Prompt ID'], text) for record, text in zip(records, texts) if text],
+            workers or os.cpu_count() or 1
+        ))
+        
+        entries = []
+        for record, text in zip(records, texts):
+            profile = next(profiles) if text else None
+            properties = {field: record[field] for field in record.fields}
+            # Unset numbers extract as 0 - keep them unset so importing the snapshot writes no zeros
+            for field, value in properties.items():
+                raw = record.page['properties'].get(field) or {}
+                if isinstance(value, (int, float)) and raw.get('type', 'number') == 'number' and raw.get('number') is None:
+                    properties[field] = None
+            entries.append({
+                'prompt_id': record['Prompt ID'],
+                'page_id': record['id'],
+                'last_edited': record.page.get('last_edited_time'),
+                'properties': properties,
+                'dna': None if profile is None else {
+                    'content_hash': profile['content_hash'],
+                    'personality_ratios': profile['personality_ratios'],
+                    **{metric: profile[metric] for metric in SNAPSHOT_DNA_METRICS},
+                    'viral_coefficient': profile['viral_potential']['viral_coefficient'],
+                },
+            })
+        
+        result = write_snapshot(path, entries, {
+            'database_id': self.database_id,
+            'exported_at': datetime.now().isoformat(timespec='seconds'),
+            'analysis_version': self.ANALYSIS_VERSION,
+        })
+        result['analyzed'] = self.dna_cache.misses - misses
+        return result
+    
+    def import_snapshot(self, path: str, workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Upsert every prompt of a snapshot into the library
+        
+        Matching, content hashing and writes are the same as import_templates: unchanged
+        prompts cost no API call. Relations are not restored (page ids differ between
+        workspaces; 'Parent Prompts' text carries the lineage).
+        
+        Returns:
+            The import_templates summary; 'files' counts snapshot records
+        """
+        from lib.snapshot import Snapshot
+        
+        with Snapshot(path) as snapshot:
+            parsed_files = [self._parsed_from_snapshot(path, record) for record in snapshot]
+        summary = {'files': len(parsed_files), 'created': [], 'updated': [], 'unchanged': [], 'skipped': [],
+                   'failed': [], 'warnings': []}
+        return self._upsert_parsed(parsed_files, summary, workers or os.cpu_count() or 1, dry_run)
+    
+    @staticmethod
+    def _parsed_from_snapshot(path: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """A snapshot record in the shape parse_import_file returns (section bodies as text)"""
+        sections = {}
+        for name, value in record['properties'].items():
+            if name in ('Prompt ID', 'Full Prompt') or value is None or value == '' or value == []:
+                continue
+            sections[name] = ', '.join(value) if isinstance(value, list) else str(value)
+        return {
+            'file': f"{path}#{record['prompt_id']}",
+            'prompt_id': record['prompt_id'],
+            'sections': sections,
+            'warnings': [],
+            'text': record['properties'].get('Full Prompt') or '',
+        }
+    
     def update_prompt(self, prompt_id, file_path=None, prompt_data=None):
         """Update an existing prompt in the database."""
-        # First get the existing prompt
-        existing_record = self.read_prompt(prompt_id)
+        # First get the existing prompt - only its page id is needed
+        existing_record = self.read_prompt(prompt_id, fields=())
         
         if not existing_record:
             print(f"Cannot update non-existent prompt: {prompt_id}")
@@ -1432,23 +1590,29 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
                     "multi_select": [{"name": model} for model in prompt_data['Models']]
                 }
                 
+            # Large fields replacing block-stored ones are written directly (see _replace_chunked_text)
+            written = False
             if 'Full Prompt' in prompt_data:
-                # Truncate if needed as Notion has limits
-                full_prompt = prompt_data['Full Prompt']
-                if len(full_prompt) > 2000:
-                    full_prompt = full_prompt[:1997] + "..."
-                    
-                properties["Full Prompt"] = {
-                    "rich_text": [{"text": {"content": full_prompt}}]
-                }
-            
-            # Update the page
-            self.notion.pages.update(
-                page_id=existing_record['id'],
-                properties=properties
-            )
-            
-            print(f"✅ Updated prompt: {prompt_id}")
+                # Long text is split across segments (and the page body when large)
+                properties["Full Prompt"], written = self._replace_chunked_text(
+                    existing_record['id'], 'Full Prompt', prompt_data['Full Prompt'],
+                    existing_record.page['properties'].get('Full Prompt'))
+            
+            # Content sections (what DNA analysis reads) are stored the same way
+            for field in TEMPLATE_TEXT_FIELDS:
+                if prompt_data.get(field) and field not in properties:
+                    properties[field], direct = self._replace_chunked_text(
+                        existing_record['id'], field, prompt_data[field],
+                        existing_record.page['properties'].get(field))
+                    written = written or direct
+            
+            # Stage the update - values identical to the stored ones are dropped,
+            # and a Last Modified stamp alone never triggers a write (unless a field was written directly)
+            staged = self.writer.update(existing_record['id'], properties, touched=written)
+            if staged == 'suppressed' and not written:
+                print(f"✅ Prompt already up to date: {prompt_id} (no write needed)")
+            else:
+                print(f"✅ Updated prompt: {prompt_id}")
             return True
             
         except Exception as e:
@@ -1457,8 +1621,8 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
     
     def delete_prompt(self, prompt_id):
         """Delete (archive) a prompt from the database."""
-        # First get the existing prompt
-        existing_record = self.read_prompt(prompt_id)
+        # First get the existing prompt - only its page id is needed
+        existing_record = self.read_prompt(prompt_id, fields=())
         
         if not existing_record:
             print(f"Cannot delete non-existent prompt: {prompt_id}")
@@ -1466,10 +1630,21 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
             
         try:
             # Archive the page (Notion's way of deleting)
-            self.notion.pages.update(
-                page_id=existing_record['id'],
-                archived=True
-            )
+            self.storage.archive(existing_record['id'])
+            
+            self.writer.discard(existing_record['id'])
+            
+            # Archived pages never show up in incremental scans - drop them from the local indexes
+            lineage_index = self._lineage_index or LineageIndex.load(self.database_id)
+            if lineage_index:
+                lineage_index.remove_page(existing_record['id'])
+                lineage_index.save()
+            search_index = self._search_index or SearchIndex.load(self.database_id)
+            if search_index:
+                search_index.remove(existing_record['id'])
+                search_index.save()
+            if self._inheritance_resolver is not None:
+                self._inheritance_resolver.remove(prompt_id)
             
             print(f"✅ Deleted prompt: {prompt_id}")
             return True
@@ -1490,14 +1665,12 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
                     }
                 }
                 
-            query_params = {
-                "database_id": self.database_id
-            }
+            query_params = {}
             
             # Only add sort if we're confident the property exists
             try:
                 # Check if the database has the Last Modified property
-                db = self.notion.databases.retrieve(database_id=self.database_id)
+                db = self._get_database_schema()
                 if "Last Modified" in db["properties"]:
                     query_params["sorts"] = [
                         {
@@ -1512,17 +1685,10 @@ Personality Conflicts: {dna_profile['personality_conflicts']} detected
             if filter_obj:
                 query_params["filter"] = filter_obj
                 
-            response = self.notion.databases.query(**query_params)
-            
-            # Get the database to determine the title property name
-            db = self.notion.databases.retrieve(database_id=self.database_id)
-            title_property_name = None
+            response = self.storage.query(**query_params)
             
-            # Find the title property
-            for prop_name, prop in db['properties'].items():
-                if prop['type'] == 'title':
-                    title_property_name = prop_name
-                    break
+            # Get the title property name (database schema is cached per manager)
+            title_property_name = self._get_title_property()
             
             if not title_property_name:
                 print("❌ Error: No title property found in the database")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+KHAOS Prompt Parser - READ THE TEMPLATE ONCE, TOP TO BOTTOM
+Line-oriented parser for prompt template files. One scan maps every section
+header to its Notion property and collects multi-line section bodies.
+
+Understands both template dialects used in templates/:
+- plain headers at the start of a line:     SYSTEM_INSTRUCTION: You are...
+- markdown bold headers, several per line:  **PROMPT ID:** x **VERSION:** 1.0.0
+
+Only known headers open a section; anything else (KHAOS:, NEVER:, indented
+EXECUTION_PARAMETERS entries) is body text of the section it appears in.
+
+parse_prompt_document adds validation on top of the same scan: missing or
+empty required sections, malformed dates, repeated headers and misspelt
+headers are reported with their line numbers.
+"""
+
+import difflib
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Normalised header name -> Notion property
+SECTION_PROPERTIES = {
+    'PROMPT_ID': 'Prompt ID',
+    'VERSION': 'Version',
+    'PROMPT_TYPE': 'Type',
+    'AUTHOR': 'Author',
+    'LANGUAGE': 'Language',
+    'GENERATION': 'Generation',
+    'PARENT_PROMPT': 'Parent Prompts',
+    'PARENT_PROMPTS': 'Parent Prompts',
+    'CREATION_DATE': 'Creation Date',
+    'LAST_MODIFIED': 'Last Modified',
+    'LAST_MODIFIED_DATE': 'Last Modified',
+    'PURPOSE': 'Purpose',
+    'CONTEXT': 'Context',
+    'CORE_MESSAGE': 'Core Message',
+    'SYSTEM_INSTRUCTION': 'System Instructions',
+    'SYSTEM_INSTRUCTIONS': 'System Instructions',
+    'INSTRUCTION': 'Instruction',
+    'INSTRUCTIONS': 'Instruction',
+    'USER_INPUT_EXPECTATION': 'User Input Expectation',
+    'OUTPUT_FORMAT': 'Output Format',
+    'FEW_SHOT_EXAMPLES': 'Few-Shot Examples',
+    'EXECUTION_PARAMETERS': 'Execution Parameters',
+    'NOTES': 'Notes',
+    'MODELS': 'Models',
+    'TAGS': 'Tags',
+    'USAGE_CONTEXTS': 'Usage Contexts',
+    'VIRAL_HOOKS': 'Viral Hooks',
+    'SECURITY_LEVEL': 'Security Level',
+}
+
+_PLAIN_HEADER = re.compile(r'^([A-Z][A-Z0-9_]*):(.*)$')
+_MARKDOWN_HEADER = re.compile(r'\*\*([A-Z][A-Z0-9 _-]*):\*\*')
+# "# ═══════" banners and "* * *" rules close the current section
+_SEPARATOR = re.compile(r'^\s*(?:#\s*[═=─-]{3,}|\*\s*\*\s*\*)\s*$')
+
+
+def normalize_header(name: str) -> str:
+    """'FEW-SHOT EXAMPLES' / 'few_shot_examples' -> 'FEW_SHOT_EXAMPLES'"""
+    return re.sub(r'[\s-]+', '_', name.strip()).upper()
+
+
+# Sections a template must have to become a prompt page
+REQUIRED_SECTIONS = ('Prompt ID', 'Version', 'Purpose')
+
+# Date sections: YYYY-MM-DD, or a relative value like @Today
+DATE_SECTIONS = ('Creation Date', 'Last Modified')
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# "SYSTEM_INSTRUCTON:" at the start of a line - header-shaped, but not a known header
+_HEADER_LIKE = re.compile(r'^([A-Z][A-Z_]{3,}):')
+
+
+class ParseError(ValueError):
+    """A template problem, located by file and line"""
+
+    def __init__(self, message: str, line: Optional[int] = None, source: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.source = source
+
+    def __str__(self) -> str:
+        location = self.source or '<template>'
+        if self.line is not None:
+            location += f":{self.line}"
+        return f"{location}: {self.message}"
+
+
+def _scan(text: str) -> Tuple[Dict[str, str], Dict[str, List[int]], List[Tuple[int, str]]]:
+    """
+    The single pass behind both public parsers
+
+    Returns:
+        (sections, header line numbers per property, unknown header-shaped words with their lines)
+    """
+    sections: Dict[str, str] = {}
+    header_lines: Dict[str, List[int]] = {}
+    unknown_headers: List[Tuple[int, str]] = []
+    current: Optional[str] = None
+    body = []
+    in_banner = False
+
+    def close():
+        if current is not None:
+            sections[current] = '\n'.join(body).strip()
+
+    def open_section(prop, line_number):
+        header_lines.setdefault(prop, []).append(line_number)
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if _SEPARATOR.match(line):
+            close()
+            current, body = None, []
+            in_banner = line.lstrip().startswith('#') and not in_banner
+            continue
+        # Banner titles ("# CORE IDENTIFICATION") sit between two separators
+        if in_banner and line.lstrip().startswith('#'):
+            continue
+        in_banner = False
+
+        plain = _PLAIN_HEADER.match(line)
+        if plain and normalize_header(plain.group(1)) in SECTION_PROPERTIES:
+            close()
+            current, body = SECTION_PROPERTIES[normalize_header(plain.group(1))], [plain.group(2)]
+            open_section(current, line_number)
+            continue
+        if plain and _HEADER_LIKE.match(line):
+            unknown_headers.append((line_number, plain.group(1)))
+
+        # Markdown headers may appear several times in one line
+        position = 0
+        for match in _MARKDOWN_HEADER.finditer(line):
+            prop = SECTION_PROPERTIES.get(normalize_header(match.group(1)))
+            if prop is None:
+                continue
+            body.append(line[position:match.start()])
+            close()
+            current, body = prop, []
+            open_section(current, line_number)
+            position = match.end()
+        body.append(line[position:])
+
+    close()
+    return sections, header_lines, unknown_headers
+
+
+def parse_prompt_text(text: str) -> Dict[str, str]:
+    """
+    Split a template into its sections
+
+    Returns:
+        Notion property name -> section body (stripped), in order of appearance.
+        A repeated header replaces the earlier body.
+    """
+    return _scan(text)[0]
+
+
+def parse_prompt_document(text: str, source: Optional[str] = None,
+                          required: Tuple[str, ...] = REQUIRED_SECTIONS) -> Dict[str, Any]:
+    """
+    Parse and validate a template in one scan
+
+    Args:
+        text: Template content
+        source: File name used in messages
+        required: Sections that must be present and non-empty
+
+    Returns:
+        {'sections': {property: body}, 'lines': {property: header line},
+         'warnings': [located messages for problems that do not block an import]}
+
+    Raises:
+        ParseError: for the first blocking problem (missing/empty required section, bad date)
+    """
+    sections, header_lines, unknown_headers = _scan(text)
+    lines = {prop: numbers[-1] for prop, numbers in header_lines.items()}
+    require_sections(sections, lines, required, source)
+
+    for prop in DATE_SECTIONS:
+        value = sections.get(prop)
+        if value and not value.startswith('@') and not _valid_date(value):
+            raise ParseError(f"{header_name(prop)}: expected YYYY-MM-DD or @Today, got {value!r}",
+                             lines[prop], source)
+
+    warnings = []
+    for prop, numbers in header_lines.items():
+        if len(numbers) > 1:
+            warnings.append(str(ParseError(f"{header_name(prop)}: repeated (line {numbers[0]} is overridden)",
+                                           numbers[-1], source)))
+    known = list(SECTION_PROPERTIES)
+    for line_number, name in unknown_headers:
+        suggestion = difflib.get_close_matches(normalize_header(name), known, n=1, cutoff=0.85)
+        if suggestion:
+            warnings.append(str(ParseError(f"unknown header {name}: (did you mean {suggestion[0]}:?)",
+                                           line_number, source)))
+
+    return {'sections': sections, 'lines': lines, 'warnings': warnings}
+
+
+def require_sections(sections: Dict[str, str], lines: Dict[str, int],
+                     required: Tuple[str, ...] = REQUIRED_SECTIONS, source: Optional[str] = None):
+    """Raise ParseError unless every required section is present and non-empty"""
+    missing = [prop for prop in required if prop not in sections]
+    if missing:
+        headers = ', '.join(header_name(prop) + ':' for prop in missing)
+        raise ParseError(f"missing required section(s) {headers}", source=source)
+
+    for prop in required:
+        if not sections[prop]:
+            raise ParseError(f"{header_name(prop)}: is empty", lines[prop], source)
+
+
+def header_name(prop: str) -> str:
+    """The canonical template header for a Notion property ('Prompt ID' -> 'PROMPT_ID')"""
+    return next(header for header, name in SECTION_PROPERTIES.items() if name == prop)
+
+
+def render_prompt_text(sections: Dict[str, str]) -> str:
+    """
+    A plain-header template for the given sections (property -> body), in header order
+
+    One-line values share the header line; longer bodies follow it. The result parses
+    back to the same sections.
+    """
+    lines = []
+    for prop in dict.fromkeys(SECTION_PROPERTIES.values()):
+        body = (sections.get(prop) or '').strip()
+        if not body:
+            continue
+        if '\n' in body:
+            lines.extend((f"{header_name(prop)}:", body, ""))
+        else:
+            lines.append(f"{header_name(prop)}: {body}")
+    return '\n'.join(lines).rstrip() + '\n'
+
+
+def _valid_date(value: str) -> bool:
+    if not _ISO_DATE.match(value):
+        return False
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+KHAOS Prompt Schema - THE 38 PROPERTIES, CARVED IN STONE
+Single source of truth for every prompt database property: type, options and
+validation rules. Built once at import and frozen (read-only mappings, tuples
+for lists), so every PromptManager shares it instead of rebuilding it.
+"""
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_SCHEMA = {
+    # ═══════════════════════════════════════════════════════════════
+    # TITLE PROPERTIES (1)
+    # ═══════════════════════════════════════════════════════════════
+    "Prompt ID": {
+        "type": "title",
+        "required": True,
+        "description": "Primary identifier - auto-title field",
+        "validation": "non_empty_string"
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # RICH_TEXT PROPERTIES (16)
+    # ═══════════════════════════════════════════════════════════════
+    "Author": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Prompt creator/author",
+        "validation": "string",
+        "default": ""
+    },
+    "Context": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Background and environmental setup",
+        "validation": "string",
+        "default": ""
+    },
+    "Core Message": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Central theme or message",
+        "validation": "string",
+        "default": ""
+    },
+    "DNA Hash": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Content fingerprint for uniqueness tracking",
+        "validation": "string",
+        "default": ""
+    },
+    "Execution Parameters": {
+        "type": "rich_text",
+        "required": False,
+        "description": "JSON configuration parameters",
+        "validation": "string",
+        "default": ""
+    },
+    "Few-Shot Examples": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Training examples and demonstrations",
+        "validation": "string",
+        "default": ""
+    },
+    "Instruction": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Core behavioral directives",
+        "validation": "string",
+        "default": ""
+    },
+    "Language": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Primary language (en, de, etc.)",
+        "validation": "string",
+        "default": "en"
+    },
+    "Notes": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Usage notes and tips",
+        "validation": "string",
+        "default": ""
+    },
+    "Output Format": {
+        "type": "rich_text",
+        "required": False,
+        "description": "How responses should be structured",
+        "validation": "string",
+        "default": ""
+    },
+    "Parent Prompts": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Parent prompt relationships (ROOT for top-level)",
+        "validation": "string",
+        "default": "ROOT"
+    },
+    "Personality Mix": {
+        "type": "rich_text",
+        "required": False,
+        "description": "JSON of personality trait ratios",
+        "validation": "string",
+        "default": ""
+    },
+    "Purpose": {
+        "type": "rich_text",
+        "required": True,
+        "description": "What this prompt achieves",
+        "validation": "non_empty_string"
+    },
+    "System Instructions": {
+        "type": "rich_text",
+        "required": False,
+        "description": "Core AI personality and role definition",
+        "validation": "string",
+        "default": ""
+    },
+    "User Input Expectation": {
+        "type": "rich_text",
+        "required": False,
+        "description": "What kind of input to expect",
+        "validation": "string",
+        "default": ""
+    },
+    "Version": {
+        "type": "rich_text",
+        "required": True,
+        "description": "Semantic version number",
+        "validation": "non_empty_string"
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # SELECT PROPERTIES (5)
+    # ═══════════════════════════════════════════════════════════════
+    "Cynefin Zone": {
+        "type": "select",
+        "required": False,
+        "options": [
+            {"name": "simple", "color": "green"},
+            {"name": "complicated", "color": "blue"},
+            {"name": "complex", "color": "yellow"},
+            {"name": "chaotic", "color": "red"},
+            {"name": "disorder", "color": "gray"}
+        ],
+        "description": "Cynefin complexity domain",
+        "validation": "select_option",
+        "default": None
+    },
+    "Health Status": {
+        "type": "select",
+        "required": False,
+        "options": [
+            {"name": "Healthy", "color": "green"},
+            {"name": "Needs Optimization", "color": "yellow"},
+            {"name": "Problematic", "color": "red"},
+            {"name": "Excellent", "color": "blue"},
+            {"name": "Unanalyzed", "color": "gray"}
+        ],
+        "description": "Current health assessment",
+        "validation": "select_option",
+        "default": "Unanalyzed"
+    },
+    "Personality Intensity": {
+        "type": "select",
+        "required": False,
+        "options": [
+            {"name": "40%", "color": "gray"},
+            {"name": "50%", "color": "blue"},
+            {"name": "60%", "color": "green"},
+            {"name": "70%", "color": "yellow"},
+            {"name": "80%", "color": "red"}
+        ],
+        "description": "Personality strength setting",
+        "validation": "select_option",
+        "default": None
+    },
+    "Security Level": {
+        "type": "select",
+        "required": False,
+        "options": [
+            {"name": "public", "color": "green"},
+            {"name": "client", "color": "blue"},
+            {"name": "private", "color": "orange"},
+            {"name": "classified", "color": "red"}
+        ],
+        "description": "Access control level",
+        "validation": "select_option",
+        "default": "public"
+    },
+    "Type": {
+        "type": "select",
+        "required": True,
+        "options": [
+            {"name": "meta", "color": "red"},
+            {"name": "consultation", "color": "blue"},
+            {"name": "workshop", "color": "green"},
+            {"name": "analysis", "color": "yellow"},
+            {"name": "creation", "color": "purple"},
+            {"name": "viral", "color": "orange"},
+            {"name": "coding-companion", "color": "pink"}
+        ],
+        "description": "Prompt category classification",
+        "validation": "select_option"
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # MULTI_SELECT PROPERTIES (4)
+    # ═══════════════════════════════════════════════════════════════
+    "Models": {
+        "type": "multi_select",
+        "required": False,
+        "options": [
+            {"name": "GPT-4", "color": "green"},
+            {"name": "Claude 3", "color": "blue"},
+            {"name": "Claude 3.7 Sonnet", "color": "purple"},
+            {"name": "Claude Sonnet 4", "color": "red"},
+            {"name": "Perplexity", "color": "yellow"},
+            {"name": "Grok 3", "color": "orange"},
+            {"name": "Gemini 2.5 Pro", "color": "pink"}
+        ],
+        "description": "Compatible AI models",
+        "validation": "multi_select_options",
+        "default": []
+    },
+    "Tags": {
+        "type": "multi_select",
+        "required": False,
+        "options": [
+            {"name": "meta", "color": "red"},
+            {"name": "template", "color": "blue"},
+            {"name": "orchestration", "color": "green"},
+            {"name": "persona", "color": "yellow"},
+            {"name": "core", "color": "purple"},
+            {"name": "sarcasm", "color": "orange"},
+            {"name": "consulting", "color": "pink"},
+            {"name": "transformation", "color": "gray"},
+            {"name": "complexity", "color": "brown"},
+            {"name": "optimization", "color": "default"}
+        ],
+        "description": "Searchable categorization tags",
+        "validation": "multi_select_options",
+        "default": []
+    },
+    "Usage Contexts": {
+        "type": "multi_select",
+        "required": False,
+        "options": [
+            {"name": "EU AI Act", "color": "blue"},
+            {"name": "Workshops", "color": "green"},
+            {"name": "Coding", "color": "purple"},
+            {"name": "Sales", "color": "yellow"},
+            {"name": "Content Creation", "color": "orange"},
+            {"name": "Consulting", "color": "red"}
+        ],
+        "description": "Where this prompt is used",
+        "validation": "multi_select_options",
+        "default": []
+    },
+    "Viral Hooks": {
+        "type": "multi_select",
+        "required": False,
+        "options": [
+            {"name": "Schrödinger's Agile", "color": "blue"},
+            {"name": "Complexity Whisperer", "color": "green"},
+            {"name": "AI Act Navigator", "color": "purple"},
+            {"name": "Meme Machine", "color": "orange"},
+            {"name": "KHAOS", "color": "red"},
+            {"name": "TARS-style wit", "color": "yellow"},
+            {"name": "Philosophical Musings", "color": "gray"},
+            {"name": "Optimization Addict", "color": "pink"},
+            {"name": "Digital Archaeologist", "color": "brown"},
+            {"name": "Prompt DNA", "color": "default"},
+            {"name": "Archaeological Analysis", "color": "default"}
+        ],
+        "description": "Memorable phrases and concepts",
+        "validation": "multi_select_options",
+        "default": []
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # NUMBER PROPERTIES (5)
+    # ═══════════════════════════════════════════════════════════════
+    "Complexity Score": {
+        "type": "number",
+        "required": False,
+        "description": "Calculated complexity rating (0-10)",
+        "validation": "number_range",
+        "min_value": 0,
+        "max_value": 10,
+        "default": None
+    },
+    "Effectiveness Score": {
+        "type": "number",
+        "required": False,
+        "description": "Predicted effectiveness (0-1)",
+        "validation": "number_range",
+        "min_value": 0,
+        "max_value": 1,
+        "default": None
+    },
+    "Generation": {
+        "type": "number",
+        "required": False,
+        "description": "Evolution generation number",
+        "validation": "number_range",
+        "min_value": 0,
+        "max_value": None,
+        "default": 0
+    },
+    "Temperature": {
+        "type": "number",
+        "required": False,
+        "description": "AI model temperature setting (0.0-1.0)",
+        "validation": "number_range",
+        "min_value": 0.0,
+        "max_value": 1.0,
+        "default": None
+    },
+    "Viral Coefficient": {
+        "type": "number",
+        "required": False,
+        "description": "Meme propagation potential (0-1)",
+        "validation": "number_range",
+        "min_value": 0,
+        "max_value": 1,
+        "default": None
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # DATE PROPERTIES (5)
+    # ═══════════════════════════════════════════════════════════════
+    "Analysis Date": {
+        "type": "date",
+        "required": False,
+        "description": "When last analyzed for health/effectiveness",
+        "validation": "iso_date",
+        "default": None
+    },
+    "Creation Date": {
+        "type": "date",
+        "required": False,
+        "description": "When prompt was created",
+        "validation": "iso_date",
+        "default": None
+    },
+    "Last Analysis Date": {
+        "type": "date",
+        "required": False,
+        "description": "When last archaeological analysis was performed",
+        "validation": "iso_date",
+        "default": None
+    },
+    "Last Modification Date": {
+        "type": "date",
+        "required": False,
+        "description": "When prompt was last updated",
+        "validation": "iso_date",
+        "default": None
+    },
+    "Last Modified": {
+        "type": "date",
+        "required": False,
+        "description": "When prompt was last updated (duplicate field)",
+        "validation": "iso_date",
+        "default": None
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # RELATION PROPERTIES (1)
+    # ═══════════════════════════════════════════════════════════════
+    "Parent Prompt": {
+        "type": "relation",
+        "required": False,
+        "description": "Parent-child relationships for lineage tracking",
+        "validation": "relation_id",
+        "default": None
+    },
+
+    # ═══════════════════════════════════════════════════════════════
+    # FORMULA PROPERTIES (1) - READ ONLY
+    # ═══════════════════════════════════════════════════════════════
+    "Full Prompt": {
+        "type": "formula",
+        "required": False,
+        "description": "Complete formatted prompt (generated from all fields)",
+        "validation": "read_only",
+        "default": ""
+    }
+}
+
+# Property name -> {'type', 'required', 'description', 'validation', 'default', ...}
+PROMPT_SCHEMA: Mapping[str, Mapping[str, Any]] = _freeze(_SCHEMA)
+del _SCHEMA
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+KHAOS Prompt Server - THE PROMPT IS ALREADY THERE WHEN YOU ASK
+Serves resolved prompts (see lib.inheritance) over plain HTTP/1.1 from memory:
+
+    GET /prompts                         index: every prompt with its versions and ETag
+    GET /prompts/<id>                    latest version, rendered as text
+    GET /prompts/<id>/<version>          a specific Version seen by this server
+    GET /prompts/<id>?format=json        the same, with sections and origins as JSON
+    GET /healthz                         catalogue size and last refresh
+
+Every response is rendered to bytes when the catalogue changes, so a request
+costs one dict lookup and one socket write. ETags are the ancestry key of the
+resolution; If-None-Match answers 304. Connections are kept alive.
+
+The catalogue is loaded from the local store on start (so serving begins at
+once), refreshed in the background from a refresh callable run in a worker
+thread, and saved back whenever it changes.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import unquote
+
+from lib.local_store import cache_path, load_json, save_json
+
+CATALOG_VERSION = 1
+
+# Versions kept per prompt (oldest dropped first)
+MAX_VERSIONS = 10
+
+# Requests with longer heads are rejected
+MAX_HEAD_BYTES = 16384
+
+_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 431: 'Request Header Fields Too Large'}
+
+
+def http_response(status: int, body: bytes = b'', content_type: str = 'text/plain; charset=utf-8',
+                  etag: Optional[str] = None) -> bytes:
+    """A complete HTTP/1.1 response"""
+    head = [f"HTTP/1.1 {status} {_REASONS[status]}"]
+    if etag:
+        head.append(f'ETag: "{etag}"')
+        head.append("Cache-Control: no-cache")
+    if status != 304:
+        head.append(f"Content-Type: {content_type}")
+        head.append(f"Content-Length: {len(body)}")
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body if status != 304 else b'')
+
+
+def _json_body(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _error(status: int, message: str) -> bytes:
+    return http_response(status, _json_body({'error': message}), 'application/json')
+
+
+class PromptCatalog:
+    """Resolved prompts by ID and Version, with every response pre-rendered"""
+
+    def __init__(self):
+        # prompt id -> {'latest': version, 'versions': {version: {'key', 'text', 'sections', 'origins'}}}
+        self.prompts: Dict[str, Dict[str, Any]] = {}
+        self.refreshed_at: Optional[str] = None
+        # (path, format) -> {'etag', 'response', 'not_modified'}; replaced as a whole on every change
+        self.routes: Dict[tuple, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+    # ═══════════════════════════════════════════════════════════════
+    # UPDATING
+    # ═══════════════════════════════════════════════════════════════
+
+    def update_from(self, resolver) -> int:
+        """Take every prompt's current resolution; returns how many prompts changed"""
+        changed = 0
+        current = set()
+        for prompt_id in resolver.sections:
+            current.add(prompt_id)
+            resolved = resolver.resolve(prompt_id)
+            entry = self.prompts.setdefault(prompt_id, {'latest': None, 'versions': {}})
+            latest = entry['versions'].get(entry['latest'])
+            if latest and latest['key'] == resolved['key'] and entry['latest'] == resolved['version']:
+                continue
+
+            versions = entry['versions']
+            versions.pop(resolved['version'], None)
+            versions[resolved['version']] = {
+                'key': resolved['key'],
+                'text': resolver.render(resolved),
+                'sections': resolved['sections'],
+                'origins': resolved['origins'],
+            }
+            while len(versions) > MAX_VERSIONS:
+                del versions[next(iter(versions))]
+            entry['latest'] = resolved['version']
+            changed += 1
+
+        for prompt_id in [prompt_id for prompt_id in self.prompts if prompt_id not in current]:
+            del self.prompts[prompt_id]
+            changed += 1
+
+        self.refreshed_at = datetime.now().isoformat(timespec='seconds')
+        if changed or not self.routes:
+            self.build_routes()
+        return changed
+
+    def build_routes(self):
+        """Pre-render every response; the new table replaces the old one in a single assignment"""
+        routes = {}
+        index = []
+        for prompt_id in sorted(self.prompts):
+            entry = self.prompts[prompt_id]
+            for version, rendered in entry['versions'].items():
+                paths = [f"/prompts/{prompt_id}/{version}"] if version else []
+                if version == entry['latest']:
+                    paths.append(f"/prompts/{prompt_id}")
+                text = http_response(200, rendered['text'].encode('utf-8'), etag=rendered['key'])
+                document = http_response(200, _json_body({'prompt_id': prompt_id, 'version': version, **rendered}),
+                                         'application/json', etag=rendered['key'])
+                not_modified = http_response(304, etag=rendered['key'])
+                for path in paths:
+                    routes[(path, 'text')] = {'etag': rendered['key'], 'response': text, 'not_modified': not_modified}
+                    routes[(path, 'json')] = {'etag': rendered['key'], 'response': document,
+                                              'not_modified': not_modified}
+            index.append({'prompt_id': prompt_id, 'latest': entry['latest'], 'versions': list(entry['versions']),
+                          'etag': entry['versions'][entry['latest']]['key']})
+        listing = http_response(200, _json_body(index), 'application/json')
+        routes[('/prompts', 'text')] = routes[('/prompts', 'json')] = {'etag': None, 'response': listing}
+        self.routes = routes
+
+    # ═══════════════════════════════════════════════════════════════
+    # LOCAL STORE
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _cache_file() -> str:
+        return cache_path("serve", "catalog.json")
+
+    @classmethod
+    def load(cls, database_id: Optional[str]) -> 'PromptCatalog':
+        """The catalogue last served for this database (empty if there is none)"""
+        catalog = cls()
+        data = load_json(cls._cache_file())
+        if data and data.get('version') == CATALOG_VERSION and data.get('database_id') == database_id:
+            catalog.prompts = data.get('prompts', {})
+            catalog.refreshed_at = data.get('refreshed_at')
+        catalog.build_routes()
+        return catalog
+
+    def save(self, database_id: Optional[str]):
+        save_json(self._cache_file(), {
+            'version': CATALOG_VERSION,
+            'database_id': database_id,
+            'refreshed_at': self.refreshed_at,
+            'prompts': self.prompts,
+        })
+
+
+class _HTTPProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1: GET only, keep-alive and pipelining, no request bodies"""
+
+    def __init__(self, server: 'PromptServer'):
+        self.server = server
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self.buffer) > MAX_HEAD_BYTES:
+                    self._finish(_error(431, "request head too large"), close=True)
+                return
+            head, self.buffer = self.buffer[:end], self.buffer[end + 4:]
+            if not self._handle(head):
+                return
+
+    def _handle(self, head: bytes) -> bool:
+        """Answer one request; returns False once the connection is closing"""
+        lines = head.split(b'\r\n')
+        parts = lines[0].split(b' ')
+        if len(parts) != 3:
+            self._finish(_error(400, "malformed request line"), close=True)
+            return False
+
+        if_none_match = None
+        close = parts[2] == b'HTTP/1.0'
+        for line in lines[1:]:
+            name, _, value = line.partition(b':')
+            name = name.strip().lower()
+            if name == b'if-none-match':
+                if_none_match = value.strip().decode('latin-1')
+            elif name == b'connection':
+                close = value.strip().lower() == b'close'
+            elif name in (b'content-length', b'transfer-encoding') and value.strip() not in (b'0', b''):
+                # Request bodies are never read - the stream could not be resynchronised
+                self._finish(_error(400, "request bodies are not supported"), close=True)
+                return False
+
+        method = parts[0]
+        if method not in (b'GET', b'HEAD'):
+            self._finish(_error(405, "only GET is supported"), close=True)
+            return False
+
+        response = self.server.respond(parts[1].decode('latin-1'), if_none_match)
+        if method == b'HEAD':
+            response = response[:response.find(b'\r\n\r\n') + 4]
+        self._finish(response, close)
+        return not close
+
+    def _finish(self, response: bytes, close: bool = False):
+        self.transport.write(response)
+        if close:
+            self.transport.close()
+
+
+class PromptServer:
+    """asyncio HTTP front of a PromptCatalog, with a background refresh task"""
+
+    def __init__(self, catalog: PromptCatalog, refresh: Optional[Callable[[], int]] = None,
+                 interval: float = 60.0, on_change: Optional[Callable[[], None]] = None):
+        self.catalog = catalog
+        self.refresh = refresh
+        self.interval = interval
+        self.on_change = on_change
+        self.requests = 0
+        self.started = time.time()
+        self.last_error: Optional[str] = None
+
+    def respond(self, target: str, if_none_match: Optional[str] = None) -> bytes:
+        """The full response for a request target"""
+        self.requests += 1
+        path, _, query = target.partition('?')
+        if '%' in path:
+            path = unquote(path)
+        if path == '/healthz':
+            return http_response(200, _json_body({
+                'prompts': len(self.catalog), 'refreshed_at': self.catalog.refreshed_at,
+                'requests': self.requests, 'uptime_seconds': round(time.time() - self.started),
+                'last_error': self.last_error,
+            }), 'application/json')
+
+        route = self.catalog.routes.get((path.rstrip('/') or '/', 'json' if 'format=json' in query else 'text'))
+        if route is None:
+            return _error(404, f"no prompt at {path}")
+        if if_none_match and route['etag'] and route['etag'] in if_none_match:
+            return route['not_modified']
+        return route['response']
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # Notion calls block - they run in a worker thread, requests keep being answered
+                changed = await loop.run_in_executor(None, self.refresh)
+                self.last_error = None
+                if changed and self.on_change:
+                    await loop.run_in_executor(None, self.on_change)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️  Background refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def serve(self, host: str, port: int, ready: Optional[Callable[[Any], None]] = None):
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: _HTTPProtocol(self), host, port, reuse_address=True)
+        refresher = asyncio.ensure_future(self._refresh_loop()) if self.refresh else None
+        if ready:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if refresher:
+                refresher.cancel()
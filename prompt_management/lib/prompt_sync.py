@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+KHAOS Prompt Sync - BOTH SIDES OF THE DIG, NEITHER SIDE SILENTLY BURIED
+Two-way sync between a template directory and the prompt library.
+
+Every prompt remembers its base: a fingerprint of the properties its template
+sets, as both sides agreed at the last sync. A side has changed when its
+fingerprint no longer matches the base:
+
+- local changes are found by file bytes (unchanged files are not even parsed)
+- remote changes come from one query for pages edited since the watermark
+  (the newest last_edited_time seen by the previous sync)
+
+Only local changes are pushed (changed properties only, through the import-dir
+upsert) and only remote changes are pulled. A prompt changed on both sides to
+different content is a conflict: it is reported, neither side is touched, and
+it stays a conflict until resolved with --resolve local|remote. A steady-state
+sync costs the one filtered query.
+
+Pulled files are the page's Full Prompt when that still matches the page's
+properties, otherwise a plain-header rendering of them (whose Full Prompt is
+then pushed back). Deleting a file never deletes its prompt, and prompts
+archived in Notion are not removed locally.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from lib.bulk_import import build_payload, parse_import_file, parse_import_text
+from lib.local_analysis import expand_paths
+from lib.local_store import cache_path, load_json, save_json
+from lib.notion_writer import canonical_property_value
+from lib.prompt_parser import SECTION_PROPERTIES, render_prompt_text
+
+SYNC_VERSION = 1
+
+RESOLUTIONS = ('local', 'remote')
+
+
+def sync_fingerprint(properties: Dict[str, Dict], names: List[str]) -> str:
+    """
+    Hash over the canonical values of the tracked properties
+
+    Empty and missing values count the same, so a payload and the page storing it agree.
+    """
+    canonical = {}
+    for name in names:
+        value = canonical_property_value(properties.get(name))
+        # Unknown shapes (formulas) are not compared
+        if value in (None, '', ()) or type(value) is object:
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        canonical[name] = value
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+                          .encode('utf-8')).hexdigest()[:16]
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _write_file(path: str, text: str):
+    """Replace a template atomically (editors and watchers never see half a file)"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".txt")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class PromptSync:
+    """Two-way sync of one template directory with the library of one manager"""
+
+    def __init__(self, manager, directory: str):
+        self.manager = manager
+        self.directory = os.path.abspath(directory)
+        key = hashlib.sha256(f"{manager.database_id}\0{self.directory}".encode('utf-8')).hexdigest()[:16]
+        self.state_file = cache_path("sync", f"{key}.json")
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        data = load_json(self.state_file)
+        if (not data or data.get('version') != SYNC_VERSION or data.get('database_id') != self.manager.database_id
+                or data.get('directory') != self.directory):
+            return {'version': SYNC_VERSION, 'database_id': self.manager.database_id, 'directory': self.directory,
+                    'watermark': None, 'files': {}, 'prompts': {}}
+        return data
+
+    def _save_state(self):
+        save_json(self.state_file, self.state)
+
+    def _tracked_properties(self, title_property: str) -> List[str]:
+        """Properties a template can set: the title, every section property and Full Prompt"""
+        schema = self.manager.expected_schema
+        names = {title_property, 'Full Prompt'}
+        names.update(prop for prop in SECTION_PROPERTIES.values() if prop in schema and prop != 'Prompt ID')
+        return sorted(names)
+
+    # ═══════════════════════════════════════════════════════════════
+    # PLAN
+    # ═══════════════════════════════════════════════════════════════
+
+    def _scan_local(self, summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Prompt ID -> {'parsed', 'file', 'digest'} for files changed since the last sync"""
+        files, prompts = self.state['files'], self.state['prompts']
+        current = {}
+        for path in expand_paths([self.directory]):
+            digest = _file_digest(path)
+            if digest is not None:
+                current[os.path.relpath(path, self.directory)] = digest
+        self._current_files = current
+
+        for prompt_id, entry in prompts.items():
+            if entry.get('file') and entry['file'] not in current:
+                summary['missing'].append((prompt_id, entry['file']))
+                # Detached: the prompt is recreated only if it changes in Notion
+                entry['file'] = None
+        for name in [name for name in files if name not in current]:
+            del files[name]
+
+        owners = {entry['file']: prompt_id for prompt_id, entry in prompts.items() if entry.get('file')}
+        local = {}
+        for name in sorted(name for name, digest in current.items() if files.get(name) != digest):
+            parsed = parse_import_file(os.path.join(self.directory, name))
+            if 'error' in parsed:
+                summary['failed'].append((name, parsed['error']))
+                if owners.get(name):
+                    # Edited but unreadable: its prompt must not be pulled over the edit
+                    local[owners[name]] = {'parsed': None, 'file': name, 'digest': current[name]}
+                continue
+            summary['warnings'].extend(parsed['warnings'])
+            prompt_id = parsed['prompt_id']
+            if not prompt_id and owners.get(name):
+                summary['failed'].append((name, f"PROMPT_ID removed (the file was synced as {owners[name]})"))
+                local[owners[name]] = {'parsed': None, 'file': name, 'digest': current[name]}
+                continue
+            if not prompt_id:
+                summary['skipped'].append((name, "no PROMPT_ID - not a prompt template"))
+                files[name] = current[name]
+                continue
+            owner = prompts.get(prompt_id, {}).get('file')
+            if (owner and owner != name) or prompt_id in local:
+                summary['skipped'].append((name, f"Prompt ID {prompt_id} is synced from {owner or local[prompt_id]['file']}"))
+                files[name] = current[name]
+                continue
+            previous = owners.get(name)
+            if previous and previous != prompt_id:
+                # The file now holds another prompt; the old one stays in Notion, detached
+                prompts[previous]['file'] = None
+            local[prompt_id] = {'parsed': parsed, 'file': name, 'digest': current[name]}
+        return local
+
+    def _scan_remote(self, title_property: str) -> Dict[str, Dict]:
+        """Prompt ID -> page for pages edited since the watermark (and unresolved conflicts)"""
+        watermark = self.state['watermark']
+        if watermark:
+            pages = self.manager._query_all_pages(
+                filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+            )
+        else:
+            pages = self.manager._query_all_pages()
+
+        remote = {}
+        newest = watermark
+        for page in pages:
+            edited = page.get('last_edited_time')
+            if edited and (newest is None or edited > newest):
+                newest = edited
+            prompt_id = self.manager._extract_title_property(page, title_property)
+            if prompt_id:
+                remote.setdefault(prompt_id, page)
+        self._newest_edit = newest
+
+        # A conflict stays one until resolved, even after the watermark has passed its edit
+        for prompt_id, entry in self.state['prompts'].items():
+            if entry.get('conflict') and prompt_id not in remote and entry.get('page_id'):
+                try:
+                    page = self.manager.storage.get(entry['page_id'])
+                except Exception:
+                    continue
+                if not page.get('archived'):
+                    remote[prompt_id] = page
+        return remote
+
+    # ═══════════════════════════════════════════════════════════════
+    # SYNC
+    # ═══════════════════════════════════════════════════════════════
+
+    def sync(self, dry_run: bool = False, resolve: Optional[str] = None, workers: int = 4) -> Dict[str, Any]:
+        """
+        Pull remote changes, push local ones, report conflicts
+
+        Args:
+            dry_run: Work out what would happen, change nothing (state included)
+            resolve: 'local' or 'remote' - which side wins the conflicts found
+
+        Returns:
+            {'pulled', 'pushed', 'created', 'in_sync', 'conflicts': [(prompt_id, file)],
+             'missing': [(prompt_id, file)], 'skipped', 'failed': [(file or prompt_id, error)],
+             'warnings', 'watermark'}
+        """
+        summary = {'pulled': [], 'pushed': [], 'created': [], 'in_sync': [], 'conflicts': [], 'missing': [],
+                   'skipped': [], 'failed': [], 'warnings': [], 'watermark': self.state['watermark']}
+        prompts, files = self.state['prompts'], self.state['files']
+
+        local = self._scan_local(summary)
+        # Remembered so that a steady-state sync needs no schema request
+        title_property = self.state.get('title_property') or self.manager._get_title_property()
+        self.state['title_property'] = title_property
+        names = self._tracked_properties(title_property)
+        remote = self._scan_remote(title_property)
+
+        pulls, pushes = [], []
+        for prompt_id in sorted(set(local) | set(remote)):
+            entry = prompts.get(prompt_id) or {}
+            base = entry.get('base')
+            change = local.get(prompt_id)
+            page = remote.get(prompt_id)
+            local_fp = None
+            if change and change['parsed'] is None:
+                if page is not None and sync_fingerprint(page['properties'], names) != base:
+                    if resolve == 'remote':
+                        pulls.append((prompt_id, page, sync_fingerprint(page['properties'], names), change))
+                    else:
+                        summary['conflicts'].append((prompt_id, change['file']))
+                        if not dry_run:
+                            prompts[prompt_id] = {**entry, 'page_id': page['id'], 'conflict': True}
+                continue
+            if change:
+                payload = build_payload(change['parsed'], self.manager.expected_schema, title_property,
+                                        is_new=not entry.get('page_id') and page is None)
+                local_fp = sync_fingerprint(payload['properties'], names)
+            remote_fp = sync_fingerprint(page['properties'], names) if page else None
+            local_changed = change is not None and local_fp != base
+            remote_changed = page is not None and remote_fp != base
+
+            if local_changed and remote_changed and local_fp == remote_fp:
+                # Same edit on both sides
+                summary['in_sync'].append(prompt_id)
+                if not dry_run:
+                    prompts[prompt_id] = {'file': change['file'], 'page_id': page['id'], 'base': local_fp}
+                    files[change['file']] = change['digest']
+            elif local_changed and remote_changed and resolve is None:
+                file = change['file']
+                summary['conflicts'].append((prompt_id, file))
+                if not dry_run:
+                    # Neither side is touched; the file is re-checked next time
+                    prompts[prompt_id] = {**entry, 'file': file, 'page_id': page['id'], 'base': base, 'conflict': True}
+            elif local_changed and (not remote_changed or resolve == 'local'):
+                pushes.append((prompt_id, change, page, local_fp))
+            elif remote_changed:
+                pulls.append((prompt_id, page, remote_fp, change))
+            elif change:
+                # Rewritten without a content change (or already pushed)
+                files[change['file']] = change['digest']
+
+        if dry_run:
+            summary['pulled'] = [prompt_id for prompt_id, *_ in pulls]
+            summary['pushed'] = [prompt_id for prompt_id, _, page, _ in pushes if page or prompts.get(prompt_id, {}).get('page_id')]
+            summary['created'] = [prompt_id for prompt_id, _, page, _ in pushes
+                                  if not page and not prompts.get(prompt_id, {}).get('page_id')]
+            return summary
+
+        for prompt_id, page, remote_fp, change in pulls:
+            mirror = self._pull(prompt_id, page, remote_fp, change, names, title_property, summary)
+            if mirror:
+                pushes.append(mirror)
+        if pushes:
+            self._push(pushes, names, workers, summary)
+
+        self.state['watermark'] = self._newest_edit
+        summary['watermark'] = self._newest_edit
+        self._save_state()
+        return summary
+
+    def _pull(self, prompt_id: str, page: Dict, remote_fp: str, change: Optional[Dict], names: List[str],
+              title_property: str, summary: Dict[str, Any]):
+        """Write a page to its template file; returns a push job when the file must be mirrored back"""
+        prompts, files = self.state['prompts'], self.state['files']
+        entry = prompts.get(prompt_id) or {}
+        name = (change or {}).get('file') or entry.get('file')
+        if not name:
+            name = re.sub(r'[^A-Za-z0-9._-]+', '-', prompt_id).strip('-') + ".txt"
+            if name in self._current_files:
+                summary['skipped'].append((name, f"cannot pull {prompt_id}: the file holds another template"))
+                return None
+        path = os.path.join(self.directory, name)
+
+        try:
+            record = self.manager._record_from_page(page)
+            # The stored Full Prompt keeps the author's layout - usable while it matches the properties
+            text = record['Full Prompt'] if 'Full Prompt' in record else ''
+            parsed = parse_import_text(text, path) if text else None
+            verbatim = (parsed is not None and 'error' not in parsed and parsed['prompt_id'] == prompt_id
+                        and sync_fingerprint(build_payload(parsed, self.manager.expected_schema, title_property,
+                                                           is_new=False)['properties'], names) == remote_fp)
+            if not verbatim:
+                sections = {}
+                for prop in dict.fromkeys(SECTION_PROPERTIES.values()):
+                    value = record[prop] if prop in record else None
+                    if isinstance(value, (list, tuple)):
+                        value = ', '.join(str(item) for item in value)
+                    elif isinstance(value, float) and value.is_integer():
+                        value = int(value)
+                    if value not in (None, ''):
+                        sections[prop] = str(value)
+                sections['Prompt ID'] = prompt_id
+                text = render_prompt_text(sections)
+                parsed = parse_import_text(text, path)
+            _write_file(path, text)
+        except Exception as e:
+            summary['failed'].append((prompt_id, f"pull failed: {e}"))
+            return None
+
+        summary['pulled'].append(prompt_id)
+        # An unreadable local edit that was just replaced is no longer a failure
+        summary['failed'] = [(failed, error) for failed, error in summary['failed'] if failed != name]
+        digest = _file_digest(path)
+        self._current_files[name] = digest
+        prompts[prompt_id] = {'file': name, 'page_id': page['id'], 'base': remote_fp}
+        if verbatim:
+            files[name] = digest
+            return None
+        if 'error' in parsed:
+            # What Notion holds is not a complete template; it is written as is and pushed once fixed
+            summary['warnings'].append(f"{name}: pulled {prompt_id} is incomplete ({parsed['error']})")
+            files[name] = digest
+            return None
+        # The rendered file's Full Prompt differs from the page's: send it back (the file
+        # counts as changed until that succeeds)
+        payload = build_payload(parsed, self.manager.expected_schema, title_property, is_new=False)
+        return (prompt_id, {'parsed': parsed, 'file': name, 'digest': digest}, page,
+                sync_fingerprint(payload['properties'], names))
+
+    def _push(self, pushes: List[tuple], names: List[str], workers: int, summary: Dict[str, Any]):
+        """Create or update pages from changed files (changed properties only, see PromptManager._upsert_parsed)"""
+        prompts, files = self.state['prompts'], self.state['files']
+        pages = {}
+        for prompt_id, change, page, _ in pushes:
+            page_id = prompts.get(prompt_id, {}).get('page_id')
+            if page is None and page_id:
+                # Unchanged in Notion, so not in the query results: the update needs its stored values
+                try:
+                    page = self.manager.storage.get(page_id)
+                except Exception:
+                    page = None
+                if page is not None and page.get('archived'):
+                    page = None
+            if page is not None:
+                pages[prompt_id] = page
+        existing = set(pages)
+
+        result = {'created': [], 'updated': [], 'unchanged': [], 'skipped': [], 'failed': [], 'warnings': []}
+        self.manager._upsert_parsed([change['parsed'] for _, change, _, _ in pushes], result, workers,
+                                    dry_run=False, pages=pages)
+        summary['skipped'].extend(result['skipped'])
+        failed_files = {os.path.abspath(path) for path, _ in result['failed']}
+        summary['failed'].extend((os.path.relpath(path, self.directory), error) for path, error in result['failed'])
+
+        for prompt_id, change, _, local_fp in pushes:
+            if os.path.join(self.directory, change['file']) in failed_files or prompt_id not in pages:
+                continue
+            # Mirrored pulls are already reported as pulled
+            if prompt_id not in summary['pulled']:
+                summary['pushed' if prompt_id in existing else 'created'].append(prompt_id)
+            prompts[prompt_id] = {'file': change['file'], 'page_id': pages[prompt_id]['id'], 'base': local_fp}
+            files[change['file']] = change['digest']
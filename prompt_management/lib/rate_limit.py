@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+KHAOS Rate Limiter - POLITE CONCURRENCY FOR THE NOTION API
+Notion allows an average of ~3 requests per second per integration.
+Concurrent batch operations share one limiter so the pool never outruns it,
+and rate-limited responses are retried with backoff instead of lost.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable
+
+DEFAULT_REQUESTS_PER_SECOND = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every worker of a batch operation"""
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: int = 3, max_retries: int = 5):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+
+    def acquire(self):
+        """Block until a request slot is available"""
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) / self.interval)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Invoke an API method under the limit, retrying rate-limited and transient failures"""
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+                with self._lock:
+                    self.calls += 1
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(_retry_after(e) or delay)
+                delay = min(delay * 2, 30.0)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limiting (429) and server-side hiccups are worth another try"""
+    code = getattr(error, 'code', None)
+    status = getattr(error, 'status', None)
+    return code in ('rate_limited', 'service_unavailable', 'internal_server_error') or status in (429, 502, 503, 504)
+
+
+def _retry_after(error: Exception) -> float:
+    """Honour the Retry-After header when the API supplies one"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', 0))
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+KHAOS Search Index - DIGGING THROUGH THE WHOLE SITE AT ONCE
+Local inverted index over the content fields of every prompt, ranked with
+Okapi BM25. Queries never touch Notion: the index lives in the local store and
+is patched from library scans.
+
+- each document is one prompt page; its fields are kept for snippets
+- documents are keyed by page id and tagged with their DNA Hash, so a refresh
+  only re-tokenises prompts whose content actually changed
+- postings (term -> page id -> term frequency) are derived on load from the
+  per-document term counts
+"""
+
+import heapq
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lib.local_store import cache_path, load_json, save_json
+
+INDEX_VERSION = 1
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_RADIUS = 80
+
+_TERM = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word terms ('Annex III' -> ['annex', 'iii'])"""
+    return _TERM.findall(text.lower())
+
+
+class SearchIndex:
+    """BM25 inverted index over prompt content, keyed by page id"""
+
+    def __init__(self, database_id: Optional[str] = None):
+        self.database_id = database_id
+        self.watermark: Optional[str] = None
+        # page id -> {'prompt_id', 'hash', 'fields': {field: text}, 'terms': {term: tf}, 'length'}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    # ═══════════════════════════════════════════════════════════════
+    # BUILDING AND PATCHING
+    # ═══════════════════════════════════════════════════════════════
+
+    def update(self, page_id: str, prompt_id: str, content_hash: str, fields: Dict[str, str]) -> bool:
+        """Index one prompt; returns False when its content hash is already indexed"""
+        existing = self.docs.get(page_id)
+        if existing and existing['hash'] == content_hash:
+            existing['prompt_id'] = prompt_id
+            return False
+
+        self.remove(page_id)
+        terms: Dict[str, int] = {}
+        for text in fields.values():
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0) + 1
+
+        doc = {'prompt_id': prompt_id, 'hash': content_hash, 'fields': fields,
+               'terms': terms, 'length': sum(terms.values())}
+        self.docs[page_id] = doc
+        self._add_postings(page_id, doc)
+        return True
+
+    def remove(self, page_id: str):
+        """Drop a page from the index (e.g. after it was archived)"""
+        doc = self.docs.pop(page_id, None)
+        if doc is None:
+            return
+        for term in doc['terms']:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(page_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= doc['length']
+
+    def retain(self, page_ids: Iterable[str]) -> int:
+        """Keep only these pages (after a full scan); returns how many were dropped"""
+        keep = set(page_ids)
+        stale = [page_id for page_id in self.docs if page_id not in keep]
+        for page_id in stale:
+            self.remove(page_id)
+        return len(stale)
+
+    def note_edited(self, last_edited_time: Optional[str]):
+        """Advance the watermark used for incremental refreshes"""
+        if last_edited_time and (self.watermark is None or last_edited_time > self.watermark):
+            self.watermark = last_edited_time
+
+    def _add_postings(self, page_id: str, doc: Dict[str, Any]):
+        for term, frequency in doc['terms'].items():
+            self._postings.setdefault(term, {})[page_id] = frequency
+        self._total_length += doc['length']
+
+    # ═══════════════════════════════════════════════════════════════
+    # QUERIES
+    # ═══════════════════════════════════════════════════════════════
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank prompts against a free-text query
+
+        Returns:
+            Hits, best first: {'page_id', 'prompt_id', 'score', 'field', 'snippet', 'matched'}
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.docs:
+            return []
+
+        doc_count = len(self.docs)
+        average_length = self._total_length / doc_count or 1
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for page_id, frequency in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self.docs[page_id]['length'] / average_length
+                scores[page_id] = scores.get(page_id, 0.0) + \
+                    idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                matched.setdefault(page_id, []).append(term)
+
+        hits = []
+        for page_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            field, snippet = self.snippet(page_id, matched[page_id])
+            hits.append({'page_id': page_id, 'prompt_id': self.docs[page_id]['prompt_id'], 'score': score,
+                         'field': field, 'snippet': snippet, 'matched': matched[page_id]})
+        return hits
+
+    def snippet(self, page_id: str, terms: List[str]) -> Tuple[Optional[str], str]:
+        """The field with most query-term hits and a window around its first hit, matches in «»"""
+        pattern = re.compile(r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\b', re.IGNORECASE)
+        best = (0, None, None)
+        for field, text in self.docs[page_id]['fields'].items():
+            found = list(pattern.finditer(text))
+            if len(found) > best[0]:
+                best = (len(found), field, found[0])
+        _, field, first = best
+        if field is None:
+            return None, ''
+
+        text = self.docs[page_id]['fields'][field]
+        start = max(0, first.start() - SNIPPET_RADIUS)
+        end = min(len(text), first.end() + SNIPPET_RADIUS)
+        window = pattern.sub(lambda match: f"«{match.group(0)}»", ' '.join(text[start:end].split()))
+        return field, ('…' if start else '') + window + ('…' if end < len(text) else '')
+
+    # ═══════════════════════════════════════════════════════════════
+    # DISK CACHE
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _cache_file() -> str:
+        return cache_path("search", "index.json")
+
+    @classmethod
+    def load(cls, database_id: str) -> Optional['SearchIndex']:
+        """Cached index for this database, or None"""
+        data = load_json(cls._cache_file())
+        if not data or data.get('version') != INDEX_VERSION or data.get('database_id') != database_id:
+            return None
+        index = cls(database_id)
+        index.watermark = data.get('watermark')
+        index.docs = data.get('docs', {})
+        for page_id, doc in index.docs.items():
+            index._add_postings(page_id, doc)
+        return index
+
+    def save(self):
+        save_json(self._cache_file(), {
+            'version': INDEX_VERSION,
+            'database_id': self.database_id,
+            'watermark': self.watermark,
+            'docs': self.docs,
+        })
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+KHAOS Snapshot - THE WHOLE LIBRARY IN ONE SUITCASE
+A single binary file holding every prompt (all properties) and its DNA metrics,
+for services that cannot reach Notion:
+
+    header   32 bytes: magic, format version, flags, record count, index offset, index length
+    records  per prompt: u32 length + zlib-compressed JSON
+    index    zlib-compressed JSON: snapshot metadata and [prompt id, offset, length] per record
+
+Readers memory-map the file, read the header and the index, and decode only
+the records they ask for - one prompt costs one slice and one decompress,
+however large the library. Records are also length-prefixed, so the file can
+be streamed front to back without the index.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+MAGIC = b'KHAOSNAP'
+FORMAT_VERSION = 1
+
+# magic, format version, flags (reserved), record count, index offset, index length
+_HEADER = struct.Struct('<8sHHIQQ')
+_LENGTH = struct.Struct('<I')
+
+
+class SnapshotError(ValueError):
+    """The file is not a snapshot this reader understands"""
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def _unpack(data) -> Any:
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def write_snapshot(path: str, records: Iterable[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Write records (dicts with a 'prompt_id') to a snapshot file, atomically
+
+    Returns:
+        {'records', 'bytes'}
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".khaos")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'\0' * _HEADER.size)
+            entries = []
+            for record in records:
+                payload = _pack(record)
+                f.write(_LENGTH.pack(len(payload)))
+                entries.append([record['prompt_id'], f.tell(), len(payload)])
+                f.write(payload)
+
+            index = _pack({'meta': meta or {}, 'entries': entries})
+            index_offset = f.tell()
+            f.write(index)
+            size = f.tell()
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(entries), index_offset, len(index)))
+        # mkstemp creates owner-only files; a snapshot is meant to be shipped and shared
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return {'records': len(entries), 'bytes': size}
+
+
+class Snapshot:
+    """Memory-mapped, read-only view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{path}: empty file")
+
+        try:
+            magic, version, _, count, index_offset, index_length = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self.close()
+            raise SnapshotError(f"{path}: truncated header")
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotError(f"{path}: not a KHAOS snapshot")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise SnapshotError(f"{path}: snapshot format {version} (this reader understands {FORMAT_VERSION})")
+
+        size = len(self._map)
+        if index_offset + index_length > size:
+            self.close()
+            raise SnapshotError(f"{path}: truncated ({size} bytes, index ends at {index_offset + index_length})")
+        try:
+            index = _unpack(self._map[index_offset:index_offset + index_length])
+            self.meta: Dict[str, Any] = index['meta']
+            self._entries: List[list] = index['entries']
+            self._offsets = {}
+            for prompt_id, offset, length in self._entries:
+                if offset + length > index_offset:
+                    raise ValueError(f"record {prompt_id} runs past the records section")
+                self._offsets.setdefault(prompt_id, (offset, length))
+        except (zlib.error, ValueError, KeyError, TypeError) as e:
+            # ValueError covers JSON and UTF-8 decoding errors
+            self.close()
+            raise SnapshotError(f"{path}: corrupt index ({e})")
+        if len(self._entries) != count:
+            self.close()
+            raise SnapshotError(f"{path}: index lists {len(self._entries)} records, header {count}")
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self._offsets
+
+    def prompt_ids(self) -> List[str]:
+        return [entry[0] for entry in self._entries]
+
+    def get(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """One record, decoded without touching any other"""
+        location = self._offsets.get(prompt_id)
+        if location is None:
+            return None
+        offset, length = location
+        return _unpack(self._map[offset:offset + length])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for _, offset, length in self._entries:
+            yield _unpack(self._map[offset:offset + length])
+
+
+class SnapshotRecord(dict):
+    """
+    A snapshot record's properties shaped like a scanned PromptRecord
+    (mapping access plus .page), so indexes built from scans accept it
+    """
+
+    def __init__(self, record: Dict[str, Any]):
+        super().__init__(record['properties'])
+        self['id'] = record['page_id']
+        self._page = {'id': record['page_id'], 'last_edited_time': record.get('last_edited')}
+
+    @property
+    def page(self) -> Dict:
+        return self._page
@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+"""
+KHAOS SQLite Storage - THE LIBRARY ON YOUR OWN DISK
+A StorageBackend in a single SQLite file. Pages are stored in Notion's shape
+(properties as JSON, body blocks in their own table), with the columns every
+hot query filters or sorts on - Prompt ID, Type, Last Modified, last edit -
+extracted and indexed, so lookups and listings run at disk speed and never
+touch the network or a rate limiter.
+
+Notion stays the shared copy. pull() copies pages edited there since the last
+pull (ids preserved, so local caches carry over); push() sends what was
+created, changed or archived locally, property by property. Both are explicit.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.chunked_text import is_chunk_block, parse_marker
+from lib.notion_writer import canonical_property_value
+from lib.rate_limit import RateLimiter
+from lib.storage import StorageBackend
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id               TEXT PRIMARY KEY,
+    prompt_id        TEXT NOT NULL DEFAULT '',
+    type             TEXT,
+    last_modified    TEXT,
+    created_time     TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    archived         INTEGER NOT NULL DEFAULT 0,
+    properties       TEXT NOT NULL,
+    -- NULL when in step with Notion, else 'created', 'updated' or 'archived'
+    sync_state       TEXT,
+    -- JSON list of properties changed locally since the last push or pull
+    dirty_properties TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_pages_prompt_id ON pages(prompt_id);
+CREATE INDEX IF NOT EXISTS idx_pages_type ON pages(type);
+CREATE INDEX IF NOT EXISTS idx_pages_last_modified ON pages(last_modified);
+CREATE INDEX IF NOT EXISTS idx_pages_last_edited_time ON pages(last_edited_time);
+CREATE INDEX IF NOT EXISTS idx_pages_sync_state ON pages(sync_state) WHERE sync_state IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS blocks (
+    id       TEXT PRIMARY KEY,
+    page_id  TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    block    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blocks_page ON blocks(page_id, position);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Property payload keys, in the order a value's kind is detected
+PROPERTY_KINDS = ('title', 'rich_text', 'select', 'multi_select', 'number', 'date', 'relation',
+                  'checkbox', 'url', 'email', 'status', 'formula')
+
+# Notion-style comparison operators that translate directly to SQL on an indexed column
+_SQL_OPERATORS = {
+    'equals': '= ?', 'before': '< ?', 'after': '> ?', 'on_or_before': '<= ?', 'on_or_after': '>= ?',
+    'less_than': '< ?', 'greater_than': '> ?', 'less_than_or_equal_to': '<= ?', 'greater_than_or_equal_to': '>= ?',
+}
+
+
+def _now() -> str:
+    """A timestamp in Notion's format (sorts as text)"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _normalise_text(parts: Optional[List[Dict]]) -> List[Dict]:
+    """Rich text as Notion returns it (payloads only carry text.content)"""
+    normalised = []
+    for part in parts or []:
+        content = part.get('plain_text', part.get('text', {}).get('content', ''))
+        normalised.append({'type': 'text', 'text': {'content': content, 'link': None}, 'plain_text': content})
+    return normalised
+
+
+def _normalise_property(value: Dict) -> Dict:
+    value = dict(value)
+    for kind in PROPERTY_KINDS:
+        if kind in value:
+            value['type'] = kind
+            if kind in ('title', 'rich_text'):
+                value[kind] = _normalise_text(value[kind])
+            break
+    return value
+
+
+def _normalise_block(block: Dict) -> Dict:
+    block = dict(block)
+    kind = block.get('type') or next((key for key in block if key not in ('object', 'id')), None)
+    content = dict(block.get(kind) or {})
+    for key in ('rich_text', 'caption'):
+        if key in content:
+            content[key] = _normalise_text(content[key])
+    block.update({'object': 'block', 'id': block.get('id') or str(uuid.uuid4()), 'type': kind, kind: content})
+    return block
+
+
+def payload_property(value: Dict) -> Optional[Dict]:
+    """A stored property as a write payload (None for read-only kinds such as formulas)"""
+    kind = value.get('type') or next((key for key in PROPERTY_KINDS if key in value), None)
+    if kind in ('title', 'rich_text'):
+        return {kind: [{'type': 'text', 'text': {'content': part['plain_text']}} for part in value[kind]]}
+    if kind == 'select' or kind == 'status':
+        return {kind: {'name': value[kind]['name']} if value[kind] else None}
+    if kind == 'multi_select':
+        return {kind: [{'name': option['name']} for option in value[kind]]}
+    if kind == 'date':
+        return {kind: {'start': value[kind]['start']} if value[kind] else None}
+    if kind == 'relation':
+        return {kind: [{'id': rel['id']} for rel in value[kind]]}
+    if kind in ('number', 'checkbox', 'url', 'email'):
+        return {kind: value[kind]}
+    return None
+
+
+def _condition(filter: Dict) -> Tuple[str, Any]:
+    """('equals', 'x') from {'property': ..., 'select': {'equals': 'x'}}"""
+    for key, condition in filter.items():
+        if key not in ('property', 'timestamp', 'type') and isinstance(condition, dict) and condition:
+            return next(iter(condition.items()))
+    raise ValueError(f"Unsupported filter: {filter}")
+
+
+def _test(value: Any, operator: str, operand: Any) -> bool:
+    """Evaluate one Notion filter condition against a canonical property value"""
+    if operator == 'is_empty':
+        return value in (None, '', ())
+    if operator == 'is_not_empty':
+        return value not in (None, '', ())
+    if isinstance(value, tuple):
+        if operator == 'contains':
+            return operand in value
+        if operator == 'does_not_contain':
+            return operand not in value
+        raise ValueError(f"Unsupported filter condition '{operator}' for a list property")
+    if operator == 'equals':
+        return value == operand
+    if operator == 'does_not_equal':
+        return value != operand
+    if value is None:
+        return False
+    if operator == 'contains':
+        return str(operand).lower() in str(value).lower()
+    if operator == 'does_not_contain':
+        return str(operand).lower() not in str(value).lower()
+    if operator == 'starts_with':
+        return str(value).lower().startswith(str(operand).lower())
+    if operator == 'ends_with':
+        return str(value).lower().endswith(str(operand).lower())
+    if operator in ('before', 'less_than'):
+        return value < operand
+    if operator in ('after', 'greater_than'):
+        return value > operand
+    if operator in ('on_or_before', 'less_than_or_equal_to'):
+        return value <= operand
+    if operator in ('on_or_after', 'greater_than_or_equal_to'):
+        return value >= operand
+    raise ValueError(f"Unsupported filter condition '{operator}'")
+
+
+class SQLiteBackend(StorageBackend):
+    """Prompt pages in a local SQLite file"""
+
+    kind = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.database_id = f"sqlite:{path}"
+        self.limiter = RateLimiter(requests_per_second=0)
+        self._lock = threading.RLock()
+        # Writers run in thread pools (write buffer flushes, parallel imports); the lock serialises them
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._database: Optional[Dict] = None
+        if self.get_meta('schema_version') is None:
+            self.set_meta('schema_version', SCHEMA_VERSION)
+
+    def close(self):
+        self._db.close()
+
+    def _fetchall(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # ═══════════════════════════════════════════════════════════════
+    # META
+    # ═══════════════════════════════════════════════════════════════
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        rows = self._fetchall("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0]['value']) if rows else default
+
+    def set_meta(self, key: str, value: Any):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, _dumps(value)))
+
+    # ═══════════════════════════════════════════════════════════════
+    # DATABASE
+    # ═══════════════════════════════════════════════════════════════
+
+    def retrieve_database(self) -> Dict[str, Any]:
+        if self._database is None:
+            self._database = self.get_meta('database') or {
+                'object': 'database',
+                'id': self.database_id,
+                'title': _normalise_text([{'text': {'content': 'KHAOS Prompt Library (local)'}}]),
+                'properties': {'Prompt ID': {'id': 'title', 'name': 'Prompt ID', 'type': 'title', 'title': {}}},
+            }
+        return self._database
+
+    def update_database(self, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        database = json.loads(_dumps(self.retrieve_database()))
+        current = database['properties']
+        for name, definition in properties.items():
+            if definition is None:
+                current.pop(name, None)
+                continue
+            kind = definition.get('type') or next((key for key in PROPERTY_KINDS if key in definition), None)
+            existing = current.get(name, {})
+            current[name] = {**existing, **definition, 'id': existing.get('id') or name, 'name': name, 'type': kind}
+        self.set_database(database)
+        return database
+
+    def set_database(self, database: Dict[str, Any]):
+        """Replace the stored database object (pull copies Notion's); re-extracts indexed columns if the title moved"""
+        previous_title = self._title_property()
+        with self._lock:
+            self._database = database
+            self.set_meta('database', database)
+            if self._title_property() != previous_title:
+                for row in self._db.execute("SELECT id, properties FROM pages").fetchall():
+                    columns = self._columns(json.loads(row['properties']))
+                    self._db.execute("UPDATE pages SET prompt_id = ?, type = ?, last_modified = ? WHERE id = ?",
+                                     (*columns, row['id']))
+
+    def _title_property(self) -> str:
+        for name, prop in self.retrieve_database()['properties'].items():
+            if prop.get('type') == 'title':
+                return name
+        return 'Prompt ID'
+
+    def _columns(self, properties: Dict[str, Dict]) -> Tuple[str, Optional[str], Optional[str]]:
+        """Values of the indexed columns: (prompt_id, type, last_modified)"""
+        return (canonical_property_value(properties.get(self._title_property())) or '',
+                canonical_property_value(properties.get('Type')),
+                canonical_property_value(properties.get('Last Modified')))
+
+    # ═══════════════════════════════════════════════════════════════
+    # PAGES
+    # ═══════════════════════════════════════════════════════════════
+
+    def _page(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'object': 'page',
+            'id': row['id'],
+            'created_time': row['created_time'],
+            'last_edited_time': row['last_edited_time'],
+            'archived': bool(row['archived']),
+            'parent': {'type': 'database_id', 'database_id': self.database_id},
+            'properties': json.loads(row['properties']),
+        }
+
+    def _row(self, page_id: str) -> sqlite3.Row:
+        rows = self._fetchall("SELECT * FROM pages WHERE id = ?", (page_id,))
+        if not rows:
+            raise KeyError(f"Could not find page with ID: {page_id}")
+        return rows[0]
+
+    def get(self, page_id: str) -> Dict[str, Any]:
+        return self._page(self._row(page_id))
+
+    def create(self, properties: Dict[str, Dict], children: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        page_id = str(uuid.uuid4())
+        stored = {name: _normalise_property(value) for name, value in properties.items()}
+        now = _now()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (id, prompt_id, type, last_modified, created_time, last_edited_time, "
+                "properties, sync_state) VALUES (?, ?, ?, ?, ?, ?, ?, 'created')",
+                (page_id, *self._columns(stored), now, now, _dumps(stored)))
+            if children:
+                self.append_blocks(page_id, children)
+        return self.get(page_id)
+
+    def update(self, page_id: str, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        with self._lock:
+            row = self._row(page_id)
+            stored = json.loads(row['properties'])
+            stored.update({name: _normalise_property(value) for name, value in properties.items()})
+            dirty = sorted(set(json.loads(row['dirty_properties'])) | set(properties))
+            self._db.execute(
+                "UPDATE pages SET prompt_id = ?, type = ?, last_modified = ?, last_edited_time = ?, properties = ?, "
+                "sync_state = COALESCE(sync_state, 'updated'), dirty_properties = ? WHERE id = ?",
+                (*self._columns(stored), _now(), _dumps(stored), _dumps(dirty), page_id))
+        return self.get(page_id)
+
+    def archive(self, page_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._row(page_id)
+            if row['sync_state'] == 'created':
+                # Never pushed - nothing to archive in Notion either
+                page = self._page(row)
+                self.forget(page_id)
+                return {**page, 'archived': True}
+            self._db.execute("UPDATE pages SET archived = 1, sync_state = 'archived', last_edited_time = ? "
+                             "WHERE id = ?", (_now(), page_id))
+        return self.get(page_id)
+
+    # ═══════════════════════════════════════════════════════════════
+    # QUERIES
+    # ═══════════════════════════════════════════════════════════════
+
+    def _column(self, filter: Dict) -> Optional[str]:
+        """The indexed column a filter or sort targets, if any"""
+        if 'timestamp' in filter:
+            return filter['timestamp'] if filter['timestamp'] in ('created_time', 'last_edited_time') else None
+        prop = filter.get('property')
+        if prop == self._title_property():
+            return 'prompt_id'
+        return {'Type': 'type', 'Last Modified': 'last_modified'}.get(prop)
+
+    def _compile(self, filter: Dict) -> Tuple[Optional[str], List[Any], bool]:
+        """
+        SQL for as much of a filter as the indexed columns can answer
+
+        Returns:
+            (where clause or None, parameters, exact) - inexact results are re-checked in Python
+        """
+        for compound in ('and', 'or'):
+            if compound in filter:
+                parts = [self._compile(part) for part in filter[compound]]
+                exact = all(part[2] for part in parts)
+                clauses = [part for part in parts if part[0]]
+                if compound == 'or' and len(clauses) < len(parts):
+                    return None, [], False
+                if not clauses:
+                    return None, [], exact
+                sql = f" {compound.upper()} ".join(f"({clause})" for clause, _, _ in clauses)
+                return sql, [param for _, params, _ in clauses for param in params], exact
+
+        column = self._column(filter)
+        if column is None:
+            return None, [], False
+        operator, operand = _condition(filter)
+        if operator in _SQL_OPERATORS:
+            return f"{column} {_SQL_OPERATORS[operator]}", [operand], True
+        if operator == 'does_not_equal':
+            return f"({column} IS NULL OR {column} != ?)", [operand], True
+        if operator in ('contains', 'starts_with', 'ends_with'):
+            escaped = str(operand).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            pattern = {'contains': f"%{escaped}%", 'starts_with': f"{escaped}%", 'ends_with': f"%{escaped}"}[operator]
+            return f"{column} LIKE ? ESCAPE '\\'", [pattern], True
+        if operator == 'is_empty':
+            return f"({column} IS NULL OR {column} = '')", [], True
+        if operator == 'is_not_empty':
+            return f"({column} IS NOT NULL AND {column} != '')", [], True
+        return None, [], False
+
+    def _matches(self, page: Dict, filter: Dict) -> bool:
+        """Evaluate a whole Notion-style filter against a page"""
+        if 'and' in filter:
+            return all(self._matches(page, part) for part in filter['and'])
+        if 'or' in filter:
+            return any(self._matches(page, part) for part in filter['or'])
+        if 'timestamp' in filter:
+            value = page.get(filter['timestamp'])
+        else:
+            value = canonical_property_value(page['properties'].get(filter.get('property')))
+        return _test(value, *_condition(filter))
+
+    def _sort_value(self, page: Dict, sort: Dict) -> Any:
+        if 'timestamp' in sort:
+            return page.get(sort['timestamp'])
+        return canonical_property_value(page['properties'].get(sort.get('property')))
+
+    def query(self, filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None,
+              page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        where, params, exact = self._compile(filter) if filter else (None, [], True)
+        sql = "SELECT * FROM pages WHERE archived = 0" + (f" AND ({where})" if where else "")
+        order = []
+        for sort in sorts or []:
+            column = self._column(sort)
+            if column is None:
+                order = None
+                break
+            direction = 'DESC' if sort.get('direction') == 'descending' else 'ASC'
+            # Empty values sort last either way, as in Notion
+            order.append(f"{column} IS NULL, {column} {direction}")
+        offset = int(start_cursor or 0)
+
+        if exact and order is not None:
+            sql += f" ORDER BY {', '.join(order + ['created_time', 'id'])} LIMIT ? OFFSET ?"
+            rows = self._fetchall(sql, [*params, page_size + 1, offset])
+            pages = [self._page(row) for row in rows[:page_size]]
+            has_more = len(rows) > page_size
+        else:
+            pages = [self._page(row) for row in self._fetchall(sql + " ORDER BY created_time, id", params)]
+            if not exact:
+                pages = [page for page in pages if self._matches(page, filter)]
+            if order is None:
+                for sort in reversed(sorts):
+                    present = [page for page in pages if self._sort_value(page, sort) is not None]
+                    present.sort(key=lambda page: self._sort_value(page, sort),
+                                 reverse=sort.get('direction') == 'descending')
+                    pages = present + [page for page in pages if self._sort_value(page, sort) is None]
+            has_more = len(pages) > offset + page_size
+            pages = pages[offset:offset + page_size]
+
+        return {'object': 'list', 'results': pages, 'has_more': has_more,
+                'next_cursor': str(offset + page_size) if has_more else None}
+
+    def explain(self, filter: Optional[Dict] = None) -> List[str]:
+        """SQLite's query plan for a filter (to check that it hits an index)"""
+        where, params, _ = self._compile(filter) if filter else (None, [], True)
+        sql = "SELECT * FROM pages WHERE archived = 0" + (f" AND ({where})" if where else "")
+        return [row['detail'] for row in self._fetchall("EXPLAIN QUERY PLAN " + sql, params)]
+
+    # ═══════════════════════════════════════════════════════════════
+    # PAGE BODY BLOCKS
+    # ═══════════════════════════════════════════════════════════════
+
+    def list_blocks(self, page_id: str, page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        offset = int(start_cursor or 0)
+        rows = self._fetchall("SELECT block FROM blocks WHERE page_id = ? ORDER BY position LIMIT ? OFFSET ?",
+                              (page_id, page_size + 1, offset))
+        has_more = len(rows) > page_size
+        return {'object': 'list', 'results': [json.loads(row['block']) for row in rows[:page_size]],
+                'has_more': has_more, 'next_cursor': str(offset + page_size) if has_more else None}
+
+    def append_blocks(self, page_id: str, children: List[Dict]) -> Dict[str, Any]:
+        blocks = [_normalise_block(block) for block in children]
+        with self._lock:
+            position = self._db.execute("SELECT COALESCE(MAX(position), -1) FROM blocks WHERE page_id = ?",
+                                        (page_id,)).fetchone()[0]
+            self._db.executemany("INSERT INTO blocks (id, page_id, position, block) VALUES (?, ?, ?, ?)",
+                                 [(block['id'], page_id, position + i + 1, _dumps(block))
+                                  for i, block in enumerate(blocks)])
+        return {'object': 'list', 'results': blocks}
+
+    def delete_block(self, block_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM blocks WHERE id = ?", (block_id,))
+
+    def page_blocks(self, page_id: str) -> List[Dict]:
+        return [json.loads(row['block']) for row in
+                self._fetchall("SELECT block FROM blocks WHERE page_id = ? ORDER BY position", (page_id,))]
+
+    # ═══════════════════════════════════════════════════════════════
+    # REPLICATION BOOKKEEPING
+    # ═══════════════════════════════════════════════════════════════
+
+    def put_page(self, page: Dict[str, Any], blocks: Optional[List[Dict]] = None, replaces: Optional[str] = None):
+        """Store a page exactly as Notion returned it, in step with Notion (replaces: a local id it supersedes)"""
+        properties = page['properties']
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if replaces and replaces != page['id']:
+                    self._db.execute("DELETE FROM pages WHERE id = ?", (replaces,))
+                    self._db.execute("DELETE FROM blocks WHERE page_id = ?", (replaces,))
+                    # Relations to the local id (e.g. Parent Prompt) now point at the new one
+                    self._db.execute("UPDATE pages SET properties = REPLACE(properties, ?, ?) WHERE properties LIKE ?",
+                                     (replaces, page['id'], f"%{replaces}%"))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pages (id, prompt_id, type, last_modified, created_time, last_edited_time, "
+                    "archived, properties, sync_state, dirty_properties) VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, '[]')",
+                    (page['id'], *self._columns(properties), page.get('created_time') or _now(),
+                     page.get('last_edited_time') or _now(), int(bool(page.get('archived'))), _dumps(properties)))
+                if blocks is not None:
+                    self._db.execute("DELETE FROM blocks WHERE page_id = ?", (page['id'],))
+                    self._db.executemany("INSERT INTO blocks (id, page_id, position, block) VALUES (?, ?, ?, ?)",
+                                         [(block['id'], page['id'], i, _dumps(block)) for i, block in enumerate(blocks)])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def forget(self, page_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+            self._db.execute("DELETE FROM blocks WHERE page_id = ?", (page_id,))
+
+    def sync_state(self, page_id: str) -> Optional[str]:
+        rows = self._fetchall("SELECT sync_state FROM pages WHERE id = ?", (page_id,))
+        return rows[0]['sync_state'] if rows else None
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Pages changed locally since the last push: {'page', 'state', 'dirty_properties'}"""
+        rows = self._fetchall("SELECT * FROM pages WHERE sync_state IS NOT NULL ORDER BY created_time, id")
+        return [{'page': self._page(row), 'state': row['sync_state'],
+                 'dirty_properties': json.loads(row['dirty_properties'])} for row in rows]
+
+    def page_ids(self) -> List[str]:
+        return [row['id'] for row in self._fetchall("SELECT id FROM pages")]
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {row[0]: row[1] for row in
+                  self._fetchall("SELECT COALESCE(sync_state, 'clean'), COUNT(*) FROM pages GROUP BY sync_state")}
+        return {'path': self.path, 'pages': sum(counts.values()), 'by_state': counts,
+                'blocks': self._fetchall("SELECT COUNT(*) FROM blocks")[0][0],
+                'pulled_at': self.get_meta('pulled_at'), 'pull_watermark': self.get_meta('pull_watermark'),
+                'pushed_at': self.get_meta('pushed_at')}
+
+
+# ═══════════════════════════════════════════════════════════════
+# PULL AND PUSH
+# ═══════════════════════════════════════════════════════════════
+
+def _all_pages(backend: StorageBackend, filter: Optional[Dict] = None) -> List[Dict]:
+    pages = []
+    cursor = None
+    while True:
+        response = backend.limiter.call(backend.query, filter=filter, page_size=100, start_cursor=cursor)
+        pages.extend(response['results'])
+        if not response.get('has_more'):
+            return pages
+        cursor = response['next_cursor']
+
+
+def _all_blocks(backend: StorageBackend, page_id: str) -> List[Dict]:
+    blocks = []
+    cursor = None
+    while True:
+        response = backend.limiter.call(backend.list_blocks, page_id, start_cursor=cursor)
+        blocks.extend(response['results'])
+        if not response.get('has_more'):
+            return blocks
+        cursor = response['next_cursor']
+
+
+def _chunked_fields(properties: Dict[str, Dict]) -> Dict[str, str]:
+    """Field -> digest for every property whose text lives in page body blocks"""
+    chunked = {}
+    for name, value in properties.items():
+        marker = parse_marker(canonical_property_value(value) if 'rich_text' in value else None)
+        if marker:
+            chunked[name] = marker[1]
+    return chunked
+
+
+def pull(remote: StorageBackend, local: SQLiteBackend, full: bool = False) -> Dict[str, Any]:
+    """
+    Copy pages edited in the remote store since the last pull into the local one
+
+    Pages with unpushed local changes are left alone (push them first). A full
+    pull re-reads everything and drops local copies of pages no longer in the
+    remote store.
+
+    Returns:
+        {'pulled', 'kept_local', 'removed', 'blocks'}
+    """
+    summary = {'pulled': [], 'kept_local': [], 'removed': [], 'blocks': 0}
+    local.set_database(remote.limiter.call(remote.retrieve_database))
+    watermark = None if full else local.get_meta('pull_watermark')
+    filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}} if watermark else None
+    pages = _all_pages(remote, filter)
+    title = local._title_property()
+
+    for page in pages:
+        prompt_id = canonical_property_value(page['properties'].get(title)) or page['id']
+        if local.sync_state(page['id']):
+            summary['kept_local'].append(prompt_id)
+            continue
+        blocks = None
+        if _chunked_fields(page['properties']):
+            blocks = [block for block in _all_blocks(remote, page['id']) if block.get('type') == 'code']
+            summary['blocks'] += len(blocks)
+        local.put_page(page, blocks if blocks is not None else [])
+        summary['pulled'].append(prompt_id)
+
+    if full:
+        remote_ids = {page['id'] for page in pages}
+        for page_id in local.page_ids():
+            if page_id not in remote_ids and not local.sync_state(page_id):
+                local.forget(page_id)
+                summary['removed'].append(page_id)
+
+    if pages:
+        local.set_meta('pull_watermark', max(page['last_edited_time'] for page in pages))
+    local.set_meta('pulled_at', datetime.now().isoformat(timespec='seconds'))
+    return summary
+
+
+def push(local: SQLiteBackend, remote: StorageBackend) -> Dict[str, Any]:
+    """
+    Send pages created, changed or archived locally to the remote store
+
+    Only properties changed since the last push or pull are sent; large text
+    fields carry their body blocks (new blocks first, superseded ones removed
+    afterwards). Created pages take the id the remote store assigns.
+
+    Returns:
+        {'created', 'updated', 'archived', 'failed'}
+    """
+    summary = {'created': [], 'updated': [], 'archived': [], 'failed': []}
+    title = local._title_property()
+
+    for entry in local.pending():
+        # Re-read: pushing an earlier page may have remapped relations pointing at it
+        page, state = local.get(entry['page']['id']), entry['state']
+        prompt_id = canonical_property_value(page['properties'].get(title)) or page['id']
+        blocks = local.page_blocks(page['id'])
+        try:
+            if state == 'archived':
+                remote.limiter.call(remote.archive, page['id'])
+                local.forget(page['id'])
+                summary['archived'].append(prompt_id)
+                continue
+
+            if state == 'created':
+                properties = {name: payload_property(value) for name, value in page['properties'].items()}
+                properties = {name: value for name, value in properties.items() if value is not None}
+                created = remote.limiter.call(remote.create, properties, children=blocks[:1] or None)
+                for block in blocks[1:]:
+                    remote.limiter.call(remote.append_blocks, created['id'], [block])
+                local.put_page(created, blocks, replaces=page['id'])
+                summary['created'].append(prompt_id)
+                continue
+
+            dirty = [name for name in entry['dirty_properties'] if name in page['properties']]
+            properties = {name: payload_property(page['properties'][name]) for name in dirty}
+            properties = {name: value for name, value in properties.items() if value is not None}
+            chunked = _chunked_fields(properties)
+            if chunked:
+                remote_blocks = _all_blocks(remote, page['id'])
+                for field, digest in chunked.items():
+                    for block in blocks:
+                        if is_chunk_block(block, field, digest):
+                            remote.limiter.call(remote.append_blocks, page['id'], [block])
+            updated = remote.limiter.call(remote.update, page['id'], properties) if properties else page
+            if chunked:
+                for block in remote_blocks:
+                    for field, digest in chunked.items():
+                        if is_chunk_block(block, field) and not is_chunk_block(block, field, digest):
+                            remote.limiter.call(remote.delete_block, block['id'])
+            local.put_page({**page, 'last_edited_time': updated.get('last_edited_time', page['last_edited_time'])},
+                           blocks)
+            summary['updated'].append(prompt_id)
+        except Exception as e:
+            print(f"❌ Error pushing {prompt_id}: {e}")
+            summary['failed'].append(prompt_id)
+
+    local.set_meta('pushed_at', datetime.now().isoformat(timespec='seconds'))
+    return summary
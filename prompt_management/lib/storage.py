@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+KHAOS Storage - WHERE THE PROMPTS ACTUALLY LIVE
+The page store behind PromptManager. Every backend speaks Notion's page shape
+(properties as Notion returns them, body blocks for chunked text), so property
+extraction, hashing, chunking and the write buffer work the same on all of them.
+
+- NotionBackend   the Notion database (network-bound, rate limited)
+- SQLiteBackend   a local file with indexed columns (see lib.sqlite_storage),
+                  synchronised with Notion by explicit pull and push
+
+Select one with PROMPT_STORAGE=notion|sqlite (or prompt_cli --storage); the
+SQLite file defaults to the local store (PROMPT_SQLITE_PATH to move it).
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from lib.rate_limit import RateLimiter
+
+STORAGE_KINDS = ('notion', 'sqlite')
+
+
+class StorageBackend:
+    """Operations PromptManager needs from a page store"""
+
+    kind = 'abstract'
+
+    # Identifies the store in local caches and indexes
+    database_id: Optional[str] = None
+
+    # Shared by every caller of this backend (a no-op limiter for local stores)
+    limiter: RateLimiter
+
+    # ═══════════════════════════════════════════════════════════════
+    # DATABASE
+    # ═══════════════════════════════════════════════════════════════
+
+    def retrieve_database(self) -> Dict[str, Any]:
+        """The database object: {'title', 'properties': {name: {'type', ...}}}"""
+        raise NotImplementedError
+
+    def update_database(self, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        """Add property definitions; returns the updated database object"""
+        raise NotImplementedError
+
+    # ═══════════════════════════════════════════════════════════════
+    # PAGES
+    # ═══════════════════════════════════════════════════════════════
+
+    def query(self, filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None,
+              page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of results for a Notion-style filter: {'results', 'has_more', 'next_cursor'}"""
+        raise NotImplementedError
+
+    def get(self, page_id: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def create(self, properties: Dict[str, Dict], children: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Create a page (optionally with body blocks); returns the page"""
+        raise NotImplementedError
+
+    def update(self, page_id: str, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        """Replace the given properties of a page; returns the page"""
+        raise NotImplementedError
+
+    def archive(self, page_id: str) -> Dict[str, Any]:
+        """Archive (soft-delete) a page"""
+        raise NotImplementedError
+
+    # ═══════════════════════════════════════════════════════════════
+    # PAGE BODY BLOCKS
+    # ═══════════════════════════════════════════════════════════════
+
+    def list_blocks(self, page_id: str, page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of top-level body blocks: {'results', 'has_more', 'next_cursor'}"""
+        raise NotImplementedError
+
+    def append_blocks(self, page_id: str, children: List[Dict]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def delete_block(self, block_id: str):
+        raise NotImplementedError
+
+
+class NotionBackend(StorageBackend):
+    """Pages in a Notion database, through notion_client"""
+
+    kind = 'notion'
+
+    def __init__(self, database_id: Optional[str] = None, token: Optional[str] = None, client=None,
+                 limiter: Optional[RateLimiter] = None):
+        if client is None:
+            from notion_client import Client
+            client = Client(auth=token or os.getenv("PROMPT_SECURITY_TOKEN"))
+        self.client = client
+        self.database_id = database_id or os.getenv("PROMPT_DATABASE_ID")
+        self.limiter = limiter or RateLimiter()
+
+    def retrieve_database(self) -> Dict[str, Any]:
+        return self.client.databases.retrieve(database_id=self.database_id)
+
+    def update_database(self, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        return self.client.databases.update(database_id=self.database_id, properties=properties)
+
+    def query(self, filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None,
+              page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        params = {"database_id": self.database_id, "page_size": page_size}
+        if filter:
+            params["filter"] = filter
+        if sorts:
+            params["sorts"] = sorts
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        return self.client.databases.query(**params)
+
+    def get(self, page_id: str) -> Dict[str, Any]:
+        return self.client.pages.retrieve(page_id=page_id)
+
+    def create(self, properties: Dict[str, Dict], children: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        return self.client.pages.create(parent={"database_id": self.database_id}, properties=properties,
+                                        **({"children": children} if children else {}))
+
+    def update(self, page_id: str, properties: Dict[str, Dict]) -> Dict[str, Any]:
+        return self.client.pages.update(page_id=page_id, properties=properties)
+
+    def archive(self, page_id: str) -> Dict[str, Any]:
+        return self.client.pages.update(page_id=page_id, archived=True)
+
+    def list_blocks(self, page_id: str, page_size: int = 100, start_cursor: Optional[str] = None) -> Dict[str, Any]:
+        params = {"block_id": page_id, "page_size": page_size}
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        return self.client.blocks.children.list(**params)
+
+    def append_blocks(self, page_id: str, children: List[Dict]) -> Dict[str, Any]:
+        return self.client.blocks.children.append(block_id=page_id, children=children)
+
+    def delete_block(self, block_id: str):
+        return self.client.blocks.delete(block_id=block_id)
+
+
+def default_sqlite_path() -> str:
+    from lib.local_store import cache_path
+    return os.getenv("PROMPT_SQLITE_PATH") or cache_path("prompts.sqlite3")
+
+
+def open_storage(kind: Optional[str] = None) -> StorageBackend:
+    """The backend selected by kind, or by PROMPT_STORAGE (default: notion)"""
+    kind = (kind or os.getenv("PROMPT_STORAGE") or 'notion').lower()
+    if kind == 'notion':
+        return NotionBackend()
+    if kind == 'sqlite':
+        from lib.sqlite_storage import SQLiteBackend
+        return SQLiteBackend(default_sqlite_path())
+    raise ValueError(f"Unknown storage backend '{kind}' (choose from: {', '.join(STORAGE_KINDS)})")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+KHAOS Template Watch - THE ARCHAEOLOGIST READS OVER YOUR SHOULDER
+Keeps the prompt library in step with a template directory while you edit it:
+
+- file events come from inotify (through ctypes, Linux) or, anywhere else, from
+  polling modification times and sizes
+- bursts of events (editor swap files, save-all, git checkout) are debounced into
+  one batch
+- a file whose bytes hash the same as at its last sync is not even parsed
+- changed files go through the import-dir upsert: only changed properties are
+  written, coalesced per page under the shared rate limit
+
+The Prompt ID -> page map is loaded with one library scan at startup and kept
+current with one last_edited_time-filtered query per batch. Deleting a file
+never deletes its prompt.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import select
+import struct
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from lib.bulk_import import parse_import_file
+from lib.local_analysis import TEMPLATE_EXTENSIONS, expand_paths
+
+# Returned by a watcher when events were lost: every file must be re-checked
+RESCAN = frozenset({'*'})
+
+
+def _is_template(path: str) -> bool:
+    name = os.path.basename(path)
+    # Editor scratch files (.#x.txt, x.txt~) are not templates
+    return (name.lower().endswith(TEMPLATE_EXTENSIONS) and not name.startswith(('.', '#'))
+            and not fnmatch.fnmatch(name, '*~'))
+
+
+class PollingWatcher:
+    """Changed template files, found by comparing (mtime, size) snapshots"""
+
+    kind = 'polling'
+
+    def __init__(self, root: str, interval: float = 1.0):
+        self.root = root
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        state = {}
+        for path in expand_paths([self.root]):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Files created or modified since the last call; empty when nothing changed within timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {path for path, signature in state.items()
+                       if self._state.get(path) != signature and _is_template(path)}
+            self._state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            pause = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(pause)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Changed template files from Linux inotify (every directory below root is watched)"""
+
+    kind = 'inotify'
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+    # Written and closed, or moved into place (editors that save via rename); new directories
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, root: str):
+        library = ctypes.util.find_library('c')
+        libc = ctypes.CDLL(library or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.root = root
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self._dirs: Dict[int, str] = {}
+        for directory, _, _ in os.walk(root):
+            self._watch(directory)
+
+    def _watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"{os.strerror(error)}: {directory}")
+        self._dirs[wd] = directory
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Files written or moved in since the last call (RESCAN after an event queue overflow)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return set(RESCAN)
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Files may land in a new directory before it is watched: check them all
+                    for subdirectory, _, _ in os.walk(path):
+                        self._watch(subdirectory)
+                    changed.update(expand_paths([path]))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO) and _is_template(path):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(root: str, polling: bool = False, interval: float = 1.0):
+    """inotify where available, polling otherwise (or when asked)"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class TemplateWatch:
+    """Pushes edits of a template directory to the library in debounced batches"""
+
+    def __init__(self, manager, root: str, debounce: float = 0.5, max_delay: float = 5.0,
+                 polling: bool = False, interval: float = 1.0, workers: int = 4):
+        self.manager = manager
+        self.root = root
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.workers = workers
+        self.watcher = open_watcher(root, polling=polling, interval=interval)
+
+        # Bytes hash of every file as last synced, Prompt ID -> page, newest edit seen
+        self.digests: Dict[str, str] = {}
+        self.pages: Dict[str, Dict] = {}
+        self.watermark: Optional[str] = None
+
+    def _note_pages(self, pages: Iterable[Dict]):
+        for page in pages:
+            prompt_id = self.manager._extract_title_property(page, 'Prompt ID')
+            if prompt_id:
+                self.pages[prompt_id] = page
+            edited = page.get('last_edited_time')
+            if edited and (self.watermark is None or edited > self.watermark):
+                self.watermark = edited
+
+    def _refresh_pages(self):
+        """Patch the page map with pages edited since the last batch (ours included): one query"""
+        if self.watermark is None:
+            self._note_pages(self.manager._query_all_pages())
+            return
+        self._note_pages(self.manager._query_all_pages(
+            filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": self.watermark}}
+        ))
+
+    def sync(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        Upsert the given files (all templates under root for RESCAN) if their bytes changed
+
+        Returns:
+            import summary plus 'files' checked and 'unchanged_files' skipped by hash
+        """
+        paths = expand_paths([self.root]) if set(paths) == RESCAN else sorted(set(paths))
+        summary = {'files': len(paths), 'created': [], 'updated': [], 'unchanged': [], 'skipped': [],
+                   'failed': [], 'warnings': [], 'unchanged_files': 0}
+
+        changed = {}
+        for path in paths:
+            digest = file_digest(path)
+            if digest is None:
+                # Deleted or moved away: the prompt stays in the library
+                self.digests.pop(path, None)
+                continue
+            if self.digests.get(path) == digest:
+                summary['unchanged_files'] += 1
+                continue
+            changed[path] = digest
+        if not changed:
+            return summary
+
+        parsed_files = [parse_import_file(path) for path in changed]
+        if any(parsed.get('prompt_id') for parsed in parsed_files):
+            self._refresh_pages()
+        self.manager._upsert_parsed(parsed_files, summary, self.workers, dry_run=False, pages=self.pages)
+        if self.watermark is None:
+            # The library was empty: pages created just now date the next refresh
+            self._note_pages(list(self.pages.values()))
+
+        failed = {path for path, _ in summary['failed']}
+        for path, digest in changed.items():
+            # Failed files are retried on their next save
+            if path not in failed:
+                self.digests[path] = digest
+        return summary
+
+    def batches(self) -> Iterable[Set[str]]:
+        """Debounced sets of changed files: a batch closes after `debounce` seconds without events"""
+        while True:
+            changed = set(self.watcher.changes(None))
+            if not changed:
+                continue
+            deadline = time.monotonic() + self.max_delay
+            while time.monotonic() < deadline:
+                more = self.watcher.changes(min(self.debounce, max(0.0, deadline - time.monotonic())))
+                if not more:
+                    break
+                changed |= more
+            yield RESCAN if RESCAN <= changed else changed
+
+    def run(self, report: Callable[[Dict[str, Any], float], None]):
+        """Initial sync of the whole tree, then one sync per batch of edits until interrupted"""
+        try:
+            start = time.perf_counter()
+            report(self.sync(RESCAN), time.perf_counter() - start)
+            for batch in self.batches():
+                start = time.perf_counter()
+                report(self.sync(batch), time.perf_counter() - start)
+        finally:
+            self.watcher.close()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+KHAOS Token Counter - COUNT WHAT THE MODEL ACTUALLY SEES
+Offline byte-level BPE tokenizer over a vocabulary bundled with the repo
+(lib/vocab/), replacing the old words × 1.3 guess in DNA profiles.
+
+- no network, no third-party packages: merges are loaded once per process
+- pre-tokenised pieces are memoised (LRU), so vocabulary repeated across the
+  library is encoded once
+- count_batch() encodes each distinct piece of many texts exactly once
+
+Counts follow the bundled Claude tokenizer. Current Claude models tokenise
+differently, so treat them as a close estimate, not as billing truth.
+"""
+
+import gzip
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_VOCAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vocab", "claude_bpe_merges.txt.gz")
+VOCAB_HEADER = "#khaos-bpe-merges v1"
+
+# GPT-2 style pre-tokenizer. \p{L} / \p{N} are not available in the re module:
+# letters are "word characters that are neither digits nor underscore".
+_PRETOKENIZE = re.compile(
+    r"""'s|'t|'re|'ve|'m|'ll|'d| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+"""
+)
+
+
+def _bytes_to_unicode() -> Dict[int, str]:
+    """The byte-level BPE alphabet: every byte maps to one printable character"""
+    printable = list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1)) + \
+        list(range(ord("®"), ord("ÿ") + 1))
+    mapping = {b: chr(b) for b in printable}
+    extra = 0
+    for b in range(256):
+        if b not in mapping:
+            mapping[b] = chr(256 + extra)
+            extra += 1
+    return mapping
+
+
+_BYTE_ENCODER = _bytes_to_unicode()
+
+
+class BPETokenCounter:
+    """Byte-level BPE encoder used only for counting tokens"""
+
+    def __init__(self, vocab_path: str = DEFAULT_VOCAB_PATH, cache_size: int = 65536):
+        self.vocab_path = vocab_path
+        self.normalizer = None
+        self.ranks = self._load_merges(vocab_path)
+        self._encode_piece = lru_cache(maxsize=cache_size)(self._bpe)
+
+    def _load_merges(self, vocab_path: str) -> Dict[Tuple[str, str], int]:
+        opener = gzip.open if vocab_path.endswith('.gz') else open
+        ranks = {}
+        with opener(vocab_path, 'rt', encoding='utf-8') as f:
+            # Only the first line is a header: "# #" is a perfectly good merge
+            header = f.readline()
+            if not header.startswith(VOCAB_HEADER):
+                raise ValueError(f"Not a KHAOS BPE merges file: {vocab_path}")
+            if 'normalizer=NFKC' in header:
+                self.normalizer = 'NFKC'
+            for line in f:
+                left, right = line.rstrip('\n').split(' ')
+                ranks[(left, right)] = len(ranks)
+        return ranks
+
+    def _bpe(self, piece: str) -> Tuple[str, ...]:
+        """Apply merges to one pre-tokenised piece"""
+        symbols = [_BYTE_ENCODER[b] for b in piece.encode('utf-8')]
+        ranks = self.ranks
+        while len(symbols) > 1:
+            best_rank, best = None, None
+            for pair in zip(symbols, symbols[1:]):
+                rank = ranks.get(pair)
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best = rank, pair
+            if best is None:
+                break
+
+            merged, i = [], 0
+            while i < len(symbols):
+                if i < len(symbols) - 1 and symbols[i] == best[0] and symbols[i + 1] == best[1]:
+                    merged.append(best[0] + best[1])
+                    i += 2
+                else:
+                    merged.append(symbols[i])
+                    i += 1
+            symbols = merged
+        return tuple(symbols)
+
+    def _pieces(self, text: str) -> List[str]:
+        if self.normalizer == 'NFKC':
+            text = unicodedata.normalize('NFKC', text)
+        return _PRETOKENIZE.findall(text)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Token strings (in the byte alphabet) - handy for inspecting how a prompt is split"""
+        return [token for piece in self._pieces(text) for token in self._encode_piece(piece)]
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        return sum(len(self._encode_piece(piece)) for piece in self._pieces(text))
+
+    def count_batch(self, texts: Iterable[str]) -> List[int]:
+        """Token counts for many texts; each distinct piece is encoded once"""
+        piece_counts = [Counter(self._pieces(text)) for text in texts]
+        lengths = {}
+        for counts in piece_counts:
+            for piece in counts:
+                if piece not in lengths:
+                    lengths[piece] = len(self._encode_piece(piece))
+        return [sum(lengths[piece] * n for piece, n in counts.items()) for counts in piece_counts]
+
+    def cache_info(self):
+        """Hit/miss statistics of the per-piece memo"""
+        return self._encode_piece.cache_info()
+
+
+_default_counter: Optional[BPETokenCounter] = None
+_default_lock = threading.Lock()
+_vocab_missing = False
+
+
+def get_token_counter() -> Optional[BPETokenCounter]:
+    """Shared counter over the bundled vocabulary (None if the vocabulary file is missing)"""
+    global _default_counter, _vocab_missing
+    if _default_counter is None and not _vocab_missing:
+        with _default_lock:
+            if _default_counter is None and not _vocab_missing:
+                if os.path.exists(DEFAULT_VOCAB_PATH):
+                    _default_counter = BPETokenCounter()
+                else:
+                    _vocab_missing = True
+    return _default_counter
+
+
+def estimate_tokens_from_words(text: str) -> int:
+    """The old heuristic (1 token ≈ 0.75 words), kept as a fallback"""
+    return int(len(text.split()) * 1.3)
+
+
+def count_tokens(text: str) -> int:
+    """Token count from the bundled BPE vocabulary, or the word heuristic without it"""
+    counter = get_token_counter()
+    return counter.count(text) if counter else estimate_tokens_from_words(text)
+
+
+def count_tokens_batch(texts: Iterable[str]) -> List[int]:
+    """Batch form of count_tokens"""
+    counter = get_token_counter()
+    if counter:
+        return counter.count_batch(texts)
+    return [estimate_tokens_from_words(text) for text in texts]
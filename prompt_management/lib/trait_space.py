@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+KHAOS Trait Space - WHO IN THE LIBRARY THINKS ALIKE
+Every DNA profile becomes a point in trait space: the eight personality ratios
+plus complexity (scaled to 0-1) and effectiveness. The library is held as one
+NumPy matrix, so nearest neighbours of a prompt are a single matrix-vector
+product and the full similarity matrix is a single matrix product.
+
+Requires numpy (pip install numpy).
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from lib.dna_features import PERSONALITY_PATTERNS
+
+# Column layout of the trait matrix
+TRAIT_COLUMNS = (*PERSONALITY_PATTERNS, 'complexity', 'effectiveness')
+
+# Complexity scores run 0-10; everything else is already a 0-1 ratio
+COMPLEXITY_SCALE = 10.0
+
+
+def _numpy():
+    """Import numpy on first use so the rest of the toolkit works without it"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Similarity search requires numpy - install it with: pip install numpy")
+    return numpy
+
+
+def trait_vector(dna_profile: Dict[str, Any]) -> List[float]:
+    """One profile as a row of the trait matrix"""
+    ratios = dna_profile['personality_ratios']
+    return [float(ratios.get(trait, 0.0)) for trait in PERSONALITY_PATTERNS] + [
+        dna_profile['complexity_score'] / COMPLEXITY_SCALE,
+        dna_profile['effectiveness_score'],
+    ]
+
+
+class TraitSpace:
+    """Trait vectors of a set of prompts with vectorised cosine and distance queries"""
+
+    def __init__(self, labels: Sequence[str], profiles: Sequence[Dict[str, Any]]):
+        np = _numpy()
+        self.labels = list(labels)
+        self.position = {label: index for index, label in enumerate(self.labels)}
+        self.matrix = np.array([trait_vector(profile) for profile in profiles], dtype=np.float64).reshape(
+            len(self.labels), len(TRAIT_COLUMNS))
+
+        # Unit rows make every cosine a plain dot product (all-zero rows stay zero)
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self._unit = np.divide(self.matrix, norms, out=np.zeros_like(self.matrix), where=norms > 0)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def nearest(self, label: str, k: int = 5) -> List[Tuple[str, float, float]]:
+        """
+        The k prompts closest to one prompt
+
+        Returns:
+            (label, cosine similarity, euclidean distance) tuples, most similar first
+        """
+        np = _numpy()
+        index = self.position[label]
+        similarities = self._unit @ self._unit[index]
+        distances = np.linalg.norm(self.matrix - self.matrix[index], axis=1)
+        similarities[index] = -np.inf
+
+        k = min(k, len(self.labels) - 1)
+        if k <= 0:
+            return []
+        # argpartition finds the top k in linear time; only those k are sorted
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.lexsort((distances[top], -similarities[top]))]
+        return [(self.labels[i], float(similarities[i]), float(distances[i])) for i in top]
+
+    def cosine_matrix(self):
+        """n × n cosine similarities"""
+        return self._unit @ self._unit.T
+
+    def distance_matrix(self):
+        """n × n euclidean distances (|a|² + |b|² - 2ab, clipped against rounding below zero)"""
+        np = _numpy()
+        squared = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        gram = self.matrix @ self.matrix.T
+        return np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * gram, 0.0))
+
+    def most_similar_pairs(self, limit: int = 20) -> List[Tuple[str, str, float]]:
+        """The closest distinct pairs in the whole space, most similar first"""
+        np = _numpy()
+        similarities = self.cosine_matrix()
+        rows, cols = np.triu_indices(len(self.labels), k=1)
+        values = similarities[rows, cols]
+        limit = min(limit, len(values))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-values, limit - 1)[:limit]
+        top = top[np.argsort(-values[top], kind='stable')]
+        return [(self.labels[rows[i]], self.labels[cols[i]], float(values[i])) for i in top]
+
+    def subspace(self, labels: Sequence[str]) -> 'TraitSpace':
+        """A new space restricted to these labels (matrix rows are shared, not recomputed)"""
+        space = TraitSpace.__new__(TraitSpace)
+        indices = [self.position[label] for label in labels]
+        space.labels = list(labels)
+        space.position = {label: index for index, label in enumerate(space.labels)}
+        space.matrix = self.matrix[indices]
+        space._unit = self._unit[indices]
+        return space
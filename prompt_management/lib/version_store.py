@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+KHAOS Version Store - THE FOSSIL RECORD
+Notion only keeps the current state of a prompt. This local store keeps every
+analysed state, content-addressed by DNA Hash:
+
+- objects/<hash>.json   prompt text, stored as a line delta against its parent
+                        version (a full keyframe every KEYFRAME_INTERVAL versions
+                        or when the delta would not be smaller)
+- history/<prompt>.json the prompt's versions in order, with DNA metrics
+
+A version is recorded only when the content hash changes, so repeated analysis
+runs cost nothing. Mutation traces and fitness trends are read from here
+instead of from the API.
+"""
+
+import difflib
+import glob
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from lib.local_store import cache_path, load_json, save_json
+
+KEYFRAME_INTERVAL = 16
+
+# DNA metrics kept with each version
+VERSION_METRICS = ('complexity_score', 'effectiveness_score', 'token_count', 'personality_conflicts')
+
+
+def compute_delta(base_text: str, text: str) -> List[list]:
+    """Line delta: ['=', start, end] copies base lines, ['+', [lines]] inserts new ones"""
+    base_lines = base_text.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(['=', i1, i2])
+        elif tag in ('replace', 'insert'):
+            delta.append(['+', lines[j1:j2]])
+    return delta
+
+
+def apply_delta(base_text: str, delta: List[list]) -> str:
+    """Rebuild a text from its parent and a delta produced by compute_delta"""
+    base_lines = base_text.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if op[0] == '=':
+            parts.extend(base_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1])
+    return ''.join(parts)
+
+
+def line_changes(old_text: str, new_text: str) -> Dict[str, int]:
+    """Lines added and removed between two texts"""
+    added = removed = 0
+    matcher = difflib.SequenceMatcher(None, old_text.splitlines(), new_text.splitlines(), autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ('replace', 'delete'):
+            removed += i2 - i1
+        if tag in ('replace', 'insert'):
+            added += j2 - j1
+    return {'added': added, 'removed': removed}
+
+
+class VersionStore:
+    """Content-addressed, delta-compressed history of every prompt"""
+
+    def __init__(self):
+        self._text_memo: Dict[str, str] = {}
+
+    # ═══════════════════════════════════════════════════════════════
+    # RECORDING
+    # ═══════════════════════════════════════════════════════════════
+
+    def record(self, prompt_id: str, prompt_text: str, dna_profile: Dict[str, Any],
+               health_status: Optional[str] = None) -> bool:
+        """
+        Append a version if the content changed since the prompt's last recorded version
+
+        Returns:
+            True when a new version was recorded
+        """
+        content_hash = dna_profile['content_hash']
+        history = self.history(prompt_id)
+        parent_hash = history[-1]['hash'] if history else None
+        if parent_hash == content_hash:
+            return False
+
+        self._store_object(content_hash, prompt_text, parent_hash)
+
+        entry = {
+            'hash': content_hash,
+            'parent': parent_hash,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'metrics': {metric: dna_profile[metric] for metric in VERSION_METRICS},
+        }
+        entry['metrics']['viral_coefficient'] = dna_profile['viral_potential']['viral_coefficient']
+        if health_status:
+            entry['metrics']['health_status'] = health_status
+        history.append(entry)
+        save_json(self._history_path(prompt_id), {'prompt_id': prompt_id, 'versions': history})
+        return True
+
+    def _store_object(self, content_hash: str, text: str, parent_hash: Optional[str]):
+        """Write the text object once; identical content in any prompt shares it"""
+        path = self._object_path(content_hash)
+        if os.path.exists(path):
+            return
+
+        obj = {'hash': content_hash, 'size': len(text)}
+        parent = load_json(self._object_path(parent_hash)) if parent_hash else None
+        if parent and parent.get('depth', 0) + 1 < KEYFRAME_INTERVAL:
+            delta = compute_delta(self.text(parent_hash), text)
+            if len(json.dumps(delta)) < len(text):
+                obj.update({'base': parent_hash, 'depth': parent['depth'] + 1, 'delta': delta})
+        if 'delta' not in obj:
+            obj.update({'depth': 0, 'text': text})
+
+        save_json(path, obj)
+        self._text_memo[content_hash] = text
+
+    # ═══════════════════════════════════════════════════════════════
+    # READING
+    # ═══════════════════════════════════════════════════════════════
+
+    def history(self, prompt_id: str) -> List[Dict[str, Any]]:
+        """Recorded versions of a prompt, oldest first"""
+        data = load_json(self._history_path(prompt_id), default={}) or {}
+        return data.get('versions', [])
+
+    def prompts(self) -> List[str]:
+        """Every prompt with at least one recorded version"""
+        prompt_ids = []
+        for path in glob.glob(os.path.join(os.path.dirname(self._history_path('x')), '*.json')):
+            data = load_json(path, default={}) or {}
+            if data.get('prompt_id'):
+                prompt_ids.append(data['prompt_id'])
+        return sorted(prompt_ids)
+
+    def text(self, content_hash: str) -> str:
+        """Reconstruct a version's text (walks back to the nearest keyframe; memoised)"""
+        if content_hash in self._text_memo:
+            return self._text_memo[content_hash]
+
+        chain = []
+        current = content_hash
+        while current not in self._text_memo:
+            obj = load_json(self._object_path(current))
+            if obj is None:
+                raise KeyError(f"Version object missing: {current}")
+            if 'text' in obj:
+                self._text_memo[current] = obj['text']
+                break
+            chain.append(obj)
+            current = obj['base']
+
+        for obj in reversed(chain):
+            self._text_memo[obj['hash']] = apply_delta(self._text_memo[obj['base']], obj['delta'])
+        return self._text_memo[content_hash]
+
+    def mutations(self, prompt_id: str) -> List[Dict[str, Any]]:
+        """Each version with its line changes and metric shifts relative to the previous one"""
+        trace = []
+        previous = None
+        for number, version in enumerate(self.history(prompt_id), 1):
+            step = {'version': number, 'hash': version['hash'], 'recorded_at': version['recorded_at'],
+                    'metrics': version['metrics'], 'changes': None, 'metric_deltas': {}}
+            if previous:
+                step['changes'] = line_changes(self.text(previous['hash']), self.text(version['hash']))
+                step['metric_deltas'] = {
+                    metric: version['metrics'][metric] - previous['metrics'][metric]
+                    for metric in ('effectiveness_score', 'complexity_score', 'token_count')
+                    if metric in version['metrics'] and metric in previous['metrics']
+                }
+            trace.append(step)
+            previous = version
+        return trace
+
+    def fitness_trends(self) -> List[Dict[str, Any]]:
+        """Effectiveness over time per prompt: first, latest, best and the full series"""
+        trends = []
+        for prompt_id in self.prompts():
+            series = [version['metrics']['effectiveness_score'] for version in self.history(prompt_id)]
+            if not series:
+                continue
+            trends.append({
+                'prompt_id': prompt_id,
+                'versions': len(series),
+                'first': series[0],
+                'latest': series[-1],
+                'best': max(series),
+                'change': series[-1] - series[0],
+                'series': series,
+            })
+        return sorted(trends, key=lambda trend: -trend['change'])
+
+    def stats(self) -> Dict[str, int]:
+        """Size of the store versus storing every version in full"""
+        objects = glob.glob(os.path.join(os.path.dirname(os.path.dirname(self._object_path('xx'))), '*', '*.json'))
+        stored_bytes = sum(os.path.getsize(path) for path in objects)
+        full_bytes = 0
+        keyframes = 0
+        for path in objects:
+            obj = load_json(path, default={}) or {}
+            full_bytes += obj.get('size', 0)
+            keyframes += 1 if 'text' in obj else 0
+        return {'objects': len(objects), 'keyframes': keyframes,
+                'stored_bytes': stored_bytes, 'full_text_bytes': full_bytes}
+
+    # ═══════════════════════════════════════════════════════════════
+    # LAYOUT
+    # ═══════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _object_path(content_hash: str) -> str:
+        return cache_path("versions", "objects", content_hash[:2], f"{content_hash}.json")
+
+    @staticmethod
+    def _history_path(prompt_id: str) -> str:
+        slug = re.sub(r'[^\w.-]+', '_', prompt_id)[:60]
+        digest = hashlib.sha1(prompt_id.encode('utf-8')).hexdigest()[:8]
+        return cache_path("versions", "history", f"{slug}-{digest}.json")
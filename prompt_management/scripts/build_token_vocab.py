@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+KHAOS Token Vocabulary Builder - PACK THE DICTIONARY FOR OFFLINE USE
+Converts a Hugging Face style byte-level BPE tokenizer.json into the compact
+merges file read by lib/token_counter.py.
+
+The bundled vocabulary was built from the tokenizer.json shipped with the
+Anthropic Python SDK (anthropic==0.38.0, MIT licensed):
+
+    python build_token_vocab.py path/to/anthropic/tokenizer.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from lib.token_counter import DEFAULT_VOCAB_PATH, VOCAB_HEADER
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline BPE merges file from a tokenizer.json")
+    parser.add_argument("tokenizer_json", help="Byte-level BPE tokenizer.json")
+    parser.add_argument("--output", default=DEFAULT_VOCAB_PATH, help="Merges file to write (.gz)")
+    args = parser.parse_args()
+
+    with open(args.tokenizer_json, 'r', encoding='utf-8') as f:
+        tokenizer = json.load(f)
+
+    model = tokenizer.get('model') or {}
+    pre_tokenizer = tokenizer.get('pre_tokenizer') or {}
+    normalizer = tokenizer.get('normalizer') or {}
+    if model.get('type') != 'BPE' or pre_tokenizer.get('type') != 'ByteLevel':
+        print("❌ Only byte-level BPE tokenizers are supported")
+        sys.exit(1)
+    if normalizer and normalizer.get('type') != 'NFKC':
+        print(f"❌ Unsupported normalizer: {normalizer.get('type')}")
+        sys.exit(1)
+
+    # Merges appear as "a b" strings (older format) or ["a", "b"] pairs
+    merges = [merge if isinstance(merge, str) else ' '.join(merge) for merge in model['merges']]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with gzip.open(args.output, 'wt', encoding='utf-8') as f:
+        f.write(f"{VOCAB_HEADER} normalizer={normalizer.get('type', 'none')}\n")
+        for merge in merges:
+            f.write(merge + '\n')
+
+    print(f"✅ Wrote {len(merges):,} merges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ NOW WITH ARCHAEOLOGICAL DNA ANALYSIS SUPERPOWERS!
 
 import os
 import sys
+import json
+import time
 
 # Add the parent directory to the sys.path to find modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,10 +17,13 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 import argparse
-from lib.prompt_manager import PromptManager
+from lib.local_store import load_environment
+from lib.storage import STORAGE_KINDS, open_storage
 
 def main():
     parser = argparse.ArgumentParser(description="KHAOS Prompt Library Manager with Archaeological Analysis")
+    parser.add_argument("--storage", choices=STORAGE_KINDS, default=None,
+                        help="Where prompts are read and written (default: PROMPT_STORAGE, else notion)")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
     
     # ═══════════════════════════════════════════════════════════════
@@ -32,6 +37,28 @@ def main():
     create_parser = subparsers.add_parser("create", help="Create a new prompt")
     create_parser.add_argument("file", help="Path to the prompt file")
     
+    # Import command - Upsert a whole template tree
+    import_parser = subparsers.add_parser("import-dir", help="📦 Import a directory of templates (create or update by Prompt ID)")
+    import_parser.add_argument("paths", nargs="+", help="Template directories, files or globs")
+    import_parser.add_argument("--workers", type=int, default=None, help="Parallel parsers/uploads (default: CPU count)")
+    import_parser.add_argument("--dry-run", action="store_true", help="Show what would be created or updated without writing")
+    
+    # Watch command - Push template edits to the library as they are saved
+    watch_parser = subparsers.add_parser("watch", help="👀 Watch a template directory and sync saved edits")
+    watch_parser.add_argument("directory", help="Template directory to watch (recursively)")
+    watch_parser.add_argument("--debounce", type=float, default=0.5, help="Quiet seconds that close a batch of edits (default: 0.5)")
+    watch_parser.add_argument("--poll", action="store_true", help="Poll modification times instead of using inotify")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds (default: 1.0)")
+    watch_parser.add_argument("--workers", type=int, default=4, help="Concurrent uploads per batch (default: 4)")
+    
+    # Sync command - Two-way sync of a template directory with conflict detection
+    sync_parser = subparsers.add_parser("sync", help="🔄 Two-way sync of a template directory with the library")
+    sync_parser.add_argument("directory", help="Template directory to sync")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Show what would be pulled, pushed or in conflict")
+    sync_parser.add_argument("--resolve", choices=["local", "remote"], default=None,
+                             help="Settle conflicts: keep the local file or the Notion page")
+    sync_parser.add_argument("--workers", type=int, default=4, help="Concurrent uploads (default: 4)")
+    
     # Read command
     read_parser = subparsers.add_parser("read", help="Read a prompt")
     read_parser.add_argument("prompt_id", help="ID of the prompt to read")
@@ -56,9 +83,29 @@ def main():
     
     # Analyze command - The main DNA analysis
     analyze_parser = subparsers.add_parser("analyze", help="🔬 Analyze prompt DNA and generate archaeological report")
-    analyze_parser.add_argument("prompt_id", help="ID of the prompt to analyze")
+    analyze_parser.add_argument("prompt_id", nargs="?", help="ID of the prompt to analyze (omit with --all)")
     analyze_parser.add_argument("--save-report", help="Save analysis report to file", default=None)
     analyze_parser.add_argument("--verbose", "-v", action="store_true", help="Show detailed analysis")
+    analyze_parser.add_argument("--all", action="store_true", help="Analyze the whole prompt library")
+    analyze_parser.add_argument("--changed-only", action="store_true", help="With --all: skip prompts whose DNA Hash is unchanged")
+    analyze_parser.add_argument("--workers", type=int, default=None, help="With --all: parallel workers (default: CPU count)")
+    
+    # Analyze-file command - Local templates, no Notion round trip
+    analyze_file_parser = subparsers.add_parser("analyze-file", help="🧪 Analyze local template files (no Notion access)")
+    analyze_file_parser.add_argument("paths", nargs="+", help="Template files, directories or glob patterns")
+    analyze_file_parser.add_argument("--jsonl", action="store_true", help="Emit one JSON object per file instead of a table")
+    analyze_file_parser.add_argument("--workers", type=int, default=None, help="Parallel workers (default: CPU count)")
+    
+    # Duplicates command - Near-duplicate clusters via MinHash/LSH
+    duplicates_parser = subparsers.add_parser("duplicates", help="👯 Find near-duplicate prompts (MinHash/LSH)")
+    duplicates_parser.add_argument("paths", nargs="*", help="Check local template files/directories/globs instead of the library")
+    duplicates_parser.add_argument("--threshold", type=float, default=0.5, help="Minimum similarity, 0-1 (default: 0.5)")
+    
+    # Search command - BM25 full-text search over the local index
+    search_parser = subparsers.add_parser("search", help="🔎 Full-text search across prompt content")
+    search_parser.add_argument("query", help="Search terms, e.g. \"Annex III\"")
+    search_parser.add_argument("--limit", "-n", type=int, default=10, help="Maximum number of hits (default: 10)")
+    search_parser.add_argument("--refresh", action="store_true", help="Fetch prompts edited since the last index update first")
     
     # Health Check command - System-wide diagnosis
     health_parser = subparsers.add_parser("health-check", help="🏥 Perform health check on all prompts")
@@ -75,17 +122,59 @@ def main():
     lineage_parser.add_argument("prompt_id", nargs="?", help="ID of the prompt to trace (optional)")
     lineage_parser.add_argument("--show-tree", action="store_true", help="Show visual family tree")
     lineage_parser.add_argument("--all", action="store_true", help="Show lineage for all prompts")
+    lineage_parser.add_argument("--rebuild", action="store_true", help="Rebuild the cached lineage index from a full scan")
+    
+    # Resolve command - Compose a prompt from its ancestors
+    resolve_parser = subparsers.add_parser("resolve", help="🧩 Compose a prompt from its parents with section overrides")
+    resolve_parser.add_argument("prompt_id", nargs="?", help="ID of the prompt to resolve")
+    resolve_parser.add_argument("--all", action="store_true", help="Resolve every prompt in the library")
+    resolve_parser.add_argument("--origins", action="store_true", help="Show which ancestor each section comes from")
+    resolve_parser.add_argument("--output", "-o", help="Write the composed prompt to a file", default=None)
+    
+    # Serve command - Local HTTP endpoint for resolved prompts
+    serve_parser = subparsers.add_parser("serve", help="🚀 Serve resolved prompts over local HTTP (ETag, hot cache)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to bind (default: 8765)")
+    serve_parser.add_argument("--refresh-interval", type=float, default=60.0,
+                              help="Seconds between background refreshes from Notion (default: 60)")
+    serve_parser.add_argument("--offline", action="store_true", help="Serve the locally stored catalogue without contacting Notion")
+    serve_parser.add_argument("--snapshot", help="Serve from a snapshot file instead of Notion (reloaded when it changes)", default=None)
+    
+    # Snapshot command - Offline copy of the whole library
+    snapshot_parser = subparsers.add_parser("snapshot", help="🧳 Export, import or inspect a binary snapshot of the library")
+    snapshot_parser.add_argument("action", choices=["export", "import", "show"], help="What to do with the snapshot")
+    snapshot_parser.add_argument("file", help="Snapshot file")
+    snapshot_parser.add_argument("prompt_id", nargs="?", help="show: print one prompt from the snapshot")
+    snapshot_parser.add_argument("--workers", type=int, default=None, help="Parallel DNA analysis/uploads (default: CPU count)")
+    snapshot_parser.add_argument("--dry-run", action="store_true", help="import: show what would change without writing")
+    
+    # Storage command - Local SQLite copy of the library, synchronised explicitly
+    storage_parser = subparsers.add_parser("storage", help="🗄️ Pull/push the local SQLite store from/to Notion")
+    storage_parser.add_argument("action", choices=["status", "pull", "push"], help="What to do with the local store")
+    storage_parser.add_argument("--full", action="store_true", help="pull: re-read every page, not just those edited since the last pull")
+    
+    # Daemon command - Keep a warm process that runs both CLIs' commands
+    daemon_parser = subparsers.add_parser("daemon", help="🧠 Start/stop the background daemon that keeps caches and connections warm")
+    daemon_parser.add_argument("action", choices=["start", "stop", "restart", "status", "run"],
+                               help="run: serve in the foreground (start launches it in the background)")
     
     # Evolution command - Track prompt mutations over time
     evolution_parser = subparsers.add_parser("evolution", help="🧬 Track prompt evolution and mutations")
+    evolution_parser.add_argument("prompt_id", nargs="?", help="Limit mutation history to one prompt (optional)")
     evolution_parser.add_argument("--trace-mutations", action="store_true", help="Show mutation history")
     evolution_parser.add_argument("--fitness-trends", action="store_true", help="Show fitness evolution over time")
     
     # Compare command - Compare two prompts side by side
     compare_parser = subparsers.add_parser("compare", help="⚖️ Compare DNA profiles of two prompts")
-    compare_parser.add_argument("prompt_id_1", help="First prompt ID")
-    compare_parser.add_argument("prompt_id_2", help="Second prompt ID")
+    compare_parser.add_argument("prompt_id_1", nargs="?", help="First prompt ID")
+    compare_parser.add_argument("prompt_id_2", nargs="?", help="Second prompt ID")
     compare_parser.add_argument("--detailed", "-d", action="store_true", help="Show detailed comparison")
+    compare_parser.add_argument("--matrix", action="store_true", help="Trait-similarity matrix of the whole library (requires numpy)")
+    
+    # Similar command - Nearest neighbours in trait space
+    similar_parser = subparsers.add_parser("similar", help="🧭 Find prompts with the most similar personality DNA")
+    similar_parser.add_argument("prompt_id", help="ID of the prompt to match")
+    similar_parser.add_argument("--k", type=int, default=5, help="Number of neighbours (default: 5)")
     
     # Stats command - Show database statistics
     stats_parser = subparsers.add_parser("stats", help="📊 Show prompt database statistics")
@@ -104,12 +193,53 @@ def main():
     
     # Parse arguments
     args = parser.parse_args()
+    load_environment()
+    
+    if args.command == "daemon":
+        _control_daemon(args)
+        return
     
-    # Initialize the prompt manager
-    manager = PromptManager()
+    # A running daemon executes the command with warm caches (delete asks for confirmation
+    # here, serve and watch are long-running)
+    if args.command not in ("delete", "serve", "watch"):
+        from lib.daemon import forward
+        status = forward("prompt", sys.argv[1:])
+        if status is not None:
+            sys.exit(status)
+    
+    # Local commands never touch Notion
+    if args.command == "analyze-file":
+        _analyze_local_files(args)
+        return
+    if args.command == "duplicates" and args.paths:
+        _find_local_duplicates(args)
+        return
+    if args.command == "evolution":
+        _show_evolution(args)
+        return
+    if args.command == "snapshot" and args.action == "show":
+        _show_snapshot(args)
+        return
+    if args.command == "serve" and args.snapshot:
+        _serve_prompts(None, args)
+        return
+    if args.command == "storage":
+        _sync_storage(args)
+        return
+    
+    # Initialize the prompt manager (imported here so --help and local commands start fast;
+    # in the daemon the same manager serves every command)
+    from lib.prompt_manager import PromptManager
+    from lib.daemon import warm
+    kind = (args.storage or os.getenv("PROMPT_STORAGE") or "notion").lower()
+    try:
+        manager = warm(("prompt-manager", kind), lambda: PromptManager(_open_storage(kind)))
+    except Exception as e:
+        print(f"❌ Cannot open {args.storage or os.getenv('PROMPT_STORAGE') or 'notion'} storage: {e}")
+        sys.exit(1)
     
     # Check if we're properly configured
-    if not os.getenv("PROMPT_DATABASE_ID"):
+    if manager.storage.kind == "notion" and not os.getenv("PROMPT_DATABASE_ID"):
         print("❌ Error: PROMPT_DATABASE_ID not set in .env file")
         print("Please add the following to your .env file:")
         print("PROMPT_DATABASE_ID=your_prompts_database_id")
@@ -135,8 +265,37 @@ def main():
         else:
             print("❌ Failed to create prompt. Check file format and content.")
         
+    elif args.command == "import-dir":
+        print(f"📦 Importing templates from: {', '.join(args.paths)}" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 70)
+        start_time = time.perf_counter()
+        summary = manager.import_templates(args.paths, workers=args.workers, dry_run=args.dry_run)
+        elapsed = time.perf_counter() - start_time
+        
+        verb = "would be " if args.dry_run else ""
+        for prompt_id in sorted(summary['created']):
+            print(f"➕ {prompt_id}: {verb}created")
+        for prompt_id in sorted(summary['updated']):
+            print(f"✏️  {prompt_id}: {verb}updated")
+        for path, reason in summary['skipped']:
+            print(f"⏭️  {path}: {reason}")
+        for warning in summary['warnings']:
+            print(f"⚠️  {warning}")
+        for path, error in summary['failed']:
+            print(f"❌ {path}: {error}")
+        
+        print(f"\n📊 {summary['files']} file(s) in {elapsed:.2f}s - {len(summary['created'])} created, "
+              f"{len(summary['updated'])} updated, {len(summary['unchanged'])} unchanged, "
+              f"{len(summary['skipped'])} skipped, {len(summary['failed'])} failed")
+        if summary['failed']:
+            sys.exit(1)
+        
+    elif args.command == "sync":
+        _sync_templates(manager, args)
+        
     elif args.command == "read":
-        prompt = manager.read_prompt(args.prompt_id)
+        # Only the displayed/saved core content is decoded
+        prompt = manager.read_prompt(args.prompt_id, include_all_properties=False)
         if prompt:
             if args.save:
                 # Generate full prompt content for saving
@@ -205,6 +364,34 @@ def main():
     # ARCHAEOLOGICAL COMMAND IMPLEMENTATIONS
     # ═══════════════════════════════════════════════════════════════
     
+    elif args.command == "analyze" and args.all:
+        print("🔬 LIBRARY-WIDE ARCHAEOLOGICAL ANALYSIS")
+        print("=" * 70)
+        
+        start_time = time.perf_counter()
+        summary = manager.analyze_library(changed_only=args.changed_only, workers=args.workers)
+        elapsed = time.perf_counter() - start_time
+        
+        print(f"\n📊 BATCH SUMMARY:")
+        print(f"  Library Size: {summary['total']}")
+        print(f"  Analyzed & Stored: {summary['analyzed']}")
+        print(f"  Unchanged (skipped): {summary['unchanged']}")
+        print(f"  Without Content: {summary['empty']}")
+        if summary['failed']:
+            print(f"  Failed: {len(summary['failed'])} ({', '.join(summary['failed'])})")
+        print(f"  Elapsed: {elapsed:.1f}s")
+        
+        if args.verbose and summary['profiles']:
+            print(f"\n{'Prompt':<35} | {'Complexity':>10} | {'Effectiveness':>13} | {'Viral':>5}")
+            print("-" * 72)
+            for profile in sorted(summary['profiles'], key=lambda p: p['prompt_id']):
+                print(f"{profile['prompt_id']:<35} | {profile['complexity_score']:>10.2f} | "
+                      f"{profile['effectiveness_score']:>13.1%} | {profile['viral_potential']['viral_coefficient']:>5.2f}")
+    
+    elif args.command == "analyze" and not args.prompt_id:
+        print("❌ Please specify a prompt ID or use --all flag")
+        print("Usage: prompt_cli.py analyze [prompt_id] | --all [--changed-only] [--workers N]")
+    
     elif args.command == "analyze":
         print(f"🔬 ENHANCED ARCHAEOLOGICAL ANALYSIS: {args.prompt_id}")
         print("=" * 70)
@@ -224,7 +411,7 @@ def main():
         
         # Phase 2: Perform DNA analysis
         print("\n🧬 Phase 2: DNA Analysis...")
-        dna_profile = manager.analyze_prompt_dna(args.prompt_id)
+        dna_profile = manager.analyze_prompt_dna(args.prompt_id, prompt_data=prompt_data)
         
         if dna_profile:
             # Generate and display the analysis report
@@ -288,6 +475,30 @@ def main():
         else:
             print("❌ DNA analysis failed - unable to process prompt content")
     
+    elif args.command == "duplicates":
+        print(f"👯 NEAR-DUPLICATE SCAN (similarity ≥ {args.threshold:.0%})")
+        print("=" * 70)
+        result = manager.find_duplicate_prompts(threshold=args.threshold)
+        _print_duplicate_clusters(result, result['scanned'])
+    
+    elif args.command == "search":
+        start_time = time.perf_counter()
+        result = manager.search_prompts(args.query, limit=args.limit, refresh=args.refresh)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        print(f"🔎 SEARCH: {args.query}")
+        print("=" * 70)
+        if not result['hits']:
+            print(f"🕳️  No prompts match among {result['indexed']} indexed")
+        for rank, hit in enumerate(result['hits'], 1):
+            print(f"\n{rank:>2}. {hit['prompt_id']}  (score {hit['score']:.2f})")
+            if hit['field']:
+                print(f"    {hit['field']}: {hit['snippet']}")
+        
+        print(f"\n📊 {len(result['hits'])} hit(s) from {result['indexed']} indexed prompts in {elapsed_ms:.1f} ms")
+        if not args.refresh:
+            print(f"   Index current to {result['watermark'] or 'never'} - use --refresh to pick up newer edits")
+    
     elif args.command == "health-check":
         print("🏥 ENHANCED SYSTEM-WIDE HEALTH CHECK")
         print("=" * 70)
@@ -431,8 +642,8 @@ def main():
         print(f"⚡ Generating optimization suggestions for: {args.prompt_id}")
         print("=" * 60)
         
-        # First analyze the prompt
-        dna_profile = manager.analyze_prompt_dna(args.prompt_id)
+        # First analyze the prompt (read-only - cached profiles are reused)
+        dna_profile = manager.analyze_prompt_dna(args.prompt_id, persist=False)
         if dna_profile:
             # Generate optimization suggestions
             suggestions = manager.generate_optimization_suggestions(dna_profile)
@@ -458,13 +669,18 @@ def main():
     
     elif args.command == "lineage":
         if args.all:
-            print("🌳 Showing lineage for all prompts...")
-            print("(Full lineage tracing not yet implemented)")
-            print("This feature will show the complete family tree of all prompts.")
+            print("🌳 PROMPT FAMILY FOREST")
+            print("=" * 60)
+            index = manager.load_lineage_index(rebuild=args.rebuild)
+            for line in index.render_forest():
+                print(line)
+            print(f"📊 {len(index.nodes)} prompts, {len(index.roots())} root(s)")
         elif args.prompt_id:
             print(f"🌳 Tracing lineage for: {args.prompt_id}")
             print("=" * 60)
             
+            if args.rebuild:
+                manager.load_lineage_index(rebuild=True)
             lineage = manager.trace_prompt_lineage(args.prompt_id)
             
             if 'error' in lineage:
@@ -477,13 +693,19 @@ def main():
                 if lineage['ancestors']:
                     print(f"\n🔺 ANCESTORS:")
                     for ancestor in lineage['ancestors']:
-                        print(f"  Gen {ancestor['generation']}: {ancestor['prompt_id']}")
+                        missing = "" if ancestor['in_library'] else " ❓ not in library"
+                        print(f"  Gen {ancestor['generation']}: {ancestor['prompt_id']}{missing}")
                 
                 if lineage['descendants']:
                     print(f"\n🔻 DESCENDANTS:")
                     for descendant in lineage['descendants']:
                         print(f"  Gen {descendant['generation']}: {descendant['prompt_id']}")
                 
+                if args.show_tree and lineage['descendants']:
+                    print(f"\n🌳 FAMILY TREE:")
+                    for line in manager.load_lineage_index().render_tree(args.prompt_id):
+                        print(f"  {line}")
+                
                 if not lineage['ancestors'] and not lineage['descendants']:
                     print("🌱 This prompt appears to be a standalone specimen")
                     print("   (No parent-child relationships detected)")
@@ -491,36 +713,118 @@ def main():
             print("❌ Please specify a prompt ID or use --all flag")
             print("Usage: prompt_cli.py lineage [prompt_id]")
     
-    elif args.command == "evolution":
-        print("🧬 Tracking prompt evolution...")
-        print("=" * 60)
-        
-        if args.trace_mutations:
-            print("📈 MUTATION TRACKING:")
-            print("(Mutation tracking not yet fully implemented)")
-            print("This would show how prompts have changed over time,")
-            print("tracking version changes and effectiveness evolution.")
-        
-        if args.fitness_trends:
-            print("📊 FITNESS TRENDS:")
-            print("(Fitness trend analysis not yet fully implemented)")  
-            print("This would show effectiveness scores over time,")
-            print("highlighting which evolutionary changes improved performance.")
-            
-        if not args.trace_mutations and not args.fitness_trends:
-            print("🧬 EVOLUTION OVERVIEW:")
-            print("Use --trace-mutations to see change history")
-            print("Use --fitness-trends to see performance evolution")
+    elif args.command == "resolve":
+        if args.all:
+            print("🧩 RESOLVED PROMPT LIBRARY")
+            print("=" * 70)
+            resolver = manager.load_inheritance_resolver()
+            resolved = resolver.resolve_all()
+            print(f"{'Prompt':<40} | {'Sections':>8} | {'Inherited':>9}")
+            print("-" * 64)
+            for prompt_id, result in resolved.items():
+                inherited = sum(1 for origin in result['origins'].values() if origin != prompt_id)
+                print(f"{prompt_id[:40]:<40} | {len(result['sections']):>8} | {inherited:>9}")
+            print(f"\n📊 {len(resolved)} prompts - {resolver.composed} composed, {resolver.reused} reused from memo")
+        elif args.prompt_id:
+            result = manager.resolve_prompt(args.prompt_id)
+            if 'error' in result:
+                print(f"❌ Resolution failed: {result['error']}")
+            elif args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(result['text'])
+                print(f"✅ Resolved {args.prompt_id} ({len(result['sections'])} sections) written to: {args.output}")
+            else:
+                chain = ' ← '.join([args.prompt_id, *result['ancestors']])
+                print(f"🧩 Resolved prompt: {chain}")
+                print(f"🔑 Ancestry key: {result['key']}")
+                if args.origins:
+                    print(f"\n{'Section':<25} | Origin")
+                    print("-" * 60)
+                    for field, origin in result['origins'].items():
+                        print(f"{field:<25} | {origin}")
+                print("=" * 70)
+                print(result['text'])
+        else:
+            print("❌ Please specify a prompt ID or use --all flag")
+            print("Usage: prompt_cli.py resolve [prompt_id]")
+    
+    elif args.command == "serve":
+        _serve_prompts(manager, args)
+    
+    elif args.command == "watch":
+        _watch_templates(manager, args)
+    
+    elif args.command == "snapshot" and args.action == "export":
+        print(f"🧳 Exporting the prompt library to: {args.file}")
+        start_time = time.perf_counter()
+        result = manager.export_snapshot(args.file, workers=args.workers)
+        print(f"✅ {result['records']} prompt(s), {result['bytes']:,} bytes in {time.perf_counter() - start_time:.2f}s"
+              f" ({result['analyzed']} analysed, the rest from the DNA cache)")
+    
+    elif args.command == "snapshot" and args.action == "import":
+        print(f"🧳 Importing snapshot: {args.file}" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 70)
+        try:
+            summary = manager.import_snapshot(args.file, workers=args.workers, dry_run=args.dry_run)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read snapshot: {e}")
+            sys.exit(1)
+        verb = "would be " if args.dry_run else ""
+        for prompt_id in sorted(summary['created']):
+            print(f"➕ {prompt_id}: {verb}created")
+        for prompt_id in sorted(summary['updated']):
+            print(f"✏️  {prompt_id}: {verb}updated")
+        for path, reason in summary['skipped']:
+            print(f"⏭️  {path}: {reason}")
+        for path, error in summary['failed']:
+            print(f"❌ {path}: {error}")
+        print(f"\n📊 {summary['files']} prompt(s) - {len(summary['created'])} created, {len(summary['updated'])} updated, "
+              f"{len(summary['unchanged'])} unchanged, {len(summary['failed'])} failed")
+    
+    elif args.command == "similar":
+        print(f"🧭 Prompts most similar to: {args.prompt_id}")
+        print("=" * 70)
+        space = manager.build_trait_space()
+        label = _resolve_space_label(space, args.prompt_id)
+        if label is None:
+            print(f"❌ No analysable prompt found: {args.prompt_id}")
+        else:
+            neighbours = space.nearest(label, args.k)
+            print(f"{'Prompt':<40} | {'Cosine':>6} | {'Distance':>8}")
+            print("-" * 62)
+            for neighbour, similarity, distance in neighbours:
+                print(f"{neighbour[:40]:<40} | {similarity:>6.3f} | {distance:>8.3f}")
+            print(f"\n📊 {len(neighbours)} nearest of {len(space)} prompts in trait space")
+    
+    elif args.command == "compare" and args.matrix:
+        space = manager.build_trait_space()
+        if args.prompt_id_1 or args.prompt_id_2:
+            labels = [_resolve_space_label(space, prompt_id) for prompt_id in (args.prompt_id_1, args.prompt_id_2) if prompt_id]
+            if None in labels:
+                print("❌ Prompt not found in the library - run compare --matrix without IDs to see all")
+                sys.exit(1)
+            if len(labels) == 1:
+                # A single prompt is ranked against the rest of the library
+                print(f"⚖️ {labels[0]} against {len(space) - 1} prompts")
+                print("=" * 70)
+                for label, similarity, distance in space.nearest(labels[0], len(space)):
+                    print(f"  {similarity:.3f}  (distance {distance:.3f})  {label}")
+                return
+            space = space.subspace(labels)
+        _print_similarity_matrix(space)
     
     elif args.command == "compare":
+        if not (args.prompt_id_1 and args.prompt_id_2):
+            print("❌ Please specify two prompt IDs, or use --matrix")
+            sys.exit(1)
         print(f"⚖️ Comparing prompts: {args.prompt_id_1} vs {args.prompt_id_2}")
         print("=" * 60)
         
-        # Analyze both prompts
+        # Analyze both prompts (read-only - cached profiles are reused)
         print("🔬 Analyzing first prompt...")
-        dna1 = manager.analyze_prompt_dna(args.prompt_id_1)
+        dna1 = manager.analyze_prompt_dna(args.prompt_id_1, persist=False)
         print("🔬 Analyzing second prompt...")
-        dna2 = manager.analyze_prompt_dna(args.prompt_id_2)
+        dna2 = manager.analyze_prompt_dna(args.prompt_id_2, persist=False)
         
         if dna1 and dna2:
             print("\n📊 COMPARATIVE ANALYSIS:")
@@ -625,7 +929,7 @@ def main():
         
         try:
             # Get database schema
-            db = manager.notion.databases.retrieve(database_id=manager.database_id)
+            db = manager._get_database_schema(refresh=True)
             properties = db.get('properties', {})
             
             if not properties:
@@ -758,6 +1062,444 @@ def main():
         parser.print_help()
         print("\n🔬 Pro tip: Start with 'list' to see your specimens,")
         print("   then 'analyze' to examine their DNA!")
+    
+    # Send any buffered page updates and show what coalescing saved
+    failed_pages = manager.writer.flush()
+    if manager.writer.stats['requested']:
+        print(f"\n{manager.writer.report()}")
+        if failed_pages:
+            print(f"❌ {len(failed_pages)} page update(s) failed - see errors above")
+
+def _analyze_local_files(args):
+    """analyze-file: score template files from disk and stream the results"""
+    from lib.local_analysis import analyze_files, expand_paths
+    
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("❌ No template files matched", file=sys.stderr)
+        sys.exit(1)
+    
+    if not args.jsonl:
+        print(f"🧪 LOCAL DNA ANALYSIS: {len(paths)} file(s)")
+        print("=" * 100)
+        print(f"{'File':<40} | {'Tokens':>6} | {'Complexity':>10} | {'Effectiveness':>13} | {'Viral':>5} | Health")
+        print("-" * 100)
+    
+    start_time = time.perf_counter()
+    health_counts = {}
+    errors = 0
+    free_text = 0
+    for row in analyze_files(paths, workers=args.workers):
+        if args.jsonl:
+            print(json.dumps(row, ensure_ascii=False), flush=True)
+        elif 'error' in row:
+            print(f"{os.path.basename(row['file'])[:40]:<40} | ❌ {row['error']}", flush=True)
+        else:
+            label = os.path.basename(row['file']) + ('' if row['structured'] else ' *')
+            print(f"{label[:40]:<40} | {row['token_count']:>6} | {row['complexity_score']:>10.2f} | "
+                  f"{row['effectiveness_score']:>13.1%} | {row['viral_coefficient']:>5.2f} | {row['health_status']}", flush=True)
+        
+        if 'error' in row:
+            errors += 1
+        else:
+            free_text += 0 if row['structured'] else 1
+            health_counts[row['health_status']] = health_counts.get(row['health_status'], 0) + 1
+    
+    if not args.jsonl:
+        elapsed = time.perf_counter() - start_time
+        print("-" * 100)
+        breakdown = ", ".join(f"{status}: {count}" for status, count in sorted(health_counts.items()))
+        print(f"📊 {len(paths)} file(s) in {elapsed:.2f}s - {breakdown or 'no results'}" + (f", ❌ {errors} failed" if errors else ""))
+        if free_text:
+            print("   * no template sections recognised - analysed as free text")
+    
+    if errors:
+        sys.exit(1)
+
+
+def _find_local_duplicates(args):
+    """duplicates <paths>: cluster local template files without touching Notion"""
+    from lib.local_analysis import expand_paths, read_template
+    from lib.near_duplicates import detect_duplicates
+    from lib.prompt_archaeologist import get_worker_archaeologist
+    
+    paths = expand_paths(args.paths)
+    print(f"👯 NEAR-DUPLICATE SCAN: {len(paths)} file(s) (similarity ≥ {args.threshold:.0%})")
+    print("=" * 70)
+    
+    archaeologist = get_worker_archaeologist()
+    items = []
+    for path in paths:
+        try:
+            text = read_template(path)['prompt_text']
+        except OSError as e:
+            print(f"⚠️  Skipping {path}: {e}")
+            continue
+        if text:
+            items.append((path, archaeologist._generate_content_hash(text), text))
+    
+    _print_duplicate_clusters(detect_duplicates(items, args.threshold), len(items))
+
+
+def _show_evolution(args):
+    """evolution: mutation history and fitness trends from the local version store"""
+    from lib.version_store import VersionStore
+    
+    store = VersionStore()
+    print("🧬 Tracking prompt evolution...")
+    print("=" * 60)
+    
+    if args.trace_mutations:
+        prompt_ids = [args.prompt_id] if args.prompt_id else store.prompts()
+        print("📈 MUTATION TRACKING:")
+        for prompt_id in prompt_ids:
+            trace = store.mutations(prompt_id)
+            if not trace:
+                print(f"\n❓ No recorded versions for {prompt_id}")
+                continue
+            print(f"\n🧬 {prompt_id} ({len(trace)} version(s))")
+            for step in trace:
+                metrics = step['metrics']
+                line = (f"  v{step['version']:<3} {step['hash']}  {step['recorded_at'][:16]}  "
+                        f"eff {metrics['effectiveness_score']:.1%}  cx {metrics['complexity_score']:.1f}  "
+                        f"{metrics['token_count']} tok")
+                if step['changes']:
+                    deltas = step['metric_deltas']
+                    line += (f"  (+{step['changes']['added']}/-{step['changes']['removed']} lines, "
+                             f"eff {deltas.get('effectiveness_score', 0):+.1%})")
+                print(line)
+    
+    if args.fitness_trends:
+        trends = store.fitness_trends()
+        print("📊 FITNESS TRENDS:")
+        if trends:
+            print(f"{'Prompt ID':<35} | {'Vers':>4} | {'First':>6} | {'Latest':>6} | {'Best':>6} | {'Change':>7} | Trend")
+            print("-" * 95)
+        for trend in trends:
+            print(f"{trend['prompt_id'][:35]:<35} | {trend['versions']:>4} | {trend['first']:>6.1%} | "
+                  f"{trend['latest']:>6.1%} | {trend['best']:>6.1%} | {trend['change']:>+7.1%} | "
+                  f"{_sparkline(trend['series'][-20:])}")
+    
+    if not args.trace_mutations and not args.fitness_trends:
+        prompt_ids = store.prompts()
+        versions = sum(len(store.history(prompt_id)) for prompt_id in prompt_ids)
+        stats = store.stats()
+        print("🧬 EVOLUTION OVERVIEW:")
+        print(f"Prompts tracked: {len(prompt_ids)}")
+        print(f"Versions recorded: {versions} ({stats['objects']} unique texts, {stats['keyframes']} stored in full)")
+        if stats['full_text_bytes']:
+            print(f"Store size: {stats['stored_bytes']:,} bytes for {stats['full_text_bytes']:,} characters of prompt text")
+        print("\nUse --trace-mutations [prompt_id] to see change history")
+        print("Use --fitness-trends to see performance evolution")
+    
+    if not store.prompts():
+        print("\n🌱 No versions recorded yet - run analyze (or analyze --all) to start the fossil record")
+
+
+def _serve_prompts(manager, args):
+    """serve: asyncio HTTP endpoint over the resolved prompt catalogue"""
+    import asyncio
+    from lib.prompt_server import PromptCatalog, PromptServer
+    from lib.snapshot import Snapshot
+    
+    database_id = manager.database_id if manager else None
+    if args.snapshot:
+        try:
+            with Snapshot(args.snapshot) as snapshot:
+                database_id = snapshot.meta.get('database_id')
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read snapshot: {e}")
+            return
+    catalog = PromptCatalog.load(database_id)
+    
+    def refresh():
+        changed = catalog.update_from(manager.load_inheritance_resolver(refresh=True))
+        if changed:
+            print(f"🔄 Catalogue refreshed: {changed} prompt(s) changed, {len(catalog)} served")
+        return changed
+    
+    if args.snapshot:
+        refresh = _snapshot_refresher(catalog, args.snapshot)
+    
+    server = PromptServer(catalog, None if args.offline else refresh, args.refresh_interval,
+                          on_change=lambda: catalog.save(database_id))
+    
+    def ready(_):
+        print(f"🚀 Serving {len(catalog)} stored prompt(s) on http://{args.host}:{args.port}/prompts"
+              + (" (offline)" if args.offline else f" - refreshing every {args.refresh_interval:g}s"))
+        print("   GET /prompts/<id>[/<version>][?format=json] · /healthz · Ctrl+C to stop")
+    
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready=ready))
+    except KeyboardInterrupt:
+        print(f"\n👋 Server stopped after {server.requests} request(s)")
+    except OSError as e:
+        print(f"❌ Cannot serve on {args.host}:{args.port}: {e}")
+
+
+def _watch_templates(manager, args):
+    """watch: initial sync of the directory, then one debounced sync per burst of saves"""
+    from lib.template_watch import TemplateWatch
+    
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+    watch = TemplateWatch(manager, args.directory, debounce=args.debounce, polling=args.poll,
+                          interval=args.interval, workers=args.workers)
+    
+    def report(summary, elapsed):
+        stamp = time.strftime('%H:%M:%S')
+        for prompt_id in sorted(summary['created']):
+            print(f"[{stamp}] ➕ {prompt_id}: created")
+        for prompt_id in sorted(summary['updated']):
+            print(f"[{stamp}] ✏️  {prompt_id}: updated")
+        for path, reason in summary['skipped']:
+            print(f"[{stamp}] ⏭️  {path}: {reason}")
+        for warning in summary['warnings']:
+            print(f"[{stamp}] ⚠️  {warning}")
+        for path, error in summary['failed']:
+            print(f"[{stamp}] ❌ {path}: {error} (retried on next save)")
+        synced = len(summary['created']) + len(summary['updated'])
+        if synced or summary['failed']:
+            print(f"[{stamp}] 📊 {synced} synced, {len(summary['unchanged']) + summary['unchanged_files']} unchanged "
+                  f"in {elapsed:.2f}s")
+    
+    print(f"👀 Watching {args.directory} ({watch.watcher.kind}, debounce {args.debounce:g}s) - Ctrl+C to stop")
+    try:
+        watch.run(report)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+
+def _sync_templates(manager, args):
+    """sync: pull pages edited in Notion, push edited files, report what changed on both sides"""
+    from lib.prompt_sync import PromptSync
+    
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+    print(f"🔄 Syncing {args.directory} with the library" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 70)
+    start_time = time.perf_counter()
+    summary = PromptSync(manager, args.directory).sync(dry_run=args.dry_run, resolve=args.resolve,
+                                                       workers=args.workers)
+    elapsed = time.perf_counter() - start_time
+    
+    verb = "would be " if args.dry_run else ""
+    for prompt_id in summary['pulled']:
+        print(f"⬇️  {prompt_id}: {verb}pulled")
+    for prompt_id in summary['pushed']:
+        print(f"⬆️  {prompt_id}: {verb}pushed")
+    for prompt_id in summary['created']:
+        print(f"➕ {prompt_id}: {verb}created")
+    for prompt_id, path in summary['conflicts']:
+        print(f"⚔️  {prompt_id}: changed in {path} and in Notion - not synced")
+    for prompt_id, path in summary['missing']:
+        print(f"🕳️  {prompt_id}: {path} was removed (the prompt stays in Notion)")
+    for path, reason in summary['skipped']:
+        print(f"⏭️  {path}: {reason}")
+    for warning in summary['warnings']:
+        print(f"⚠️  {warning}")
+    for name, error in summary['failed']:
+        print(f"❌ {name}: {error}")
+    
+    print(f"\n📊 {len(summary['pulled'])} pulled, {len(summary['pushed'])} pushed, {len(summary['created'])} created, "
+          f"{len(summary['conflicts'])} conflict(s) in {elapsed:.2f}s (watermark {summary['watermark'] or '-'})")
+    if summary['conflicts']:
+        print("💡 Merge by hand, or re-run with --resolve local|remote to keep one side")
+    if summary['conflicts'] or summary['failed']:
+        sys.exit(1)
+
+
+def _snapshot_refresher(catalog, path):
+    """Refresh callable for serve --snapshot: rebuilds the catalogue whenever the file changes"""
+    from lib.inheritance import InheritanceResolver
+    from lib.lineage import LineageIndex
+    from lib.snapshot import Snapshot, SnapshotRecord
+    
+    loaded = {'mtime': None}
+    
+    def refresh():
+        mtime = os.path.getmtime(path)
+        if mtime == loaded['mtime']:
+            return 0
+        with Snapshot(path) as snapshot:
+            resolver = InheritanceResolver(LineageIndex(snapshot.meta.get('database_id')))
+            resolver.apply_pages(SnapshotRecord(record) for record in snapshot)
+        loaded['mtime'] = mtime
+        changed = catalog.update_from(resolver)
+        if changed:
+            print(f"🔄 Catalogue loaded from snapshot: {changed} prompt(s) changed, {len(catalog)} served")
+        return changed
+    
+    return refresh
+
+
+def _show_snapshot(args):
+    """snapshot show: inspect a snapshot file without Notion"""
+    from lib.snapshot import Snapshot
+    
+    try:
+        snapshot = Snapshot(args.file)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot read snapshot: {e}")
+        sys.exit(1)
+    
+    with snapshot:
+        if args.prompt_id:
+            record = snapshot.get(args.prompt_id)
+            if record is None:
+                print(f"❌ {args.prompt_id} is not in {args.file}")
+                sys.exit(1)
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+            return
+        
+        meta = snapshot.meta
+        print(f"🧳 {args.file}: {len(snapshot)} prompt(s), {os.path.getsize(args.file):,} bytes")
+        print(f"   exported {meta.get('exported_at', '?')} from database {meta.get('database_id', '?')}")
+        print("=" * 70)
+        for prompt_id in snapshot.prompt_ids():
+            print(f"  • {prompt_id}")
+
+
+def _open_storage(kind):
+    """The storage backend of this kind (one per kind for the lifetime of a daemon)"""
+    from lib.daemon import warm
+    return warm(("storage", kind), lambda: open_storage(kind))
+
+
+def _control_daemon(args):
+    """daemon: start, stop or inspect the background process that serves both CLIs"""
+    from lib.daemon import Daemon, daemon_status, socket_path, start_daemon, stop_daemon
+    
+    if args.action == "run":
+        try:
+            Daemon().serve()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+    
+    if args.action in ("stop", "restart"):
+        if stop_daemon():
+            print("👋 Daemon stopped")
+        elif args.action == "stop":
+            print(f"💤 No daemon running ({socket_path()})")
+    
+    if args.action in ("start", "restart"):
+        status = start_daemon()
+        if not status:
+            print(f"❌ Daemon did not come up - see {os.path.dirname(socket_path())} and the daemon log")
+            sys.exit(1)
+        print(f"🧠 Daemon {status['pid']} listening on {status['socket']}")
+        return
+    
+    if args.action == "status":
+        status = daemon_status()
+        if not status:
+            print(f"💤 No daemon running ({socket_path()})")
+            sys.exit(1)
+        print(f"🧠 Daemon {status['pid']} on {status['socket']}, up {status['uptime_seconds']}s, "
+              f"{status['commands']} command(s) served")
+        last = status['last_command']
+        if last:
+            print(f"   last: {last['cli']}_cli {' '.join(last['argv'])} "
+                  f"(exit {last['exit']}, {last['seconds'] * 1000:.0f} ms)")
+        if status['warm']:
+            print(f"   warm: {', '.join(status['warm'])}")
+
+
+def _sync_storage(args):
+    """storage: status of the local SQLite store, or an explicit pull/push against Notion"""
+    from lib.sqlite_storage import pull, push
+    
+    local = _open_storage("sqlite")
+    if args.action == "status":
+        stats = local.stats()
+        print(f"🗄️ {stats['path']}: {stats['pages']} page(s), {stats['blocks']} body block(s)")
+        for state, count in sorted(stats['by_state'].items()):
+            print(f"   {state:<9} {count}")
+        print(f"   last pull: {stats['pulled_at'] or 'never'} (watermark {stats['pull_watermark'] or '-'})")
+        print(f"   last push: {stats['pushed_at'] or 'never'}")
+        return
+    
+    if not os.getenv("PROMPT_DATABASE_ID"):
+        print("❌ Error: PROMPT_DATABASE_ID not set in .env file")
+        sys.exit(1)
+    remote = _open_storage("notion")
+    
+    start = time.time()
+    if args.action == "pull":
+        summary = pull(remote, local, full=args.full)
+        print(f"⬇️  Pulled {len(summary['pulled'])} page(s) ({summary['blocks']} body block(s)) "
+              f"in {time.time() - start:.1f}s")
+        if summary['removed']:
+            print(f"   🗑️  Removed {len(summary['removed'])} page(s) no longer in Notion")
+        if summary['kept_local']:
+            print(f"   ⚠️  Kept {len(summary['kept_local'])} page(s) with unpushed local changes: "
+                  f"{', '.join(summary['kept_local'])}")
+        return
+    
+    summary = push(local, remote)
+    print(f"⬆️  Pushed in {time.time() - start:.1f}s: {len(summary['created'])} created, "
+          f"{len(summary['updated'])} updated, {len(summary['archived'])} archived")
+    for label in ('created', 'updated', 'archived'):
+        for prompt_id in summary[label]:
+            print(f"   • {prompt_id} ({label})")
+    if summary['failed']:
+        print(f"❌ {len(summary['failed'])} page(s) failed: {', '.join(summary['failed'])}")
+        sys.exit(1)
+
+
+def _sparkline(values):
+    """▁▃▇ style mini chart of a series"""
+    bars = "▁▂▃▄▅▆▇█"
+    low, high = min(values), max(values)
+    if high == low:
+        return bars[3] * len(values)
+    return "".join(bars[int((value - low) / (high - low) * (len(bars) - 1))] for value in values)
+
+
+def _resolve_space_label(space, prompt_id):
+    """Label of a prompt in a trait space (the first page when several share the Prompt ID)"""
+    if prompt_id in space.position:
+        return prompt_id
+    return next((label for label in space.labels if label.startswith(f"{prompt_id} [")), None)
+
+
+def _print_similarity_matrix(space, max_columns=12, top_pairs=20):
+    """compare --matrix: cosine matrix for small libraries, closest pairs for large ones"""
+    print(f"⚖️ TRAIT SIMILARITY MATRIX: {len(space)} prompts (cosine over personality mix, complexity, effectiveness)")
+    print("=" * 70)
+    if len(space) < 2:
+        print("❌ Need at least two analysable prompts")
+        return
+    
+    if len(space) <= max_columns:
+        similarities = space.cosine_matrix()
+        print(f"{'':<30}" + "".join(f" {index + 1:>5}" for index in range(len(space))))
+        for row, label in enumerate(space.labels):
+            cells = "".join(f" {similarities[row, col]:>5.2f}" if row != col else "     -" for col in range(len(space)))
+            print(f"{row + 1:>2}. {label[:26]:<26}{cells}")
+    
+    print(f"\n🔗 Most similar pairs:")
+    for a, b, similarity in space.most_similar_pairs(top_pairs):
+        print(f"  {similarity:.3f}  {a}  ↔  {b}")
+
+
+def _print_duplicate_clusters(result, scanned):
+    """Shared report for library and local duplicate scans"""
+    clusters = result['clusters']
+    if not clusters:
+        print(f"✨ No near-duplicates among {scanned} prompts")
+    for i, cluster in enumerate(clusters, 1):
+        print(f"\n🧬 Cluster {i}: {len(cluster['members'])} prompts")
+        for a, b, similarity in cluster['pairs']:
+            print(f"  {similarity:>5.0%}  {a}  ↔  {b}")
+    
+    print(f"\n📊 {scanned} prompts scanned, {len(clusters)} cluster(s) - "
+          f"signatures: {result['computed']} computed, {result['cached']} cached")
+
 
 def _display_prompt_content(prompt):
     """Display structured prompt content in a readable format"""
@@ -13,11 +13,22 @@ WARNING: This will DESTROY all existing data. Use with caution.
 """
 
 import os
+import sys
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 from notion_client import Client
 
+# Add the parent directory to the sys.path to find modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from lib.rate_limit import RateLimiter
+
 load_dotenv()
 
 class NuclearCleanSlateCreator:
@@ -30,38 +41,95 @@ class NuclearCleanSlateCreator:
         if not self.notion or not self.database_id:
             raise Exception("❌ Missing PROMPT_SECURITY_TOKEN or PROMPT_DATABASE_ID in .env")
     
-    def nuclear_wipe_database(self):
-        """🚨 NUCLEAR OPTION: Completely wipe the database"""
+    def nuclear_wipe_database(self, workers: int = 8, max_passes: int = 5):
+        """
+        🚨 NUCLEAR OPTION: Completely wipe the database
+        
+        Scans every page (following pagination), archives them concurrently under
+        the Notion rate limit, then re-queries until nothing is left - a wipe only
+        reports success once the database is verifiably empty.
+        """
         print("💥 INITIATING NUCLEAR DATABASE WIPE...")
         print("⚠️  This will DESTROY all existing data!")
         
+        limiter = RateLimiter()
+        deleted_count = 0
+        survivors = 0
+        start_time = time.perf_counter()
+        
         try:
-            # Get all pages
-            response = self.notion.databases.query(database_id=self.database_id)
-            pages = response['results']
-            
-            if not pages:
-                print("   📭 Database already empty")
-                return 0
-            
-            # Archive (delete) all pages
-            deleted_count = 0
-            for page in pages:
-                try:
-                    self.notion.pages.update(
-                        page_id=page['id'],
-                        archived=True
-                    )
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"   ⚠️  Failed to delete page: {e}")
+            for pass_number in range(1, max_passes + 1):
+                page_ids = self._scan_live_page_ids(limiter)
+                
+                if not page_ids:
+                    if pass_number == 1:
+                        print("   📭 Database already empty")
+                    else:
+                        print("   ✅ Verification query: no survivors")
+                    break
+                
+                if pass_number == 1:
+                    print(f"   🎯 {len(page_ids)} entries targeted")
+                else:
+                    print(f"   🔁 Verification pass {pass_number}: {len(page_ids)} survivors found")
+                
+                deleted_count += self._archive_pages(page_ids, limiter, workers)
+            else:
+                survivors = len(self._scan_live_page_ids(limiter))
             
-            print(f"   💥 NUCLEAR WIPE COMPLETE: {deleted_count} entries obliterated")
+            elapsed = time.perf_counter() - start_time
+            rate = deleted_count / elapsed if elapsed > 0 else 0.0
+            if survivors:
+                print(f"   ❌ NUCLEAR WIPE INCOMPLETE: {survivors} entries survived {max_passes} passes "
+                      f"({deleted_count} obliterated in {elapsed:.1f}s, {rate:.1f}/s) - run the wipe again")
+            else:
+                print(f"   💥 NUCLEAR WIPE COMPLETE: {deleted_count} entries obliterated "
+                      f"in {elapsed:.1f}s ({rate:.1f}/s)")
             return deleted_count
             
         except Exception as e:
             print(f"   ❌ Nuclear wipe failed: {e}")
-            return 0
+            return deleted_count
+    
+    def _scan_live_page_ids(self, limiter: RateLimiter):
+        """Collect the ids of every non-archived page, following pagination"""
+        page_ids = []
+        query_params = {"database_id": self.database_id, "page_size": 100}
+        
+        while True:
+            response = limiter.call(self.notion.databases.query, **query_params)
+            page_ids.extend(page['id'] for page in response['results'] if not page.get('archived'))
+            print(f"   🔍 Scanning... {len(page_ids)} entries found", end='\r')
+            if not response.get('has_more'):
+                break
+            query_params["start_cursor"] = response['next_cursor']
+        
+        print()
+        return page_ids
+    
+    def _archive_pages(self, page_ids, limiter: RateLimiter, workers: int):
+        """Archive pages concurrently, showing progress and this pass's throughput"""
+        archived = 0
+        start_time = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(limiter.call, self.notion.pages.update, page_id=page_id, archived=True)
+                for page_id in page_ids
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                    archived += 1
+                except Exception as e:
+                    print(f"\n   ⚠️  Failed to delete page: {e}")
+                
+                elapsed = time.perf_counter() - start_time
+                rate = done / elapsed if elapsed > 0 else 0.0
+                print(f"   💣 Archived {done}/{len(page_ids)} ({rate:.1f} pages/s)", end='\r')
+        
+        print()
+        return archived
     
     def create_proper_schema(self):
         """Create the PROPER schema (no more type mismatches)"""
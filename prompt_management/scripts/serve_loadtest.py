@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+KHAOS Serve Load Test - HOW FAST DOES THE PROMPT COME BACK?
+Drives a running 'prompt_cli.py serve' with concurrent keep-alive connections
+and reports request latency percentiles and throughput, for full responses
+and for ETag revalidations (304). No Notion access required.
+
+Usage:
+    python prompt_cli.py serve &
+    python serve_loadtest.py [--prompt khaos-core-persona] [--connections 8] [--requests 5000] [--max-p99-ms 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import quote
+
+
+async def fetch(reader, writer, path: str, etag: str = None) -> tuple:
+    """One request on an open connection; returns (status, headers, body)"""
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    writer.write((request + "\r\n").encode('latin-1'))
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(lines[0].split(' ')[1]), headers, body
+
+
+async def worker(host: str, port: int, path: str, etag: str, requests: int, latencies: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            status, _, _ = await fetch(reader, writer, path, etag)
+            latencies.append(time.perf_counter() - start)
+            if status not in (200, 304):
+                raise RuntimeError(f"unexpected status {status} for {path}")
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_phase(host: str, port: int, path: str, etag: str, connections: int, requests: int) -> dict:
+    per_connection = max(1, requests // connections)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, path, etag, per_connection, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p90': percentile(latencies, 0.90) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'max': latencies[-1] * 1000,
+    }
+
+
+async def main_async(args) -> int:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        if args.prompt:
+            path = f"/prompts/{quote(args.prompt)}"
+        else:
+            status, _, body = await fetch(reader, writer, "/prompts")
+            index = json.loads(body) if status == 200 else []
+            if not index:
+                print("❌ The server has no prompts to serve")
+                return 1
+            path = f"/prompts/{quote(index[0]['prompt_id'])}"
+        status, headers, body = await fetch(reader, writer, path)
+    finally:
+        writer.close()
+
+    if status != 200:
+        print(f"❌ GET {path} returned {status}: {body[:200]!r}")
+        return 1
+    etag = headers.get('etag')
+    print(f"🎯 Target: http://{args.host}:{args.port}{path} ({len(body)} bytes, ETag {etag})")
+    print(f"   {args.connections} keep-alive connection(s), {args.requests} requests per phase")
+    print("=" * 70)
+
+    # Warm up connections and the server's code paths before measuring
+    await run_phase(args.host, args.port, path, None, args.connections, min(args.requests, 500))
+
+    print(f"{'Phase':<18} | {'Requests':>8} | {'Req/s':>8} | {'p50 ms':>7} | {'p90 ms':>7} | {'p99 ms':>7} | {'max ms':>7}")
+    print("-" * 80)
+    worst_p99 = 0.0
+    for label, phase_etag in (("200 full body", None), ("304 revalidate", etag)):
+        result = await run_phase(args.host, args.port, path, phase_etag, args.connections, args.requests)
+        worst_p99 = max(worst_p99, result['p99'])
+        print(f"{label:<18} | {result['requests']:>8} | {result['rps']:>8.0f} | {result['p50']:>7.3f} | "
+              f"{result['p90']:>7.3f} | {result['p99']:>7.3f} | {result['max']:>7.3f}")
+
+    if args.max_p99_ms is not None:
+        if worst_p99 > args.max_p99_ms:
+            print(f"\n❌ p99 {worst_p99:.3f} ms exceeds the {args.max_p99_ms} ms budget")
+            return 1
+        print(f"\n✅ p99 {worst_p99:.3f} ms within the {args.max_p99_ms} ms budget")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the local prompt serving endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--prompt", default=None, help="Prompt ID to request (default: first in /prompts)")
+    parser.add_argument("--connections", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per phase, across all connections")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail (exit 1) if p99 latency exceeds this")
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(main_async(args)))
+    except (ConnectionError, OSError) as e:
+        print(f"❌ Cannot reach http://{args.host}:{args.port}: {e}")
+        print("   Start the server first: python prompt_cli.py serve")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
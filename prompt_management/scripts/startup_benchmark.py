@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+KHAOS Startup Benchmark - HOW LONG BEFORE THE CLI SAYS ANYTHING?
+Times fresh interpreter starts of prompt_cli.py and of the PromptManager import,
+reports each as overhead over a bare interpreter, and checks that --help pulls
+in none of the heavy modules (Notion client, dotenv, the manager itself).
+
+Exits 1 when a budget is exceeded or a heavy module is imported eagerly, so it
+can guard startup time as features grow. No Notion access required.
+
+Usage:
+    python startup_benchmark.py [--runs 20] [--max-overhead-ms 120] [--top 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(PACKAGE_DIR, "scripts", "prompt_cli.py")
+
+# Overhead budget for 'prompt_cli.py --help' over a bare interpreter start
+DEFAULT_BUDGET_MS = 120.0
+
+# Modules 'prompt_cli.py --help' must not import (they are loaded when a command needs them)
+LAZY_MODULES = ('notion_client', 'dotenv', 'httpx', 'lib.prompt_manager', 'concurrent.futures.process', 'sqlite3')
+
+SCENARIOS = (
+    ("python (baseline)", ["-c", "pass"]),
+    ("prompt_cli --help", [CLI, "--help"]),
+    ("import PromptManager", ["-c", f"import sys; sys.path.insert(0, {PACKAGE_DIR!r}); import lib.prompt_manager"]),
+)
+
+
+def time_command(argv: list, runs: int) -> list:
+    """Wall-clock seconds of each run (after one untimed warm-up that fills the bytecode cache)"""
+    command = [sys.executable, *argv]
+    subprocess.run(command, capture_output=True, cwd=PACKAGE_DIR)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, cwd=PACKAGE_DIR)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr.decode(errors='replace')[-500:]}")
+    return timings
+
+
+def import_profile(argv: list) -> dict:
+    """Module -> (self µs, cumulative µs) from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", *argv], capture_output=True, cwd=PACKAGE_DIR)
+    profile = {}
+    for line in result.stderr.decode(errors='replace').splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark for the prompt CLI")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per scenario (default: 20)")
+    parser.add_argument("--max-overhead-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Fail if 'prompt_cli --help' median overhead exceeds this (default: {DEFAULT_BUDGET_MS:g})")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest imports of 'prompt_cli --help'")
+    args = parser.parse_args()
+
+    print(f"⏱️  {args.runs} fresh interpreter start(s) per scenario ({sys.executable})")
+    print("=" * 70)
+    print(f"{'Scenario':<22} | {'median ms':>9} | {'p90 ms':>7} | {'min ms':>7} | {'overhead ms':>11}")
+    print("-" * 70)
+    medians = {}
+    for label, argv in SCENARIOS:
+        timings = sorted(time_command(argv, args.runs))
+        medians[label] = statistics.median(timings) * 1000
+        overhead = medians[label] - medians.get("python (baseline)", medians[label])
+        p90 = timings[min(len(timings) - 1, int(0.9 * len(timings)))] * 1000
+        print(f"{label:<22} | {medians[label]:>9.1f} | {p90:>7.1f} | {timings[0] * 1000:>7.1f} | {overhead:>11.1f}")
+
+    profile = import_profile([CLI, "--help"])
+    if args.top:
+        print(f"\n🐌 Slowest imports of 'prompt_cli --help' (cumulative):")
+        top_level = [(name, times) for name, times in profile.items() if '.' not in name or name.startswith('lib.')]
+        for name, (_, cumulative_us) in sorted(top_level, key=lambda item: -item[1][1])[:args.top]:
+            print(f"   {cumulative_us / 1000:>7.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in profile]
+    if eager:
+        print(f"\n❌ 'prompt_cli --help' imports {', '.join(eager)} - keep them behind the commands that need them")
+        failed = True
+
+    overhead = medians["prompt_cli --help"] - medians["python (baseline)"]
+    if overhead > args.max_overhead_ms:
+        print(f"\n❌ 'prompt_cli --help' overhead {overhead:.1f} ms exceeds the {args.max_overhead_ms:g} ms budget")
+        failed = True
+    elif not eager:
+        print(f"\n✅ 'prompt_cli --help' overhead {overhead:.1f} ms within the {args.max_overhead_ms:g} ms budget; "
+              f"no heavy module imported")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()